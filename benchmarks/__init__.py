@@ -0,0 +1 @@
+"""Нагрузочные замеры бота на локальных заглушках."""
@@ -0,0 +1,92 @@
+import argparse
+import gc
+import importlib.util
+import time
+import tracemalloc
+from collections import namedtuple
+
+import homework
+from benchmarks.records import make_payload
+from bot.decoding import JsonDecoder
+
+SIZES = (1000, 10000, 100000)
+DECODERS = {
+    'json': JsonDecoder('json'),
+    'orjson': JsonDecoder('orjson'),
+}
+
+DECODING_RESULT_MESSAGE = (
+    '{size:>7} работ ({megabytes:5.1f} МБ), {name:<6}: '
+    '{seconds:7.3f} с, пик памяти {peak:6.1f} МБ'
+)
+
+DecodingResult = namedtuple(
+    'DecodingResult', ('size', 'name', 'body', 'seconds', 'peak')
+)
+
+
+def available_decoders():
+    """Декодеры для замера; orjson — только если он установлен."""
+    return {
+        name: decoder for name, decoder in DECODERS.items()
+        if name != 'orjson' or importlib.util.find_spec('orjson')
+    }
+
+
+def decode_and_extract(decoder, body):
+    """Разбор тела ответа и подготовка сообщений, как в main()."""
+    response = decoder.loads(body)
+    homework.check_response(response)
+    return homework.extract_updates(response['homeworks'])
+
+
+def peak_bytes(decoder, body):
+    """Пик памяти при разборе body сверх уже прочитанного тела, байт."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        decode_and_extract(decoder, body)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def best_seconds(decoder, body, repeat):
+    """Лучшее из repeat времён разбора body."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode_and_extract(decoder, body)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(size, repeat=3, decoders=None):
+    """Время и пик памяти каждого декодера на истории из size работ."""
+    body = make_payload(size).encode()
+    return [
+        DecodingResult(
+            size, name, len(body), best_seconds(decoder, body, repeat),
+            peak_bytes(decoder, body)
+        )
+        for name, decoder in (decoders or available_decoders()).items()
+    ]
+
+
+def main():
+    """Разбор большой истории работ: стандартный json против orjson."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    for size in args.sizes:
+        for result in run(size, args.repeat):
+            print(DECODING_RESULT_MESSAGE.format(
+                size=size, name=result.name,
+                megabytes=result.body / 2 ** 20, seconds=result.seconds,
+                peak=result.peak / 2 ** 20
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import namedtuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_PREFIX = 'import time:'
+
+IMPORT_TIME_MESSAGE = (
+    'import {module}: медиана {total_ms:.1f} мс по {runs} запускам.'
+)
+IMPORT_ROW_MESSAGE = '{self_ms:8.2f} {cumulative_ms:8.2f}  {name}'
+
+ImportProfile = namedtuple('ImportProfile', ('total', 'modules'))
+
+
+def parse_importtime(output, module):
+    """Разбор вывода python -X importtime.
+
+    Возвращает ImportProfile: общее время импорта module в секундах и
+    словарь {имя модуля: (собственное время, накопленное время)}.
+    """
+    modules = {}
+    total = None
+    for line in output.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        own, cumulative, name = line[len(IMPORT_TIME_PREFIX):].split('|')
+        if not own.strip().isdigit():
+            continue
+        indent = len(name) - len(name.lstrip())
+        name = name.strip()
+        modules[name] = (int(own) / 1e6, int(cumulative) / 1e6)
+        if name == module and indent == 1:
+            total = int(cumulative) / 1e6
+    if total is None:
+        raise ValueError(f'В выводе нет импорта модуля {module!r}.')
+    return ImportProfile(total, modules)
+
+
+def measure(module='homework', cwd=ROOT_DIR):
+    """Один запуск нового интерпретатора с python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr, module)
+
+
+def run(module='homework', runs=5):
+    """Профили runs запусков и медиана общего времени импорта."""
+    profiles = [measure(module) for _ in range(runs)]
+    return statistics.median(
+        profile.total for profile in profiles
+    ), profiles
+
+
+def main():
+    """Время импорта модуля и самые дорогие зависимости."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('module', nargs='?', default='homework')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+    total, profiles = run(args.module, args.runs)
+    print(IMPORT_TIME_MESSAGE.format(
+        module=args.module, total_ms=total * 1e3, runs=args.runs
+    ))
+    modules = profiles[-1].modules
+    for name in sorted(
+        modules, key=lambda name: modules[name][0], reverse=True
+    )[:args.top]:
+        own, cumulative = modules[name]
+        print(IMPORT_ROW_MESSAGE.format(
+            self_ms=own * 1e3, cumulative_ms=cumulative * 1e3, name=name
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import logging
+import resource
+import time
+from collections import defaultdict, deque, namedtuple
+
+import telebot.apihelper
+from telebot import TeleBot
+
+from bot.accounts import Account
+from bot.engine import PollingEngine
+from bot.intervals import FixedIntervalPolicy
+from bot.stats import percentile
+from bot.stubs import PracticumStub, TelegramStub
+
+STUB_BOT_TOKEN = '0:stub'
+
+BenchmarkResult = namedtuple('BenchmarkResult', (
+    'accounts', 'polls', 'notifications', 'elapsed', 'accounts_per_sec',
+    'p50', 'p99', 'cpu', 'max_rss_mb'
+))
+
+RESULT_MESSAGE = (
+    'Аккаунтов {accounts}, опросов {polls}, уведомлений {notifications} '
+    'за {elapsed:.2f} c: {accounts_per_sec:.1f} аккаунтов/с; задержка '
+    'уведомления p50 {p50_ms:.1f} мс, p99 {p99_ms:.1f} мс; CPU '
+    '{cpu:.2f} c, max RSS {max_rss_mb:.1f} МБ.'
+)
+
+
+def notify_latencies(changes, messages, chat_tokens):
+    """Задержки от смены статуса в заглушке до приёма уведомления.
+
+    Уведомление закрывает все смены статуса своего аккаунта,
+    случившиеся до него; задержка считается от самой ранней.
+    """
+    pending = defaultdict(deque)
+    for token, _, changed_at in sorted(changes, key=lambda c: c[2]):
+        pending[token].append(changed_at)
+    latencies = []
+    for chat_id, _, received_at in sorted(messages, key=lambda m: m[2]):
+        queue = pending[chat_tokens.get(chat_id)]
+        first = None
+        while queue and queue[0] <= received_at:
+            changed_at = queue.popleft()
+            first = changed_at if first is None else first
+        if first is not None:
+            latencies.append(received_at - first)
+    return sorted(latencies)
+
+
+def run(
+    accounts=1000, cycles=3, workers=32, churn_rate=0.3, error_rate=0.0,
+    slow_rate=0.0, slow_delay=0.5
+):
+    """Опрос accounts аккаунтов cycles циклами через заглушки.
+
+    Движок, заглушки и их потоки работают в одном процессе, поэтому
+    CPU и RSS включают и заглушки.
+    """
+    accounts = [
+        Account(str(index), f'token{index}', str(index))
+        for index in range(accounts)
+    ]
+    with PracticumStub(
+        churn_rate=churn_rate, error_rate=error_rate, slow_rate=slow_rate,
+        slow_delay=slow_delay
+    ) as practicum, TelegramStub() as telegram:
+        api_url = telebot.apihelper.API_URL
+        telebot.apihelper.API_URL = telegram.api_url
+        engine = PollingEngine(
+            accounts, TeleBot(STUB_BOT_TOKEN), max_workers=workers,
+            endpoint=practicum.endpoint,
+            interval_policy=FixedIntervalPolicy()
+        )
+        cpu_started = time.process_time()
+        started = time.monotonic()
+        try:
+            for _ in range(cycles):
+                engine.run_cycle()
+        finally:
+            elapsed = time.monotonic() - started
+            cpu = time.process_time() - cpu_started
+            engine.close()
+            telebot.apihelper.API_URL = api_url
+    latencies = notify_latencies(
+        practicum.changes, telegram.messages,
+        {account.chat_id: account.token for account in accounts}
+    )
+    polls = len(accounts) * cycles
+    return BenchmarkResult(
+        accounts=len(accounts),
+        polls=polls,
+        notifications=len(telegram.messages),
+        elapsed=elapsed,
+        accounts_per_sec=polls / elapsed if elapsed else 0.0,
+        p50=percentile(latencies, 0.5),
+        p99=percentile(latencies, 0.99),
+        cpu=cpu,
+        max_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+
+
+def main():
+    """Сквозной бенчмарк опроса аккаунтов на локальных заглушках API."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--churn-rate', type=float, default=0.3)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-delay', type=float, default=0.5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    result = run(
+        accounts=args.accounts, cycles=args.cycles, workers=args.workers,
+        churn_rate=args.churn_rate, error_rate=args.error_rate,
+        slow_rate=args.slow_rate, slow_delay=args.slow_delay
+    )
+    print(RESULT_MESSAGE.format(
+        p50_ms=result.p50 * 1000, p99_ms=result.p99 * 1000,
+        **result._asdict()
+    ))
+
+
+if __name__ == '__main__':
+    main()
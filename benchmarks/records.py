@@ -0,0 +1,100 @@
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from collections import namedtuple
+
+import homework
+
+SIZES = (1000, 100000)
+REVIEWER_COMMENT = (
+    'Хорошая работа! Обрати внимание на обработку исключений в main() '
+    'и на имена констант.'
+)
+
+RECORDS_RESULT_MESSAGE = (
+    '{size:>7} работ: словари из ответа {before:5.0f} Б/работа, '
+    'HomeworkRecord {after:5.0f} Б/работа, экономия ×{ratio:.1f}'
+)
+
+RecordsResult = namedtuple('RecordsResult', ('size', 'before', 'after', 'ratio'))
+
+
+def make_payload(size, rng=None):
+    """Тело ответа API с size работами, как его присылает Практикум."""
+    rng = rng or random.Random(size)
+    statuses = sorted(homework.HOMEWORK_VERDICTS)
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': number,
+                'status': rng.choice(statuses),
+                'homework_name': f'student{number}__hw{number % 20}.zip',
+                'reviewer_comment': REVIEWER_COMMENT,
+                'date_updated': '2024-01-01T00:00:00Z',
+                'lesson_name': f'Спринт {number % 20}: итоговый проект',
+            }
+            for number in range(size)
+        ],
+        'current_date': 1700000000,
+    })
+
+
+def raw_homeworks(payload):
+    """Работы так, как их хранили раньше: словари из response.json()."""
+    return json.loads(payload)['homeworks']
+
+
+def compact_homeworks(payload):
+    """Работы как HomeworkRecord после extract_updates()."""
+    return homework.extract_updates(json.loads(payload)['homeworks']).homeworks
+
+
+def retained_bytes(function, payload):
+    """Память, которую удерживает результат function(payload), байт."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        retained = function(payload)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del retained
+    return size
+
+
+def least_retained_bytes(function, payload, repeat):
+    """Наименьшее из repeat измерений retained_bytes().
+
+    Разовые расходы вроде роста таблицы интернированных строк общие для
+    всего процесса и в память на одну работу не входят.
+    """
+    return min(
+        retained_bytes(function, payload) for _ in range(repeat)
+    )
+
+
+def run(size, repeat=3):
+    """Байт на отслеживаемую работу до и после компактных записей."""
+    payload = make_payload(size)
+    before = least_retained_bytes(raw_homeworks, payload, repeat) / size
+    after = least_retained_bytes(compact_homeworks, payload, repeat) / size
+    return RecordsResult(size, before, after, before / after)
+
+
+def main():
+    """Память на одну работу: словари из ответа против HomeworkRecord."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    for size in args.sizes:
+        print(RECORDS_RESULT_MESSAGE.format(
+            **run(size, args.repeat)._asdict()
+        ))
+
+
+if __name__ == '__main__':
+    main()
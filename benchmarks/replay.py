@@ -0,0 +1,27 @@
+import argparse
+
+from bot.replay import REPLAY_RESULT_MESSAGE, Replay
+from bot.traffic import read_traffic
+
+
+def main():
+    """Воспроизведение журнала TRAFFIC_LOG через разбор ответов."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('path')
+    parser.add_argument(
+        '--speed', type=float, default=None,
+        help='1 — реальное время; по умолчанию без пауз'
+    )
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+    records = list(read_traffic(args.path))
+    for _ in range(args.repeat):
+        result = Replay(records, speed=args.speed).run()
+        print(REPLAY_RESULT_MESSAGE.format(
+            p50_us=result.p50 * 1e6, p99_us=result.p99 * 1e6,
+            **result._asdict()
+        ))
+
+
+if __name__ == '__main__':
+    main()
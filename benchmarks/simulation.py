@@ -0,0 +1,69 @@
+import argparse
+import logging
+import random
+
+from bot.accounts import Account
+from bot.clock import SimulatedClock
+from bot.engine import PollingEngine
+from bot.intervals import FixedIntervalPolicy
+from bot.simulation import HOUR, SIMULATION_RESULT_MESSAGE, Simulation
+from bot.transport import FakePracticumTransport, FakeTelegramTransport
+
+DAY = 24 * HOUR
+
+NOTIFICATIONS_MESSAGE = 'Уведомлений отправлено: {notifications}.'
+
+
+def run(
+    accounts=1000, days=7, change_rate=0.01, error_rate=0.0,
+    adaptive=True, seed=0
+):
+    """Симуляция days суток опроса accounts аккаунтов на фейках.
+
+    Возвращает (SimulationResult, число отправленных уведомлений).
+    """
+    clock = SimulatedClock()
+    transport = FakePracticumTransport(
+        change_rate=change_rate, error_rate=error_rate,
+        rng=random.Random(seed).random, clock=clock.time, sleep=clock.sleep
+    )
+    bot = FakeTelegramTransport(sleep=clock.sleep)
+    engine = PollingEngine(
+        [
+            Account(str(index), f'token{index}', str(index))
+            for index in range(accounts)
+        ],
+        bot, transport=transport, clock=clock,
+        interval_policy=None if adaptive else FixedIntervalPolicy()
+    )
+    try:
+        result = Simulation(engine).run(days * DAY)
+    finally:
+        engine.close()
+    return result, len(bot.sent)
+
+
+def main():
+    """Ускоренная симуляция опроса аккаунтов на виртуальном времени."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--change-rate', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fixed', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+    result, notifications = run(
+        accounts=args.accounts, days=args.days,
+        change_rate=args.change_rate, error_rate=args.error_rate,
+        adaptive=not args.fixed, seed=args.seed
+    )
+    print(SIMULATION_RESULT_MESSAGE.format(
+        simulated_hours=result.simulated / HOUR, **result._asdict()
+    ))
+    print(NOTIFICATIONS_MESSAGE.format(notifications=notifications))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+
+import homework
+
+SIZES = (100, 10000, 100000)
+
+VALIDATOR_RESULT_MESSAGE = (
+    '{size:>7} работ: построчно {legacy_ns:7.0f} нс/работа, '
+    'за один проход {compiled_ns:7.0f} нс/работа, '
+    'ускорение ×{speedup:.1f}'
+)
+
+ValidatorResult = namedtuple(
+    'ValidatorResult', ('size', 'legacy', 'compiled', 'speedup')
+)
+
+
+def legacy_check_response(response):
+    """check_response() до однопроходного валидатора (эталон замера)."""
+    if not isinstance(response, dict):
+        raise TypeError(homework.TYPE_ERROR_MESSAGE.format(
+            name='response', expected_type='dict',
+            actual_type=type(response)
+        ))
+    if 'homeworks' not in response:
+        raise KeyError(homework.KEY_ERROR_MESSAGE.format(
+            key_name='homeworks', dict_name='response'
+        ))
+    homeworks = response['homeworks']
+    if not isinstance(homeworks, list):
+        raise TypeError(homework.TYPE_ERROR_MESSAGE.format(
+            name='homeworks', expected_type='list',
+            actual_type=type(homeworks)
+        ))
+
+
+def legacy_parse_status(item):
+    """parse_status() до однопроходного валидатора (эталон замера)."""
+    for key in ('homework_name', 'status'):
+        if key not in item:
+            raise KeyError(homework.KEY_ERROR_MESSAGE.format(
+                key_name=key, dict_name='homework'
+            ))
+    status = item.get('status')
+    verdict = homework.HOMEWORK_VERDICTS.get(status)
+    if not verdict:
+        raise ValueError(
+            homework.UNKNOWN_STATUS_HOMEWORK_MESSAGE.format(name=status)
+        )
+    return homework.UPDATE_STATUS_HOMEWORK_MESSAGE.format(
+        name=item.get('homework_name'), verdict=verdict
+    )
+
+
+def legacy_messages(response):
+    """Сообщения по ответу прежним путём: проверка и разбор по работе."""
+    legacy_check_response(response)
+    return [
+        legacy_parse_status(item) for item in reversed(response['homeworks'])
+    ]
+
+
+def compiled_messages(response):
+    """Сообщения по ответу через check_response() и extract_updates()."""
+    homework.check_response(response)
+    return homework.extract_updates(response['homeworks']).messages
+
+
+def make_response(size, rng=None):
+    """Ответ API с size работами в случайных статусах."""
+    rng = rng or random.Random(size)
+    statuses = sorted(homework.HOMEWORK_VERDICTS)
+    return {
+        'homeworks': [
+            {
+                'id': number,
+                'status': rng.choice(statuses),
+                'homework_name': f'student{number}__hw{number % 20}.zip',
+                'reviewer_comment': '',
+                'date_updated': '2024-01-01T00:00:00Z',
+                'lesson_name': 'Lesson',
+            }
+            for number in range(size)
+        ],
+        'current_date': 1700000000,
+    }
+
+
+def best_time(function, argument, repeat):
+    """Лучшее из repeat времён одного вызова function(argument)."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(size, repeat=5):
+    """Сравнение прежнего и однопроходного разбора на size работах."""
+    response = make_response(size)
+    if legacy_messages(response) != compiled_messages(response):
+        raise AssertionError('Результаты разбора не совпали.')
+    legacy = best_time(legacy_messages, response, repeat)
+    compiled = best_time(compiled_messages, response, repeat)
+    return ValidatorResult(size, legacy, compiled, legacy / compiled)
+
+
+def main():
+    """Микробенчмарк разбора ответа на больших списках работ."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for size in args.sizes:
+        result = run(size, args.repeat)
+        print(VALIDATOR_RESULT_MESSAGE.format(
+            size=size, legacy_ns=result.legacy / size * 1e9,
+            compiled_ns=result.compiled / size * 1e9,
+            speedup=result.speedup
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Многоаккаунтный режим работы бота homework.py."""
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+
+from telebot import TeleBot
+
+import homework
+from bot.accounts import load_accounts
+from bot.engine import (DEFAULT_MAX_IN_FLIGHT, DEFAULT_MAX_WORKERS,
+                        DEFAULT_POLL_BUDGET, PollingEngine)
+from bot.intervals import FixedIntervalPolicy
+from bot.outbox import DEFAULT_MAX_SIZE, DEFAULT_WORKERS, Outbox
+from bot.outbox_queue import SqliteOutboxQueue
+from bot.session import DEFAULT_POOL_CONNECTIONS, create_session
+from bot.storage import CheckpointStore
+from bot.traffic import PRACTICUM
+from bot.transport import (FakePracticumTransport, FakeTelegramTransport,
+                           RequestsPracticumTransport)
+
+ACCOUNTS_FILE = os.getenv('ACCOUNTS_FILE')
+POLL_WORKERS = int(os.getenv('POLL_WORKERS') or DEFAULT_MAX_WORKERS)
+POLL_BUDGET = float(os.getenv('POLL_BUDGET') or DEFAULT_POLL_BUDGET)
+STATE_DB = os.getenv('STATE_DB')
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS') or DEFAULT_WORKERS)
+OUTBOX_DB = os.getenv('OUTBOX_DB')
+OUTBOX_MAX_SIZE = int(os.getenv('OUTBOX_MAX_SIZE') or DEFAULT_MAX_SIZE)
+ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING', '1') != '0'
+ASYNC_MODE = os.getenv('ASYNC_MODE', '0') != '0'
+MAX_IN_FLIGHT = int(os.getenv('MAX_IN_FLIGHT') or DEFAULT_MAX_IN_FLIGHT)
+HTTP_POOL_CONNECTIONS = int(
+    os.getenv('HTTP_POOL_CONNECTIONS') or DEFAULT_POOL_CONNECTIONS
+)
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE') or POLL_WORKERS)
+HTTP_KEEP_ALIVE = os.getenv('HTTP_KEEP_ALIVE', '1') != '0'
+FAKE_TRANSPORT = os.getenv('TRANSPORT', 'real') == 'fake'
+FAKE_LATENCY = float(os.getenv('FAKE_LATENCY') or 0)
+FAKE_ERROR_RATE = float(os.getenv('FAKE_ERROR_RATE') or 0)
+FAKE_CHANGE_RATE = float(os.getenv('FAKE_CHANGE_RATE') or 0)
+
+ENGINE_STARTED_MESSAGE = (
+    'Запущен опрос {accounts} аккаунтов, параллельно: {workers}.'
+)
+
+
+def engine_options():
+    """Общие для обоих режимов параметры движка опроса."""
+    return dict(
+        poll_budget=POLL_BUDGET,
+        interval_policy=None if ADAPTIVE_POLLING else FixedIntervalPolicy(),
+        store=CheckpointStore(STATE_DB) if STATE_DB else None,
+        dedup=homework.create_dedup()
+    )
+
+
+def create_transports():
+    """Бот Telegram и транспорт к API Практикума: настоящие или фейковые."""
+    if FAKE_TRANSPORT:
+        return (
+            FakeTelegramTransport(
+                latency=FAKE_LATENCY, error_rate=FAKE_ERROR_RATE
+            ),
+            FakePracticumTransport(
+                latency=FAKE_LATENCY, error_rate=FAKE_ERROR_RATE,
+                change_rate=FAKE_CHANGE_RATE
+            )
+        )
+    return (
+        TeleBot(homework.TELEGRAM_TOKEN),
+        RequestsPracticumTransport(create_session(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            keep_alive=HTTP_KEEP_ALIVE
+        ))
+    )
+
+
+def run_threaded(accounts):
+    """Опрос пулом потоков с отправкой через Outbox."""
+    bot, transport = create_transports()
+    bot = homework.TRAFFIC.bot(bot)
+    outbox = Outbox(
+        bot, workers=OUTBOX_WORKERS, max_size=OUTBOX_MAX_SIZE,
+        queue=(
+            SqliteOutboxQueue(OUTBOX_DB, OUTBOX_MAX_SIZE)
+            if OUTBOX_DB else None
+        )
+    )
+    outbox.start()
+    engine = PollingEngine(
+        accounts, bot, max_workers=POLL_WORKERS, transport=transport,
+        http_get=homework.TRAFFIC.http_get(transport.get), outbox=outbox,
+        **engine_options()
+    )
+    logging.info(ENGINE_STARTED_MESSAGE.format(
+        accounts=len(accounts), workers=engine.max_workers
+    ))
+    engine.run_forever()
+
+
+def run_async(accounts):
+    """Опрос корутинами на AsyncTeleBot и aiohttp."""
+    from telebot.async_telebot import AsyncTeleBot
+
+    from bot.aio import AsyncPollingEngine
+
+    engine = AsyncPollingEngine(
+        accounts, homework.TRAFFIC.bot(AsyncTeleBot(homework.TELEGRAM_TOKEN)),
+        max_in_flight=MAX_IN_FLIGHT,
+        on_exchange=homework.TRAFFIC.sink(PRACTICUM), **engine_options()
+    )
+    logging.info(ENGINE_STARTED_MESSAGE.format(
+        accounts=len(accounts), workers=MAX_IN_FLIGHT
+    ))
+    asyncio.run(engine.run_forever())
+
+
+def main():
+    """Запуск многоаккаунтного опроса из ACCOUNTS_FILE."""
+    missing = [
+        name for name, value in (
+            ('TELEGRAM_TOKEN', homework.TELEGRAM_TOKEN or FAKE_TRANSPORT),
+            ('ACCOUNTS_FILE', ACCOUNTS_FILE),
+        )
+        if not value
+    ]
+    if missing:
+        logging.critical(homework.ENV_ERROR_MESSAGE.format(env_name=missing))
+        raise EnvironmentError(
+            homework.ENV_ERROR_MESSAGE.format(env_name=missing)
+        )
+    accounts = load_accounts(ACCOUNTS_FILE)
+    if ASYNC_MODE:
+        run_async(accounts)
+    else:
+        run_threaded(accounts)
+
+
+if __name__ == '__main__':
+    homework.configure_logging()
+    homework.start_metrics_server()
+    main()
@@ -0,0 +1,58 @@
+import json
+from collections import namedtuple
+
+ACCOUNTS_FORMAT_ERROR_MESSAGE = (
+    'Файл аккаунтов "{path}" должен содержать JSON-список объектов.'
+)
+ACCOUNT_KEY_ERROR_MESSAGE = (
+    'Аккаунт #{index} в "{path}": отсутствует ключ "{key_name}".'
+)
+DUPLICATE_ACCOUNT_MESSAGE = 'Аккаунт "{account_id}" указан несколько раз.'
+NO_ACCOUNTS_MESSAGE = 'В файле аккаунтов "{path}" нет ни одного аккаунта.'
+
+REQUIRED_ACCOUNT_KEYS = ('token', 'chat_id')
+
+
+class Account(namedtuple('Account', ('id', 'token', 'chat_id'))):
+    """Учётная запись студента: токен Практикума и чат Telegram."""
+
+    __slots__ = ()
+
+    @property
+    def headers(self):
+        """Заголовки авторизации для API Практикума."""
+        return {'Authorization': f'OAuth {self.token}'}
+
+
+def parse_accounts(raw_accounts, path='<config>'):
+    """Создание списка Account из разобранного JSON-конфига."""
+    if not isinstance(raw_accounts, list):
+        raise TypeError(ACCOUNTS_FORMAT_ERROR_MESSAGE.format(path=path))
+    if not raw_accounts:
+        raise ValueError(NO_ACCOUNTS_MESSAGE.format(path=path))
+    accounts = []
+    seen_ids = set()
+    for index, raw in enumerate(raw_accounts):
+        if not isinstance(raw, dict):
+            raise TypeError(ACCOUNTS_FORMAT_ERROR_MESSAGE.format(path=path))
+        for key in REQUIRED_ACCOUNT_KEYS:
+            if not raw.get(key):
+                raise KeyError(ACCOUNT_KEY_ERROR_MESSAGE.format(
+                    index=index, path=path, key_name=key
+                ))
+        account_id = str(raw.get('id') or raw['chat_id'])
+        if account_id in seen_ids:
+            raise ValueError(
+                DUPLICATE_ACCOUNT_MESSAGE.format(account_id=account_id)
+            )
+        seen_ids.add(account_id)
+        accounts.append(
+            Account(account_id, str(raw['token']), str(raw['chat_id']))
+        )
+    return accounts
+
+
+def load_accounts(path):
+    """Загрузка аккаунтов из JSON-файла path."""
+    with open(path, encoding='utf-8') as file:
+        return parse_accounts(json.load(file), path)
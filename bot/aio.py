@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+
+import aiohttp
+
+import homework
+from bot.changes import UNCHANGED
+from bot.deadline import Deadline, DeadlineExceeded
+from bot.engine import DEFAULT_MAX_IN_FLIGHT, POLLS_PAUSED, BaseEngine
+from bot.outbox import (GLOBAL_RATE, PER_CHAT_RATE, RETRY_AFTER_MESSAGE,
+                        TokenBucket, retry_after)
+from bot.scheduler import next_deadline
+from bot.transport import Exchange
+
+KEEPALIVE_TIMEOUT = 75
+
+
+def client_timeout(timeout):
+    """aiohttp.ClientTimeout из таймаута в формате requests."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return aiohttp.ClientTimeout(connect=connect, sock_read=read)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+async def fetch_homework_statuses_async(
+    session, headers, timestamp, timeout=homework.REQUEST_TIMEOUT,
+    endpoint=None, changes=None, key=None, on_exchange=None
+):
+    """Асинхронный аналог homework.fetch_homework_statuses().
+
+    on_exchange получает transport.Exchange с сырым телом ответа, как
+    от RecordingPracticumTransport.
+    """
+    if changes is not None:
+        headers = changes.request_headers(key, headers)
+    request_params = dict(
+        url=endpoint or homework.ENDPOINT,
+        headers=headers,
+        params={'from_date': timestamp},
+        timeout=timeout
+    )
+    started_at, started = time.time(), time.monotonic()
+    status_code = body = error = None
+    try:
+        async with session.get(
+            request_params['url'], headers=headers,
+            params=request_params['params'], timeout=client_timeout(timeout)
+        ) as response:
+            status_code = response.status
+            body = await response.read()
+            if changes is not None and changes.check(
+                key, status_code, body, response.headers
+            ):
+                return UNCHANGED
+            try:
+                response_json = (
+                    homework.DECODER.loads(body)
+                    if body and not body.isspace() else None
+                )
+            except ValueError:
+                if status_code == HTTPStatus.OK:
+                    raise
+                response_json = {}
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        error = e
+        raise ConnectionError(
+            homework.CONNECTION_ERROR_DETAIL_MESSAGE.format(
+                exception=e,
+                **request_params
+            )
+        ) from e
+    finally:
+        if on_exchange is not None:
+            on_exchange(Exchange(
+                request_params, status_code, body, error, started_at,
+                time.monotonic() - started
+            ))
+    if status_code != HTTPStatus.OK:
+        if not isinstance(response_json, dict):
+            response_json = {}
+        raise homework.ApiStatusCodeError(
+            homework.INCORRECT_STATUS_CODE_DETAIL_MESSAGE.format(
+                status_code=status_code,
+                error=response_json.get('error', ''),
+                code=response_json.get('code', ''),
+                **request_params
+            ),
+            status_code
+        )
+    return response_json
+
+
+class AsyncPollingEngine(BaseEngine):
+    """Опрос аккаунтов корутинами в одном цикле событий.
+
+    На каждый аккаунт — одна задача asyncio, которая спит до своей
+    плановой отметки; одновременных запросов не больше max_in_flight.
+    check_response и extract_updates вызываются как есть: они не делают
+    ввода-вывода. bot — telebot.async_telebot.AsyncTeleBot; без outbox
+    отправка ограничивается теми же корзинами маркеров, что и в Outbox.
+    """
+
+    def __init__(
+        self, accounts, bot, session=None,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT, on_exchange=None, **options
+    ):
+        """Параметры опроса описаны в BaseEngine.
+
+        on_exchange получает каждый обмен с API (TrafficLog.sink()).
+        """
+        super().__init__(accounts, bot, **options)
+        self.session = session
+        self.on_exchange = on_exchange
+        self.max_in_flight = max_in_flight
+        self._slots = None
+        self._global_bucket = TokenBucket(GLOBAL_RATE)
+        self._chat_buckets = {}
+
+    def is_api_failure(self, error):
+        """Дополнительно учитывает сетевые ошибки aiohttp."""
+        return super().is_api_failure(error) or (
+            isinstance(error, ConnectionError)
+            and isinstance(error.__cause__, aiohttp.ClientConnectionError)
+        )
+
+    async def poll_account(self, state):
+        """Один шаг опроса аккаунта; исключения не выходят наружу."""
+        state.paused = not self.breaker.allow()
+        if state.paused:
+            POLLS_PAUSED.inc()
+            return
+        deadline = Deadline(self.poll_budget, self.clock.monotonic)
+        started = self.clock.monotonic()
+        overrun = False
+        try:
+            await self._poll(state, deadline)
+        except DeadlineExceeded as error:
+            overrun = True
+            self.log_deadline(state, error)
+        except Exception as error:
+            message = self.error_message(state, error)
+            if message and await self.send(state.account.chat_id, message):
+                state.errors.reported(error)
+        finally:
+            self.record_poll(self.clock.monotonic() - started, overrun)
+
+    async def _fetch(self, state, deadline):
+        try:
+            response = await fetch_homework_statuses_async(
+                self.session, state.account.headers, state.timestamp,
+                timeout=deadline.timeout(self.request_timeout),
+                endpoint=self.endpoint, changes=self.changes,
+                key=state.account.id, on_exchange=self.on_exchange
+            )
+        except Exception as error:
+            self.record_fetch(state, error)
+            raise
+        self.record_fetch(state)
+        return response
+
+    async def _poll(self, state, deadline):
+        response = await self._fetch(state, deadline)
+        messages, updates = self.collect_updates(state, response)
+        if response is UNCHANGED or not response['homeworks']:
+            return
+        deadline.check()
+        for chunk in homework.coalesce_messages(messages):
+            if not await self.send(state.account.chat_id, chunk):
+                return
+        self.commit_updates(state, response, updates)
+
+    async def send(self, chat_id, message):
+        """Отправка сообщения или постановка в outbox, если он задан."""
+        if self.outbox is not None:
+            return self.outbox.put(chat_id, message)
+        chat_bucket = self._chat_buckets.setdefault(
+            chat_id, TokenBucket(PER_CHAT_RATE)
+        )
+        await asyncio.sleep(
+            max(self._global_bucket.reserve(), chat_bucket.reserve())
+        )
+        try:
+            await self.bot.send_message(
+                chat_id=chat_id, text=message, timeout=self.send_timeout
+            )
+            logging.debug(homework.SENT_TO_TG_MESSAGE.format(message=message))
+        except Exception as e:
+            delay = retry_after(e)
+            if delay is not None:
+                logging.warning(RETRY_AFTER_MESSAGE.format(
+                    chat_id=chat_id, retry_after=delay
+                ))
+                chat_bucket.penalize(delay)
+            logging.exception(homework.NOT_SENT_TO_TG_MESSAGE.format(
+                exception=e, message=message
+            ))
+            return False
+        return True
+
+    async def _poll_slot(self, state):
+        async with self._slots:
+            await self.poll_account(state)
+
+    async def run_cycle(self):
+        """Опрос всех аккаунтов сразу."""
+        await self._open()
+        await asyncio.gather(*(
+            self._poll_slot(state) for state in self.states
+        ))
+        self.log_stats()
+
+    async def _account_loop(self, state, offset):
+        due = self.clock.monotonic() + offset
+        while True:
+            await asyncio.sleep(max(0.0, due - self.clock.monotonic()))
+            await self._poll_slot(state)
+            due = next_deadline(
+                due, self.next_interval(state) or self.period,
+                self.clock.monotonic()
+            )
+
+    async def _log_stats_periodically(self):
+        while True:
+            await asyncio.sleep(self.period)
+            self.log_stats()
+
+    async def _open(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_in_flight,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT
+                )
+            )
+
+    async def run_forever(self):
+        """Бесконечный опрос: аккаунты равномерно распределены по периоду."""
+        await self._open()
+        step = self.period / len(self.states) if self.states else 0
+        try:
+            await asyncio.gather(
+                self._log_stats_periodically(),
+                *(
+                    self._account_loop(state, index * step)
+                    for index, state in enumerate(self.states)
+                )
+            )
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Закрытие HTTP-сессии, сессии бота и хранилищ."""
+        if self.session is not None:
+            await self.session.close()
+        close_session = getattr(self.bot, 'close_session', None)
+        if close_session is not None:
+            await close_session()
+        if self.store is not None:
+            self.store.close()
+        if self.dedup is not None:
+            self.dedup.close()
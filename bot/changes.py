@@ -0,0 +1,121 @@
+import re
+import threading
+from http import HTTPStatus
+
+from bot.lazy import lazy_import
+from bot.metrics import REGISTRY
+
+hashlib = lazy_import('hashlib')
+
+# current_date — время сервера, оно меняется в каждом ответе и не
+# говорит об изменении работ, поэтому в отпечаток не входит.
+CURRENT_DATE_PATTERN = re.compile(rb'"current_date"\s*:\s*-?[\d.eE+-]+')
+DIGEST_SIZE = 16
+
+UNCHANGED_RESPONSE_MESSAGE = 'Ответ API не изменился, обработка пропущена.'
+
+# Признак неизменного ответа вместо тела из fetch_homework_statuses().
+UNCHANGED = object()
+
+UNCHANGED_RESPONSES = REGISTRY.counter(
+    'homework_unchanged_responses_total',
+    'Ответы API, совпавшие с уже обработанными (включая 304).'
+)
+
+
+def body_digest(body):
+    """Отпечаток тела ответа без поля current_date."""
+    return hashlib.blake2b(
+        CURRENT_DATE_PATTERN.sub(b'', body), digest_size=DIGEST_SIZE
+    ).digest()
+
+
+class _Seen:
+    __slots__ = (
+        'digest', 'etag', 'last_modified',
+        'pending_digest', 'pending_etag', 'pending_last_modified'
+    )
+
+    def __init__(self):
+        self.digest = self.etag = self.last_modified = None
+        self.pending_digest = self.pending_etag = None
+        self.pending_last_modified = None
+
+
+class ChangeTracker:
+    """Отпечатки последних обработанных ответов по ключам (аккаунтам).
+
+    check() сравнивает ответ с последним обработанным и запоминает его
+    как кандидата; commit() вызывается, когда ответ полностью обработан
+    (сообщения доставлены). Пока ответ не подтверждён, такой же ответ
+    обрабатывается заново, и условные заголовки ETag/Last-Modified для
+    него не отправляются.
+    """
+
+    def __init__(self):
+        """Пустой трекер."""
+        self.unchanged = 0
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def request_headers(self, key, headers):
+        """Заголовки headers с If-None-Match и If-Modified-Since, если есть."""
+        seen = self._seen.get(key)
+        if seen is None or (seen.etag is None and seen.last_modified is None):
+            return headers
+        headers = dict(headers or {})
+        if seen.etag is not None:
+            headers['If-None-Match'] = seen.etag
+        if seen.last_modified is not None:
+            headers['If-Modified-Since'] = seen.last_modified
+        return headers
+
+    def check(self, key, status_code, body, headers=None):
+        """True, если ответ совпадает с уже обработанным для key.
+
+        body — сырое тело ответа в байтах; без него ответ всегда
+        считается новым. 304 Not Modified означает совпадение.
+        """
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is None:
+                seen = self._seen[key] = _Seen()
+        if status_code == HTTPStatus.NOT_MODIFIED and (
+            seen.etag is not None or seen.last_modified is not None
+        ):
+            return self._unchanged()
+        if status_code != HTTPStatus.OK or not isinstance(
+            body, (bytes, bytearray)
+        ):
+            seen.pending_digest = None
+            return False
+        digest = body_digest(body)
+        headers = headers or {}
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if digest == seen.digest:
+            seen.etag, seen.last_modified = etag, last_modified
+            return self._unchanged()
+        seen.pending_digest = digest
+        seen.pending_etag, seen.pending_last_modified = etag, last_modified
+        return False
+
+    def commit(self, key):
+        """Последний проверенный ответ для key полностью обработан."""
+        seen = self._seen.get(key)
+        if seen is None or seen.pending_digest is None:
+            return
+        seen.digest = seen.pending_digest
+        seen.etag = seen.pending_etag
+        seen.last_modified = seen.pending_last_modified
+        seen.pending_digest = None
+
+    def clear(self):
+        """Забыть все ответы."""
+        with self._lock:
+            self._seen.clear()
+
+    def _unchanged(self):
+        self.unchanged += 1
+        UNCHANGED_RESPONSES.inc()
+        return True
@@ -0,0 +1,60 @@
+import threading
+import time
+
+DEFAULT_EPOCH = 1_700_000_000
+
+
+class SystemClock:
+    """Настоящие часы: монотонные, настенные и time.sleep()."""
+
+    def monotonic(self):
+        """Монотонное время, сек."""
+        return time.monotonic()
+
+    def time(self):
+        """Настенное время, Unix-секунды."""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Ожидание seconds секунд."""
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Виртуальные часы для ускоренной симуляции.
+
+    sleep() не ждёт, а сдвигает время вперёд; time() — настенное время,
+    отсчитанное от epoch, monotonic() — секунды от старта симуляции.
+    """
+
+    def __init__(self, start=0.0, epoch=DEFAULT_EPOCH):
+        """Часы на отметке start секунд; настенное время — epoch + start."""
+        self.epoch = epoch
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        """Виртуальное монотонное время, сек."""
+        return self._now
+
+    def time(self):
+        """Виртуальное настенное время, Unix-секунды."""
+        return self.epoch + self._now
+
+    def sleep(self, seconds):
+        """Сдвиг часов на seconds секунд без ожидания."""
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """Сдвиг часов вперёд; отрицательные значения игнорируются."""
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+
+    def advance_to(self, moment):
+        """Перевод часов на отметку moment, если она в будущем."""
+        with self._lock:
+            self._now = max(self._now, moment)
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,47 @@
+import time
+
+DEADLINE_EXCEEDED_MESSAGE = 'Исчерпан бюджет времени цикла: {budget} c.'
+
+
+class DeadlineExceeded(TimeoutError):
+    """Бюджет времени цикла исчерпан."""
+
+
+class Deadline:
+    """Общий бюджет времени на запрос к API и отправку в Telegram."""
+
+    __slots__ = ('budget', 'expires_at', '_clock')
+
+    def __init__(self, budget, clock=time.monotonic):
+        """Отсчёт бюджета budget секунд начинается в момент создания."""
+        self.budget = budget
+        self._clock = clock
+        self.expires_at = clock() + budget
+
+    def remaining(self):
+        """Оставшееся время в секундах, не меньше нуля."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self):
+        """Истёк ли бюджет."""
+        return self._clock() >= self.expires_at
+
+    def check(self):
+        """Оставшееся время; DeadlineExceeded, если бюджет истёк."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(
+                DEADLINE_EXCEEDED_MESSAGE.format(budget=self.budget)
+            )
+        return remaining
+
+    def timeout(self, limit):
+        """Таймаут для очередного вызова: не больше limit и остатка.
+
+        limit может быть кортежем (connect, read), как в requests.
+        """
+        remaining = self.check()
+        if isinstance(limit, tuple):
+            return tuple(min(part, remaining) for part in limit)
+        return min(limit, remaining)
@@ -0,0 +1,52 @@
+import functools
+import importlib.util
+import json
+
+BACKENDS = ('auto', 'orjson', 'json')
+DEFAULT_BACKEND = 'auto'
+
+UNKNOWN_BACKEND_MESSAGE = (
+    'Неизвестный декодер JSON "{name}", ожидается один из: {backends}.'
+)
+
+
+@functools.lru_cache(maxsize=None)
+def backend_loads(name=DEFAULT_BACKEND):
+    """Функция разбора JSON для бэкенда name.
+
+    auto выбирает orjson, если он установлен, иначе стандартный json.
+    orjson импортируется при первом вызове, а не при импорте модуля.
+    """
+    if name == 'auto':
+        name = 'orjson' if importlib.util.find_spec('orjson') else 'json'
+    if name == 'orjson':
+        import orjson
+        return orjson.loads
+    return json.loads
+
+
+class JsonDecoder:
+    """Разбор тел ответов API бэкендом backend.
+
+    orjson при auto используется, если он установлен. Ошибки синтаксиса
+    у обоих бэкендов — ValueError, как у response.json().
+    """
+
+    def __init__(self, backend=DEFAULT_BACKEND):
+        """Декодер с бэкендом backend."""
+        if backend not in BACKENDS:
+            raise ValueError(UNKNOWN_BACKEND_MESSAGE.format(
+                name=backend, backends=', '.join(BACKENDS)
+            ))
+        self.backend = backend
+
+    def loads(self, body):
+        """Тело ответа (bytes или str), разобранное из JSON."""
+        return backend_loads(self.backend)(body)
+
+    def response_json(self, response):
+        """Разбор ответа requests; без content — через response.json()."""
+        body = getattr(response, 'content', None)
+        if not isinstance(body, (bytes, str)):
+            return response.json()
+        return self.loads(body)
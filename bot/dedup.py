@@ -0,0 +1,192 @@
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from bot.lazy import lazy_import
+from bot.metrics import REGISTRY
+
+hashlib = lazy_import('hashlib')
+
+DEFAULT_LRU_SIZE = 10000
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.001
+DIGEST_SIZE = 16
+BLOOM_MAGIC = b'HWBF'
+# Заголовок файла фильтра: сигнатура, число бит и число хеш-функций.
+BLOOM_HEADER = struct.Struct('<4sQI')
+
+BLOOM_RESET_MESSAGE = (
+    'Файл фильтра Блума {path} создан заново: параметры не совпали '
+    '(бит {bits}, хешей {hashes}).'
+)
+
+DUPLICATES_SKIPPED = REGISTRY.counter(
+    'homework_duplicate_notifications_total',
+    'Уведомления, не отправленные повторно по индексу дедупликации.'
+)
+
+
+def notification_key(homework_id, status, date_updated):
+    """Ключ уведомления: 16-байтный отпечаток тройки значений."""
+    return hashlib.blake2b(
+        f'{homework_id}\x1f{status}\x1f{date_updated}'.encode(),
+        digest_size=DIGEST_SIZE
+    ).digest()
+
+
+def homework_key(homework):
+    """Ключ уведомления о статусе работы из ответа API."""
+    return notification_key(
+        homework.get('id'), homework.get('status'),
+        homework.get('date_updated')
+    )
+
+
+class BloomFilter:
+    """Фильтр Блума на capacity ключей с долей ложных срабатываний error_rate.
+
+    Ключи — отпечатки notification_key(); позиции бит считаются из двух
+    половин отпечатка (схема Кирша — Митценмахера), поэтому проверка
+    занимает O(hashes) независимо от числа ключей. С path биты лежат
+    в файле, отображённом в память, и переживают перезапуск.
+    """
+
+    def __init__(
+        self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE,
+        path=None
+    ):
+        """Фильтр в памяти или в файле path."""
+        self.bits = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.path = path
+        self._file = None
+        size = (self.bits + 7) // 8
+        if path is None:
+            self._data = bytearray(size)
+            self._offset = 0
+        else:
+            self._data = self._open(path, size)
+            self._offset = BLOOM_HEADER.size
+
+    def _open(self, path, size):
+        header = BLOOM_HEADER.pack(BLOOM_MAGIC, self.bits, self.hashes)
+        total = BLOOM_HEADER.size + size
+        exists = os.path.exists(path)
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        if exists and (
+            os.path.getsize(path) != total
+            or self._file.read(BLOOM_HEADER.size) != header
+        ):
+            logging.warning(BLOOM_RESET_MESSAGE.format(
+                path=path, bits=self.bits, hashes=self.hashes
+            ))
+            exists = False
+            self._file.truncate(0)
+        if not exists:
+            self._file.seek(0)
+            self._file.write(header)
+            self._file.truncate(total)
+            self._file.flush()
+        return mmap.mmap(self._file.fileno(), total)
+
+    def _start(self, key):
+        bits = self.bits
+        return (
+            int.from_bytes(key[:8], 'little') % bits,
+            (int.from_bytes(key[8:16], 'little') | 1) % bits
+        )
+
+    def __contains__(self, key):
+        """Возможно ли, что key добавлен (ложно положительно с error_rate)."""
+        data = self._data
+        offset = self._offset
+        bits = self.bits
+        position, step = self._start(key)
+        for _ in range(self.hashes):
+            if not data[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+            position = (position + step) % bits
+        return True
+
+    def add(self, key):
+        """Добавление ключа."""
+        data = self._data
+        offset = self._offset
+        bits = self.bits
+        position, step = self._start(key)
+        for _ in range(self.hashes):
+            data[offset + (position >> 3)] |= 1 << (position & 7)
+            position = (position + step) % bits
+
+    def close(self):
+        """Сброс битов на диск и закрытие файла."""
+        if self._file is None:
+            return
+        self._data.flush()
+        self._data.close()
+        self._file.close()
+        self._file = None
+
+
+class DedupIndex:
+    """Индекс уже отправленных уведомлений с ограниченной памятью.
+
+    Последние lru_size ключей хранятся точно в LRU; с bloom (BloomFilter)
+    проверяется и вся история, в том числе до перезапуска, ценой доли
+    ложных срабатываний фильтра. Все операции — O(1).
+    """
+
+    def __init__(self, lru_size=DEFAULT_LRU_SIZE, bloom=None):
+        """Индекс с LRU на lru_size ключей и необязательным фильтром."""
+        self.lru_size = lru_size
+        self.bloom = bloom
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Число ключей в LRU."""
+        return len(self._recent)
+
+    def seen(self, key):
+        """Было ли уведомление с ключом key уже отправлено."""
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                duplicate = True
+            else:
+                duplicate = self.bloom is not None and key in self.bloom
+        if duplicate:
+            DUPLICATES_SKIPPED.inc()
+        return duplicate
+
+    def add(self, key):
+        """Отметка уведомления с ключом key отправленным."""
+        with self._lock:
+            self._recent[key] = None
+            self._recent.move_to_end(key)
+            if len(self._recent) > self.lru_size:
+                self._recent.popitem(last=False)
+            if self.bloom is not None:
+                self.bloom.add(key)
+
+    def close(self):
+        """Закрытие фильтра на диске."""
+        if self.bloom is not None:
+            self.bloom.close()
+
+
+def create_dedup_index(
+    lru_size=DEFAULT_LRU_SIZE, bloom_path=None, capacity=DEFAULT_CAPACITY,
+    error_rate=DEFAULT_ERROR_RATE
+):
+    """DedupIndex; с bloom_path — с фильтром Блума в этом файле."""
+    bloom = None
+    if bloom_path:
+        bloom = BloomFilter(capacity, error_rate, bloom_path)
+    return DedupIndex(lru_size, bloom)
@@ -0,0 +1,435 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from bot.changes import UNCHANGED, ChangeTracker
+from bot.clock import SYSTEM_CLOCK
+from bot.deadline import Deadline, DeadlineExceeded
+from bot.dedup import homework_key
+from bot.errors import ErrorTracker
+from bot.intervals import AdaptiveIntervalPolicy
+from bot.metrics import REGISTRY
+from bot.outbox import OUTBOX_STATS_MESSAGE
+from bot.retry import CircuitBreaker, RetryPolicy, is_api_failure
+from bot.scheduler import SCHEDULER_LAG_MESSAGE, PollScheduler
+from bot.session import (CONNECTION_STATS_MESSAGE, DEFAULT_POOL_CONNECTIONS,
+                         connection_stats, create_session)
+from bot.stats import LATENCY_STATS_MESSAGE, LatencyStats
+from bot.transport import RequestsPracticumTransport
+
+DEFAULT_MAX_WORKERS = 32
+DEFAULT_MAX_IN_FLIGHT = 1000
+DEFAULT_POLL_BUDGET = 30
+
+CYCLE_DONE_MESSAGE = (
+    'Цикл опроса завершён: аккаунтов {accounts}, за {elapsed:.2f} c.'
+)
+ACCOUNT_NO_UPDATES_MESSAGE = (
+    'Аккаунт "{account_id}": ' + homework.NO_HOMEWORK_UPDATES_MESSAGE
+)
+ACCOUNT_ERROR_MESSAGE = 'Аккаунт "{account_id}": {error}'
+ACCOUNT_DEADLINE_MESSAGE = (
+    'Аккаунт "{account_id}": опрос прерван по дедлайну: {error}'
+)
+
+POLL_SECONDS = REGISTRY.histogram(
+    'homework_poll_seconds', 'Длительность опроса одного аккаунта, сек.'
+)
+POLL_OVERRUNS = REGISTRY.counter(
+    'homework_poll_overruns_total', 'Опросы, превысившие бюджет времени.'
+)
+POLLS_PAUSED = REGISTRY.counter(
+    'homework_polls_paused_total',
+    'Опросы, пропущенные из-за разомкнутого breaker.'
+)
+
+
+class AccountState:
+    """Изменяемое состояние опроса одного аккаунта."""
+
+    __slots__ = (
+        'account', 'timestamp', 'errors',
+        'last_status', 'status_changed_at', 'idle_polls', 'notified',
+        'failures', 'paused'
+    )
+
+    def __init__(self, account, timestamp=0, notified=None):
+        """Начальное состояние: опрос с from_date=timestamp.
+
+        notified — уже отправленные статусы {homework_id: status}.
+        """
+        self.account = account
+        self.timestamp = timestamp
+        self.notified = notified or {}
+        self.errors = None
+        self.last_status = None
+        self.status_changed_at = None
+        self.idle_polls = 0
+        self.failures = 0
+        self.paused = False
+
+    def record_status(self, status, now):
+        """Учёт полученного статуса работы."""
+        self.last_status = status
+        self.status_changed_at = now
+        self.idle_polls = 0
+
+
+class BaseEngine:
+    """Общая часть синхронного и асинхронного движков опроса.
+
+    Хранит состояния аккаунтов и политики, разбирает ответ API и
+    решает, когда опрашивать аккаунт снова; ввод-вывод остаётся
+    наследникам.
+    """
+
+    def __init__(
+        self, accounts, bot, period=homework.RETRY_PERIOD,
+        poll_budget=DEFAULT_POLL_BUDGET,
+        request_timeout=homework.REQUEST_TIMEOUT,
+        send_timeout=homework.READ_TIMEOUT, interval_policy=None,
+        store=None, outbox=None, retry_policy=None, breaker=None,
+        endpoint=None, clock=None, error_window=homework.ERROR_WINDOW,
+        dedup=None
+    ):
+        """Подготовка состояний аккаунтов и политик опроса.
+
+        poll_budget — общий бюджет в секундах на опрос одного аккаунта:
+        он ограничивает таймауты запроса к API и проверяется перед
+        отправкой. Начатая отправка доводится до конца с send_timeout на
+        сообщение, чтобы обновление не ушло частично и не повторилось.
+        interval_policy задаёт интервал до следующего опроса аккаунта,
+        по умолчанию — AdaptiveIntervalPolicy. Если передан store
+        (CheckpointStore), from_date и отправленные статусы
+        восстанавливаются из него и сохраняются после каждого
+        обновления. С outbox (Outbox)
+        сообщения ставятся в очередь отправки, и опрос не ждёт Telegram.
+        После сбоев API аккаунт повторяется по retry_policy, а общий
+        breaker при деградации API приостанавливает все аккаунты.
+        endpoint заменяет адрес API, например, на локальную заглушку.
+        Все отметки времени берутся из clock (SystemClock или
+        SimulatedClock). Об ошибке с одним отпечатком аккаунт получает
+        не больше одного оповещения за error_window секунд. С dedup
+        (DedupIndex) уже отправленные уведомления не повторяются, даже
+        если статус пришёл снова после перезапуска.
+        """
+        self.bot = bot
+        self.period = period
+        self.poll_budget = poll_budget
+        self.request_timeout = request_timeout
+        self.send_timeout = send_timeout
+        self.endpoint = endpoint or homework.ENDPOINT
+        self.clock = clock or SYSTEM_CLOCK
+        self.error_window = error_window
+        self.latency = LatencyStats()
+        self.interval_policy = interval_policy or AdaptiveIntervalPolicy()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker(clock=self.clock.monotonic)
+        self.store = store
+        self.outbox = outbox
+        self.changes = ChangeTracker()
+        self.dedup = dedup
+        self.states = self._load_states(accounts)
+
+    def _load_states(self, accounts):
+        if self.store is None:
+            return [AccountState(account) for account in accounts]
+        timestamps = self.store.load_timestamps()
+        statuses = self.store.load_all_statuses()
+        return [
+            AccountState(
+                account,
+                timestamps.get(account.id, 0),
+                statuses.get(account.id)
+            )
+            for account in accounts
+        ]
+
+    def is_api_failure(self, error):
+        """Говорит ли ошибка запроса о деградации API."""
+        return is_api_failure(error)
+
+    def record_fetch(self, state, error=None):
+        """Учёт результата запроса к API в breaker и счётчике сбоев."""
+        if error is not None and self.is_api_failure(error):
+            state.failures += 1
+            self.breaker.record_failure()
+            return
+        if error is None:
+            state.failures = 0
+        self.breaker.record_success()
+
+    def collect_updates(self, state, response):
+        """Проверка ответа и сбор новых сообщений аккаунта.
+
+        Возвращает (messages, updates): тексты для ещё не отправленных
+        статусов от старых к новым и пары (homework_id, status). Ответ
+        UNCHANGED и ответ без работ сразу дают пустые списки.
+        """
+        if response is UNCHANGED:
+            state.idle_polls += 1
+            return [], []
+        homework.check_response(response)
+        homeworks = response['homeworks']
+        if not homeworks:
+            state.idle_polls += 1
+            self.changes.commit(state.account.id)
+            logging.debug(ACCOUNT_NO_UPDATES_MESSAGE.format(
+                account_id=state.account.id
+            ))
+            return [], []
+        extracted = homework.extract_updates(homeworks)
+        messages = []
+        updates = []
+        for record, message in zip(extracted.homeworks, extracted.messages):
+            update = (str(record.id), record.status)
+            if state.notified.get(update[0]) == update[1] or (
+                self.dedup is not None and self.dedup.seen(record.key)
+            ):
+                continue
+            messages.append(message)
+            updates.append(update)
+        state.record_status(
+            extracted.homeworks[-1].status, self.clock.monotonic()
+        )
+        return messages, updates
+
+    def commit_updates(self, state, response, updates):
+        """Сообщения доставлены: сдвиг from_date и контрольная точка."""
+        state.notified.update(updates)
+        if self.dedup is not None:
+            for item in response['homeworks']:
+                self.dedup.add(homework_key(item))
+        timestamp = response.get('current_date', state.timestamp)
+        state.timestamp = timestamp
+        if self.store is not None:
+            self.store.save(state.account.id, timestamp, updates)
+        self.changes.commit(state.account.id)
+
+    def error_message(self, state, error):
+        """Запись ошибки в лог; текст для чата или None в пределах окна.
+
+        После доставки текста нужно вызвать state.errors.reported(error).
+        """
+        if state.errors is None:
+            state.errors = ErrorTracker(
+                self.error_window, clock=self.clock.monotonic
+            )
+        message = state.errors.record(error)
+        if message is None:
+            logging.error(ACCOUNT_ERROR_MESSAGE.format(
+                account_id=state.account.id,
+                error=state.errors.repeated_message(error)
+            ))
+            return None
+        logging.exception(ACCOUNT_ERROR_MESSAGE.format(
+            account_id=state.account.id, error=error
+        ))
+        return message
+
+    def record_poll(self, duration, overrun):
+        """Учёт длительности опроса в статистике и метриках."""
+        overrun = overrun or duration > self.poll_budget
+        self.latency.record(duration, overrun)
+        POLL_SECONDS.observe(duration)
+        if overrun:
+            POLL_OVERRUNS.inc()
+
+    def log_deadline(self, state, error):
+        """Запись в лог прерванного по дедлайну опроса."""
+        logging.warning(ACCOUNT_DEADLINE_MESSAGE.format(
+            account_id=state.account.id, error=error
+        ))
+
+    def next_interval(self, state):
+        """Интервал до следующего опроса с учётом сбоев и breaker."""
+        if state.paused:
+            return self.breaker.retry_in() + self.retry_policy.delay(0)
+        if state.failures:
+            return self.retry_policy.delay(state.failures)
+        return self.interval_policy.next_interval(
+            state, self.clock.monotonic()
+        )
+
+    def log_stats(self):
+        """Запись в лог задержек опроса и состояния очереди отправки."""
+        logging.debug(
+            LATENCY_STATS_MESSAGE.format(**self.latency.summary()._asdict())
+        )
+        if self.outbox is not None:
+            logging.debug(OUTBOX_STATS_MESSAGE.format(
+                size=len(self.outbox), age=self.outbox.oldest_age(),
+                sent=self.outbox.sent, dropped=self.outbox.dropped
+            ))
+
+
+class PollingEngine(BaseEngine):
+    """Параллельный опрос множества аккаунтов в одном процессе.
+
+    Каждый аккаунт проходит тот же конвейер, что и в homework.main():
+    запрос к API, check_response, extract_updates и отправка в Telegram.
+    Число одновременных запросов ограничено max_workers.
+    """
+
+    def __init__(
+        self, accounts, bot, max_workers=DEFAULT_MAX_WORKERS,
+        http_get=None, session=None, transport=None, **options
+    ):
+        """Подготовка пула потоков и транспорта к API.
+
+        Запросы идут через http_get, если он передан, иначе через
+        transport (PracticumTransport), по умолчанию —
+        RequestsPracticumTransport поверх session или пула keep-alive
+        соединений размером max_workers. Остальные параметры описаны
+        в BaseEngine.
+        """
+        super().__init__(accounts, bot, **options)
+        self.scheduler = PollScheduler(
+            self.period, clock=self.clock.monotonic, sleep=self.clock.sleep
+        )
+        self.max_workers = max(1, min(max_workers, len(self.states) or 1))
+        if http_get is None and transport is None:
+            transport = RequestsPracticumTransport(session or create_session(
+                pool_connections=DEFAULT_POOL_CONNECTIONS,
+                pool_maxsize=self.max_workers
+            ))
+        self.transport = transport
+        self.session = getattr(transport, 'session', session)
+        self.http_get = http_get or transport.get
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='poller'
+        )
+
+    def poll_account(self, state):
+        """Один шаг опроса аккаунта; исключения не выходят наружу."""
+        state.paused = not self.breaker.allow()
+        if state.paused:
+            POLLS_PAUSED.inc()
+            return
+        deadline = Deadline(self.poll_budget, self.clock.monotonic)
+        started = self.clock.monotonic()
+        overrun = False
+        try:
+            self._poll(state, deadline)
+        except DeadlineExceeded as error:
+            overrun = True
+            self.log_deadline(state, error)
+        except Exception as error:
+            message = self.error_message(state, error)
+            if message and self.send(state.account.chat_id, message):
+                state.errors.reported(error)
+        finally:
+            self.record_poll(self.clock.monotonic() - started, overrun)
+
+    def _fetch(self, state, deadline):
+        try:
+            response = homework.fetch_homework_statuses(
+                self.http_get, state.account.headers, state.timestamp,
+                timeout=deadline.timeout(self.request_timeout),
+                endpoint=self.endpoint, changes=self.changes,
+                key=state.account.id
+            )
+        except Exception as error:
+            self.record_fetch(state, error)
+            raise
+        self.record_fetch(state)
+        return response
+
+    def _poll(self, state, deadline):
+        response = self._fetch(state, deadline)
+        messages, updates = self.collect_updates(state, response)
+        if response is UNCHANGED or not response['homeworks']:
+            return
+        deadline.check()
+        if all(
+            self.send(state.account.chat_id, chunk)
+            for chunk in homework.coalesce_messages(messages)
+        ):
+            self.commit_updates(state, response, updates)
+
+    def send(self, chat_id, message):
+        """Отправка сообщения или постановка в outbox, если он задан."""
+        if self.outbox is not None:
+            return self.outbox.put(chat_id, message)
+        return homework.send_message_to_chat(
+            self.bot, chat_id, message, timeout=self.send_timeout
+        )
+
+    def run_cycle(self):
+        """Опрос всех аккаунтов сразу с ограниченной параллельностью."""
+        started = self.clock.monotonic()
+        list(self._executor.map(self.poll_account, self.states))
+        elapsed = self.clock.monotonic() - started
+        logging.debug(CYCLE_DONE_MESSAGE.format(
+            accounts=len(self.states), elapsed=elapsed
+        ))
+        self.log_stats()
+        return elapsed
+
+    def log_stats(self):
+        """Запись в лог задержек опроса, расписания и соединений."""
+        super().log_stats()
+        logging.debug(SCHEDULER_LAG_MESSAGE.format(
+            **self.scheduler.lag.summary()._asdict()
+        ))
+        if self.session is not None:
+            logging.debug(CONNECTION_STATS_MESSAGE.format(
+                **connection_stats(self.session)._asdict()
+            ))
+
+    def dispatch(self, state, due=None):
+        """Передать опрос аккаунта в пул, дождавшись свободного потока.
+
+        Если передана плановая отметка due, после опроса аккаунт
+        возвращается в расписание с интервалом от next_interval().
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self.poll_account, state)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        def on_done(_):
+            self._slots.release()
+            if due is not None:
+                self.scheduler.add_at(state, self.scheduler.next_due(
+                    due, self.next_interval(state)
+                ))
+
+        future.add_done_callback(on_done)
+        return future
+
+    def run_forever(self):
+        """Бесконечный опрос аккаунтов по расписанию.
+
+        Аккаунты равномерно распределены по периоду, а следующий
+        опрос назначается от плановой отметки, а не от окончания
+        предыдущего, поэтому интервалы не дрейфуют.
+        """
+        self.scheduler.spread(self.states)
+        dispatched = 0
+        try:
+            while True:
+                state, due = self.scheduler.wait_next()
+                self.dispatch(state, due)
+                dispatched += 1
+                if self.states and dispatched % len(self.states) == 0:
+                    self.log_stats()
+        finally:
+            self.close()
+
+    def close(self):
+        """Остановка пула потоков, закрытие транспорта и хранилищ."""
+        self._executor.shutdown(wait=True)
+        if self.transport is not None:
+            self.transport.close()
+        elif self.session is not None:
+            self.session.close()
+        if self.store is not None:
+            self.store.close()
+        if self.dedup is not None:
+            self.dedup.close()
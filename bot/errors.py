@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from bot.metrics import REGISTRY
+
+DEFAULT_WINDOW = 60 * 60
+DEFAULT_MAX_FINGERPRINTS = 256
+
+ERROR_ALERT_MESSAGE = 'Application Error: {error}'
+ERROR_SUMMARY_MESSAGE = (
+    'Application Error: {name} ×{count} за {period}. Последняя: {error}'
+)
+ERROR_REPEATED_MESSAGE = (
+    'Повтор ошибки {name} (×{count} с последнего оповещения): {error}'
+)
+
+ERRORS = REGISTRY.counter(
+    'homework_errors_total', 'Ошибки цикла опроса по отпечаткам.',
+    ('type', 'stage', 'status_code')
+)
+
+Fingerprint = namedtuple('Fingerprint', ('type', 'stage', 'status_code'))
+ErrorSummary = namedtuple(
+    'ErrorSummary', ('fingerprint', 'total', 'pending', 'last_seen')
+)
+
+
+def mark_stage(error, stage):
+    """Отметка этапа конвейера, на котором возникла ошибка.
+
+    Сохраняется самый внутренний этап: внешние обёртки метку не
+    перезаписывают.
+    """
+    if getattr(error, 'stage', None) is None:
+        try:
+            error.stage = stage
+        except AttributeError:
+            pass
+    return error
+
+
+def fingerprint(error):
+    """Отпечаток ошибки: тип исключения, этап и status_code ответа.
+
+    В отпечаток не входит текст ошибки, поэтому ошибки с меняющимися
+    параметрами запроса считаются одной.
+    """
+    status_code = getattr(error, 'status_code', None)
+    return Fingerprint(
+        type(error).__name__,
+        getattr(error, 'stage', None) or '',
+        '' if status_code is None else str(int(status_code))
+    )
+
+
+def format_period(seconds):
+    """Длительность для сообщения: секунды, минуты или часы."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f'{seconds} с'
+    if seconds < 2 * 60 * 60:
+        return f'{seconds // 60} мин'
+    return f'{seconds // (60 * 60)} ч'
+
+
+class _Entry:
+    __slots__ = ('total', 'pending', 'reported_at', 'last_seen')
+
+    def __init__(self):
+        self.total = 0
+        self.pending = 0
+        self.reported_at = None
+        self.last_seen = None
+
+
+class ErrorTracker:
+    """Учёт повторяющихся ошибок по отпечаткам.
+
+    Для каждого отпечатка считается общее число ошибок и число ошибок
+    с последнего оповещения. Оповещение по отпечатку отдаётся не чаще
+    раза в window секунд; повторы внутри окна копятся и попадают в
+    сводку следующего оповещения. Хранятся последние max_fingerprints
+    отпечатков, давно не встречавшиеся вытесняются.
+    """
+
+    def __init__(
+        self, window=DEFAULT_WINDOW, max_fingerprints=DEFAULT_MAX_FINGERPRINTS,
+        clock=time.monotonic
+    ):
+        """Трекер с окном window секунд и часами clock."""
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Число хранимых отпечатков."""
+        return len(self._entries)
+
+    def record(self, error):
+        """Учёт ошибки; текст оповещения или None, если окно не истекло.
+
+        Оповещение считается отправленным только после reported(), так
+        что неудачная отправка повторится при следующей ошибке.
+        """
+        key = fingerprint(error)
+        ERRORS.labels(*key).inc()
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+                if len(self._entries) > self.max_fingerprints:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry.total += 1
+            entry.pending += 1
+            entry.last_seen = now
+            if entry.reported_at is None:
+                return ERROR_ALERT_MESSAGE.format(error=error)
+            elapsed = now - entry.reported_at
+            if elapsed < self.window:
+                return None
+            if entry.pending == 1:
+                return ERROR_ALERT_MESSAGE.format(error=error)
+            return ERROR_SUMMARY_MESSAGE.format(
+                name=key.type, count=entry.pending,
+                period=format_period(elapsed), error=error
+            )
+
+    def reported(self, error):
+        """Оповещение об ошибке доставлено: начинается новое окно."""
+        with self._lock:
+            entry = self._entries.get(fingerprint(error))
+            if entry is not None:
+                entry.reported_at = self._clock()
+                entry.pending = 0
+
+    def repeated_message(self, error):
+        """Строка лога для ошибки, оповещение о которой подавлено."""
+        key = fingerprint(error)
+        entry = self._entries.get(key)
+        return ERROR_REPEATED_MESSAGE.format(
+            name=key.type, count=entry.pending if entry else 1, error=error
+        )
+
+    def summary(self):
+        """Сводка по отпечаткам, от недавних к давним."""
+        with self._lock:
+            return [
+                ErrorSummary(key, entry.total, entry.pending, entry.last_seen)
+                for key, entry in reversed(self._entries.items())
+            ]
@@ -0,0 +1,64 @@
+import time
+
+import homework
+
+MINUTE = 60
+
+# Статус -> (интервал опроса, предел роста интервала при простое), сек.
+STATUS_INTERVALS = {
+    'reviewing': (2 * MINUTE, homework.RETRY_PERIOD),
+    'rejected': (homework.RETRY_PERIOD, 30 * MINUTE),
+    'approved': (30 * MINUTE, 60 * MINUTE),
+}
+DEFAULT_INTERVAL = (homework.RETRY_PERIOD, 60 * MINUTE)
+RECENT_CHANGE_WINDOW = 30 * MINUTE
+RECENT_CHANGE_INTERVAL = 2 * MINUTE
+IDLE_BACKOFF = 1.5
+
+
+class FixedIntervalPolicy:
+    """Постоянный интервал опроса, как в homework.main()."""
+
+    def __init__(self, interval=homework.RETRY_PERIOD):
+        """Интервал interval секунд для всех аккаунтов."""
+        self.interval = interval
+
+    def next_interval(self, state, now=None):
+        """Интервал до следующего опроса аккаунта."""
+        return self.interval
+
+
+class AdaptiveIntervalPolicy:
+    """Интервал опроса по последнему статусу и давности его изменения.
+
+    Работы на ревью и недавно изменившиеся статусы опрашиваются чаще,
+    принятые работы и аккаунты без изменений — реже: интервал растёт в
+    IDLE_BACKOFF раз за каждый опрос без обновлений до предела статуса.
+    """
+
+    def __init__(
+        self, status_intervals=None, default=DEFAULT_INTERVAL,
+        recent_window=RECENT_CHANGE_WINDOW,
+        recent_interval=RECENT_CHANGE_INTERVAL,
+        idle_backoff=IDLE_BACKOFF, clock=time.monotonic
+    ):
+        """Настройка интервалов; значения по умолчанию — константы модуля."""
+        self.status_intervals = status_intervals or STATUS_INTERVALS
+        self.default = default
+        self.recent_window = recent_window
+        self.recent_interval = recent_interval
+        self.idle_backoff = idle_backoff
+        self._clock = clock
+
+    def next_interval(self, state, now=None):
+        """Интервал до следующего опроса аккаунта state."""
+        now = self._clock() if now is None else now
+        interval, cap = self.status_intervals.get(
+            state.last_status, self.default
+        )
+        if (
+            state.status_changed_at is not None
+            and now - state.status_changed_at < self.recent_window
+        ):
+            return min(interval, self.recent_interval)
+        return min(cap, interval * self.idle_backoff ** state.idle_polls)
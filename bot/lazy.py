@@ -0,0 +1,48 @@
+import importlib.util
+import os
+import sys
+
+ENV_FILE_NAME = '.env'
+
+
+def lazy_import(name):
+    """Модуль name, который загрузится при первом обращении к атрибуту.
+
+    Уже загруженный модуль возвращается как есть. Отложенный модуль
+    сразу попадает в sys.modules, поэтому import name в другом месте
+    получит тот же объект, а monkeypatch его атрибутов работает как
+    с обычным модулем.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def load_dotenv_near(path):
+    """Загрузка ближайшего к path файла .env вверх по каталогам.
+
+    python-dotenv импортируется, только если файл найден: на сервере
+    переменные задаются окружением, и .env там обычно нет.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    while True:
+        env_file = os.path.join(directory, ENV_FILE_NAME)
+        if os.path.isfile(env_file):
+            from dotenv import load_dotenv
+            return load_dotenv(env_file)
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return False
+        directory = parent
@@ -0,0 +1,87 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from bot.metrics import REGISTRY
+
+DEFAULT_QUEUE_SIZE = 10000
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    'homework_log_records_dropped_total',
+    'Записи лога, отброшенные из-за переполнения очереди.'
+)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler, который никогда не ждёт ввода-вывода лога.
+
+    Записи кладутся в ограниченную очередь без блокировки. При
+    переполнении записи ниже WARNING отбрасываются, а ради записи
+    WARNING и выше вытесняется самая старая запись очереди. Сообщение
+    и traceback форматирует поток QueueListener.
+    """
+
+    def __init__(self, log_queue):
+        """Обработчик, пишущий в очередь log_queue."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        """Подстановка аргументов; traceback остаётся слушателю."""
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        """Постановка записи в очередь по политике переполнения."""
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                self._drop()
+                return
+        try:
+            self.queue.get_nowait()
+            self._drop()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+    def _drop(self):
+        self.dropped += 1
+        LOG_RECORDS_DROPPED.inc()
+
+
+class BlockingSentinelQueueListener(QueueListener):
+    """QueueListener, чей stop() дожидается места в полной очереди."""
+
+    def enqueue_sentinel(self):
+        """Маркер остановки ставится после уже принятых записей."""
+        self.queue.put(self._sentinel)
+
+
+def create_file_handler(path, max_bytes=0, backup_count=0):
+    """Файловый обработчик; с max_bytes — с ротацией по размеру."""
+    if max_bytes:
+        return RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8'
+        )
+    return logging.FileHandler(path, encoding='utf-8')
+
+
+def create_queue_logging(handlers, max_size=DEFAULT_QUEUE_SIZE):
+    """Обработчик для логгера и слушатель, пишущий в handlers.
+
+    Слушателя нужно запустить start() и остановить stop() при выходе.
+    """
+    log_queue = queue.Queue(max_size)
+    listener = BlockingSentinelQueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    return DroppingQueueHandler(log_queue), listener
@@ -0,0 +1,324 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from http import HTTPStatus
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 30
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+# Методы дочерней метрики, доступные у семейства без меток.
+CHILD_METHODS = ('inc', 'dec', 'set', 'set_function', 'observe', 'time')
+
+DUPLICATE_METRIC_MESSAGE = 'Метрика "{name}" уже зарегистрирована.'
+LABELS_MISMATCH_MESSAGE = (
+    'Метрика "{name}" ожидает метки {expected}, передано: {actual}.'
+)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value, quote=True):
+    value = str(value).replace('\\', r'\\').replace('\n', r'\n')
+    return value.replace('"', r'\"') if quote else value
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in pairs
+    ) + '}'
+
+
+# Обновления метрик идут без блокировок: под GIL инкремент теряется,
+# только если поток переключится посреди операции. Для метрик такая
+# погрешность допустима, а блокировка удвоила бы цену наблюдения.
+
+
+class Counter:
+    """Монотонный счётчик."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        """Счётчик с нулевым значением."""
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Увеличение на amount."""
+        self.value += amount
+
+    def samples(self, name, labels):
+        """Строки экспозиции."""
+        yield name, labels, self.value
+
+
+class Gauge:
+    """Текущее значение; может вычисляться функцией при экспорте."""
+
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        """Показатель с нулевым значением."""
+        self.value = 0
+        self.function = None
+
+    def set(self, value):
+        """Установка значения."""
+        self.value = value
+
+    def inc(self, amount=1):
+        """Увеличение на amount."""
+        self.value += amount
+
+    def dec(self, amount=1):
+        """Уменьшение на amount."""
+        self.value -= amount
+
+    def set_function(self, function):
+        """Значение будет браться из function() при каждом экспорте."""
+        self.function = function
+
+    def samples(self, name, labels):
+        """Строки экспозиции."""
+        yield name, labels, (
+            self.value if self.function is None else self.function()
+        )
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        """Пустая гистограмма с верхними границами корзин bounds."""
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Учёт одного наблюдения."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self):
+        """Контекстный менеджер, замеряющий длительность блока."""
+        return _Timer(self)
+
+    def samples(self, name, labels):
+        """Строки экспозиции: накопленные корзины, сумма и число."""
+        counts = list(self.counts)
+        total = self.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float('inf'),), counts):
+            cumulative += count
+            yield name + '_bucket', labels + (
+                ('le', _format_value(bound)),
+            ), cumulative
+        yield name + '_sum', labels, total
+        yield name + '_count', labels, cumulative
+
+
+class _Timer:
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class MetricFamily:
+    """Метрика с именем, описанием и набором меток.
+
+    Дочерние метрики для конкретных значений меток создаются один раз
+    в labels(); на горячем пути их стоит получать заранее. У семейства
+    без меток методы единственной дочерней метрики (inc(), observe()
+    и т. д.) вызываются напрямую.
+    """
+
+    def __init__(self, name, documentation, kind, factory, label_names=()):
+        """Семейство метрик kind, дочерние создаются через factory."""
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            child = self._children[()] = factory()
+            for method in CHILD_METHODS:
+                if hasattr(child, method):
+                    setattr(self, method, getattr(child, method))
+
+    def labels(self, *values, **named):
+        """Дочерняя метрика для значений меток."""
+        if named:
+            values = tuple(named.get(name) for name in self.label_names)
+        values = tuple(str(value) for value in values)
+        if len(values) != len(self.label_names) or None in values:
+            raise ValueError(LABELS_MISMATCH_MESSAGE.format(
+                name=self.name, expected=self.label_names,
+                actual=values or named
+            ))
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def render(self):
+        """Текст метрики в формате экспозиции Prometheus."""
+        lines = [
+            f'# HELP {self.name} {_escape(self.documentation, quote=False)}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        with self._lock:
+            children = sorted(self._children.items())
+        for values, child in children:
+            labels = tuple(zip(self.label_names, values))
+            for name, pairs, value in child.samples(self.name, labels):
+                lines.append(
+                    f'{name}{_format_labels(pairs)} {_format_value(value)}'
+                )
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        """Пустой реестр."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name, documentation, kind, factory, label_names):
+        with self._lock:
+            if name in self._metrics:
+                raise ValueError(DUPLICATE_METRIC_MESSAGE.format(name=name))
+            metric = self._metrics[name] = MetricFamily(
+                name, documentation, kind, factory, label_names
+            )
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        """Регистрация счётчика."""
+        return self._register(
+            name, documentation, 'counter', Counter, label_names
+        )
+
+    def gauge(self, name, documentation, label_names=()):
+        """Регистрация показателя."""
+        return self._register(name, documentation, 'gauge', Gauge, label_names)
+
+    def histogram(
+        self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS
+    ):
+        """Регистрация гистограммы."""
+        return self._register(
+            name, documentation, 'histogram',
+            functools.partial(Histogram, buckets), label_names
+        )
+
+    def get(self, name):
+        """Метрика по имени или None."""
+        return self._metrics.get(name)
+
+    def render(self):
+        """Все метрики в формате экспозиции Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+def timed(histogram, errors=None):
+    """Декоратор: длительность вызовов в histogram, исключения в errors."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def _http_server_classes():
+    # http.server тянет за собой ssl и email, поэтому загружается только
+    # при запуске эндпоинта, а не при импорте модуля метрик.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != METRICS_PATH:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            body = self.server.registry.render().encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer, MetricsHandler
+
+
+class MetricsServer:
+    """HTTP-эндпоинт /metrics в фоновом потоке."""
+
+    def __init__(self, registry, port, host='127.0.0.1'):
+        """Сервер метрик registry на host:port (0 — свободный порт)."""
+        server_class, handler_class = _http_server_classes()
+        self._server = server_class((host, port), handler_class)
+        self._server.daemon_threads = True
+        self._server.registry = registry
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.1,), daemon=True,
+            name='metrics'
+        )
+
+    @property
+    def url(self):
+        """Адрес эндпоинта метрик."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{METRICS_PATH}'
+
+    def start(self):
+        """Запуск сервера."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Остановка сервера."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+
+import homework
+from bot.metrics import REGISTRY
+from bot.outbox_queue import MemoryOutboxQueue
+
+GLOBAL_RATE = 30
+PER_CHAT_RATE = 1
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_DELAY = 1.0
+TOO_MANY_REQUESTS = 429
+
+OUTBOX_FULL_MESSAGE = (
+    'Очередь отправки заполнена ({size}), сообщение в чат {chat_id} '
+    'не принято.'
+)
+RETRY_AFTER_MESSAGE = (
+    'Telegram ограничил отправку в чат {chat_id}: повтор через '
+    '{retry_after} c.'
+)
+SEND_RETRY_MESSAGE = (
+    'Ошибка отправки в чат {chat_id} (попытка {attempt}): {error}'
+)
+SEND_DROPPED_MESSAGE = (
+    'Сообщение в чат {chat_id} не доставлено за {attempts} попыток: '
+    '{error}'
+)
+
+OUTBOX_STATS_MESSAGE = (
+    'Очередь отправки: в очереди {size}, старейшему {age:.1f} c, '
+    'отправлено {sent}, потеряно {dropped}.'
+)
+
+OUTBOX_SIZE = REGISTRY.gauge(
+    'homework_outbox_size', 'Недоставленных сообщений в очереди отправки.'
+)
+OUTBOX_OLDEST_AGE = REGISTRY.gauge(
+    'homework_outbox_oldest_age_seconds',
+    'Возраст самого старого недоставленного сообщения, сек.'
+)
+OUTBOX_SENT = REGISTRY.counter(
+    'homework_outbox_sent_total', 'Доставленные сообщения.'
+)
+OUTBOX_DROPPED = REGISTRY.counter(
+    'homework_outbox_dropped_total', 'Сообщения, отброшенные после попыток.'
+)
+SEND_SECONDS = homework.STAGE_SECONDS.labels('send_message')
+SEND_ERRORS = homework.STAGE_ERRORS.labels('send_message')
+
+
+class TokenBucket:
+    """Ограничитель частоты «маркерная корзина».
+
+    reserve() сразу списывает маркер, допуская долг, и возвращает время
+    ожидания, после которого отправка укладывается в лимит.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at', '_clock')
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """Корзина на rate маркеров в секунду, не больше capacity."""
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self._clock = clock
+        self.updated_at = clock()
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def reserve(self):
+        """Списать маркер и вернуть необходимую паузу в секундах."""
+        now = self._clock()
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def penalize(self, delay):
+        """Запретить отправку на delay секунд (retry_after от Telegram)."""
+        now = self._clock()
+        self._refill(now)
+        self.tokens = min(self.tokens, -delay * self.rate)
+
+
+def retry_after(error):
+    """Пауза из ответа 429 Telegram или None для прочих ошибок."""
+    if getattr(error, 'error_code', None) != TOO_MANY_REQUESTS:
+        return None
+    result = getattr(error, 'result_json', None) or {}
+    return (result.get('parameters') or {}).get('retry_after', RETRY_DELAY)
+
+
+class Outbox:
+    """Асинхронная очередь отправки в Telegram с пулом воркеров.
+
+    Опрос только ставит сообщения в очередь; воркеры отправляют их,
+    соблюдая общий лимит Telegram (GLOBAL_RATE сообщений в секунду) и
+    лимит на чат (PER_CHAT_RATE), и повторяют отправку после 429 не
+    раньше retry_after. Лимит на чат и retry_after хранит очередь как
+    время готовности чата, и воркер забирает только сообщения готовых
+    чатов: пауза одного чата не задерживает остальные. Маркер общего
+    лимита списывается непосредственно перед отправкой. Очередь —
+    MemoryOutboxQueue или постоянная SqliteOutboxQueue.
+    """
+
+    def __init__(
+        self, bot, workers=DEFAULT_WORKERS, global_rate=GLOBAL_RATE,
+        per_chat_rate=PER_CHAT_RATE, max_size=DEFAULT_MAX_SIZE,
+        max_attempts=DEFAULT_MAX_ATTEMPTS, queue=None,
+        clock=time.monotonic, wall_clock=time.time, sleep=time.sleep
+    ):
+        """Очередь на max_size сообщений; воркеры стартуют в start()."""
+        self.bot = bot
+        self.workers = workers
+        self.per_chat_rate = per_chat_rate
+        self.max_attempts = max_attempts
+        self.sent = 0
+        self.dropped = 0
+        # Пустая очередь ложна (__len__), поэтому сравнение с None.
+        self.queue = (
+            queue if queue is not None
+            else MemoryOutboxQueue(max_size, clock=wall_clock)
+        )
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+        self._global_bucket = TokenBucket(global_rate, clock=clock)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def __len__(self):
+        """Число недоставленных сообщений."""
+        return len(self.queue)
+
+    def oldest_age(self):
+        """Возраст самого старого недоставленного сообщения, сек."""
+        return self.queue.oldest_age()
+
+    def put(self, chat_id, text):
+        """Поставить сообщение в очередь; False, если она заполнена."""
+        if self.queue.put(chat_id, text):
+            return True
+        logging.error(OUTBOX_FULL_MESSAGE.format(
+            size=self.queue.max_size, chat_id=chat_id
+        ))
+        return False
+
+    def start(self):
+        """Запуск воркеров."""
+        OUTBOX_SIZE.set_function(self.__len__)
+        OUTBOX_OLDEST_AGE.set_function(self.oldest_age)
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f'outbox-{index}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Остановка воркеров; недоставленное остаётся в очереди."""
+        self.queue.close()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        OUTBOX_SIZE.set_function(None)
+        OUTBOX_OLDEST_AGE.set_function(None)
+        self.queue.disconnect()
+
+    def join(self):
+        """Дождаться отправки всех принятых сообщений."""
+        self.queue.join()
+
+    def _next_send_at(self):
+        return self._wall_clock() + 1 / self.per_chat_rate
+
+    def _wait_for_global_slot(self):
+        with self._lock:
+            delay = self._global_bucket.reserve()
+        if delay > 0:
+            self._sleep(delay)
+
+    def _work(self):
+        while True:
+            message = self.queue.get()
+            if message is None:
+                return
+            self.send(message)
+
+    def send(self, message):
+        """Отправка готового сообщения в пределах общего лимита."""
+        self._wait_for_global_slot()
+        self.deliver(message)
+
+    def deliver(self, message):
+        """Одна попытка отправки; при неудаче — повтор через очередь."""
+        started = time.perf_counter()
+        try:
+            self.bot.send_message(chat_id=message.chat_id, text=message.text)
+        except Exception as error:
+            SEND_ERRORS.inc()
+            self._retry(message, error)
+            return
+        finally:
+            SEND_SECONDS.observe(time.perf_counter() - started)
+        self.queue.ack(message, self._next_send_at())
+        OUTBOX_SENT.inc()
+        with self._lock:
+            self.sent += 1
+        logging.debug(homework.SENT_TO_TG_MESSAGE.format(message=message.text))
+
+    def _retry(self, message, error):
+        delay = retry_after(error)
+        if delay is not None:
+            logging.warning(RETRY_AFTER_MESSAGE.format(
+                chat_id=message.chat_id, retry_after=delay
+            ))
+        else:
+            logging.warning(SEND_RETRY_MESSAGE.format(
+                chat_id=message.chat_id, attempt=message.attempt, error=error
+            ))
+        if delay is None and message.attempt >= self.max_attempts:
+            logging.error(SEND_DROPPED_MESSAGE.format(
+                chat_id=message.chat_id, attempts=message.attempt,
+                error=error
+            ))
+            self.queue.ack(message, self._next_send_at())
+            OUTBOX_DROPPED.inc()
+            with self._lock:
+                self.dropped += 1
+            return
+        now = self._wall_clock()
+        self.queue.retry(message._replace(
+            attempt=message.attempt + (delay is None),
+            not_before=now + (
+                RETRY_DELAY * message.attempt if delay is None else delay
+            )
+        ), self._next_send_at() if delay is None else now + delay)
@@ -0,0 +1,303 @@
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+
+OutboxMessage = namedtuple(
+    'OutboxMessage',
+    ('id', 'chat_id', 'text', 'attempt', 'not_before', 'created_at')
+)
+
+OUTBOX_SCHEMA = '''CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    attempt INTEGER NOT NULL DEFAULT 1,
+    not_before REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    claimed INTEGER NOT NULL DEFAULT 0
+)'''
+OUTBOX_INDEX = (
+    'CREATE INDEX IF NOT EXISTS outbox_chat ON outbox (chat_id, id)'
+)
+OUTBOX_CHATS_SCHEMA = '''CREATE TABLE IF NOT EXISTS outbox_chats (
+    chat_id TEXT PRIMARY KEY,
+    ready_at REAL NOT NULL
+)'''
+
+
+class _BlockingOutboxQueue:
+    """Общая логика ожидания и учёта незавершённых сообщений.
+
+    Сообщение остаётся в очереди, пока воркер не вызовет ack();
+    retry() возвращает его в очередь с новыми attempt и not_before.
+    Для каждого чата хранится время, раньше которого в него нельзя
+    отправлять (ready_at из ack() и retry()). Воркер получает только
+    первое сообщение чата, который сейчас готов к отправке и в который
+    не отправляется другое сообщение, поэтому чат на паузе не занимает
+    воркер, а порядок сообщений в чате сохраняется.
+    """
+
+    def __init__(self, max_size, clock=time.time):
+        """Очередь не более чем на max_size сообщений."""
+        self.max_size = max_size
+        self._clock = clock
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, chat_id, text):
+        """Принять сообщение; False, если очередь заполнена."""
+        with self._condition:
+            if self._count() >= self.max_size:
+                return False
+            self._insert(chat_id, text, self._clock())
+            self._condition.notify()
+        return True
+
+    def claim(self):
+        """Забрать готовое к отправке сообщение, не дожидаясь его.
+
+        Возвращает (message, None) или (None, wake_at), где wake_at —
+        время, когда сообщение станет готово, или None, если ждать
+        нечего.
+        """
+        with self._condition:
+            return self._claim(self._clock())
+
+    def get(self):
+        """Забрать следующее готовое сообщение; None после close()."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                now = self._clock()
+                message, wake_at = self._claim(now)
+                if message is not None:
+                    return message
+                self._condition.wait(
+                    None if wake_at is None else wake_at - now
+                )
+
+    def ack(self, message, ready_at=0.0):
+        """Сообщение доставлено или отброшено: удалить из очереди.
+
+        В чат сообщения снова можно отправлять с ready_at.
+        """
+        with self._condition:
+            self._delete(message, ready_at)
+            self._condition.notify_all()
+
+    def retry(self, message, ready_at=0.0):
+        """Вернуть сообщение первым в свой чат для повторной попытки."""
+        with self._condition:
+            self._release(message, ready_at)
+            self._condition.notify_all()
+
+    def close(self):
+        """Разбудить и остановить всех ожидающих в get()."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def disconnect(self):
+        """Освобождение ресурсов хранилища после остановки воркеров."""
+
+    def join(self):
+        """Дождаться, пока очередь опустеет."""
+        with self._condition:
+            while self._count():
+                self._condition.wait()
+
+    def __len__(self):
+        """Число недоставленных сообщений, включая отправляемые."""
+        with self._condition:
+            return self._count()
+
+    def oldest_age(self):
+        """Возраст самого старого недоставленного сообщения, сек."""
+        with self._condition:
+            created_at = self._oldest_created_at()
+        return 0.0 if created_at is None else self._clock() - created_at
+
+
+class MemoryOutboxQueue(_BlockingOutboxQueue):
+    """Очередь отправки в памяти процесса.
+
+    Сообщения лежат в очередях по чатам, а свободные чаты с сообщениями —
+    в куче по времени готовности первого сообщения, поэтому выбор
+    готового сообщения — O(log числа чатов).
+    """
+
+    def __init__(self, max_size, clock=time.time):
+        """Пустая очередь в памяти."""
+        super().__init__(max_size, clock)
+        self._chats = {}
+        self._ready_at = {}
+        self._ready = []
+        self._in_flight = {}
+        self._busy = set()
+        self._size = 0
+        self._ids = itertools.count(1)
+
+    def _count(self):
+        return self._size
+
+    def _schedule(self, chat_id):
+        messages = self._chats.get(chat_id)
+        if not messages:
+            self._chats.pop(chat_id, None)
+            return
+        ready_at = max(
+            messages[0].not_before, self._ready_at.get(chat_id, 0.0)
+        )
+        heapq.heappush(self._ready, (ready_at, messages[0].id, chat_id))
+
+    def _insert(self, chat_id, text, now):
+        message = OutboxMessage(next(self._ids), chat_id, text, 1, 0.0, now)
+        self._size += 1
+        messages = self._chats.get(chat_id)
+        if messages is None:
+            messages = self._chats[chat_id] = deque()
+        messages.append(message)
+        if len(messages) == 1 and chat_id not in self._busy:
+            self._schedule(chat_id)
+
+    def _claim(self, now):
+        if not self._ready:
+            return None, None
+        ready_at, _, chat_id = self._ready[0]
+        if ready_at > now:
+            return None, ready_at
+        heapq.heappop(self._ready)
+        self._ready_at.pop(chat_id, None)
+        messages = self._chats[chat_id]
+        message = messages.popleft()
+        if not messages:
+            del self._chats[chat_id]
+        self._in_flight[message.id] = message
+        self._busy.add(chat_id)
+        return message, None
+
+    def _finish(self, message, ready_at):
+        self._in_flight.pop(message.id, None)
+        self._busy.discard(message.chat_id)
+        if ready_at:
+            self._ready_at[message.chat_id] = ready_at
+
+    def _delete(self, message, ready_at):
+        self._finish(message, ready_at)
+        self._size -= 1
+        self._schedule(message.chat_id)
+
+    def _release(self, message, ready_at):
+        self._finish(message, ready_at)
+        messages = self._chats.get(message.chat_id)
+        if messages is None:
+            messages = self._chats[message.chat_id] = deque()
+        messages.appendleft(message)
+        self._schedule(message.chat_id)
+
+    def _oldest_created_at(self):
+        messages = itertools.chain(
+            self._in_flight.values(), *self._chats.values()
+        )
+        return min((message.created_at for message in messages), default=None)
+
+
+class SqliteOutboxQueue(_BlockingOutboxQueue):
+    """Очередь отправки в SQLite (WAL), переживающая перезапуск.
+
+    Сообщения, которые отправлялись в момент остановки процесса, при
+    открытии базы снова становятся доступны воркерам.
+    """
+
+    def __init__(self, path, max_size, clock=time.time):
+        """Открытие (или создание) очереди в базе path."""
+        super().__init__(max_size, clock)
+        self.path = path
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(OUTBOX_SCHEMA)
+        self._connection.execute(OUTBOX_INDEX)
+        self._connection.execute(OUTBOX_CHATS_SCHEMA)
+        self._connection.execute('UPDATE outbox SET claimed = 0')
+        self._size = self._connection.execute(
+            'SELECT COUNT(*) FROM outbox'
+        ).fetchone()[0]
+
+    def _count(self):
+        return self._size
+
+    def _insert(self, chat_id, text, now):
+        self._connection.execute(
+            'INSERT INTO outbox (chat_id, text, created_at) VALUES (?, ?, ?)',
+            (chat_id, text, now)
+        )
+        self._size += 1
+
+    def _claim(self, now):
+        # Кандидаты — первые сообщения чатов (один проход по индексу
+        # outbox_chat); если первое сообщение чата уже отправляется, чат
+        # занят и в выборку не попадает.
+        row = self._connection.execute(
+            'SELECT o.id, o.chat_id, o.text, o.attempt, o.not_before, '
+            'o.created_at, MAX(o.not_before, COALESCE(c.ready_at, 0)) '
+            'AS ready_at FROM ('
+            'SELECT MIN(id) AS id FROM outbox GROUP BY chat_id) AS head '
+            'JOIN outbox AS o ON o.id = head.id '
+            'LEFT JOIN outbox_chats AS c ON c.chat_id = o.chat_id '
+            'WHERE o.claimed = 0 ORDER BY ready_at, o.id LIMIT 1'
+        ).fetchone()
+        if row is None:
+            return None, None
+        if row[6] > now:
+            return None, row[6]
+        self._connection.execute(
+            'UPDATE outbox SET claimed = 1 WHERE id = ?', (row[0],)
+        )
+        return OutboxMessage(*row[:6]), None
+
+    def _set_ready(self, chat_id, ready_at):
+        # По строке на чат: время готовности заменяется по первичному
+        # ключу, без просмотра всей таблицы.
+        if not ready_at:
+            self._connection.execute(
+                'DELETE FROM outbox_chats WHERE chat_id = ?', (chat_id,)
+            )
+        else:
+            self._connection.execute(
+                'INSERT INTO outbox_chats (chat_id, ready_at) VALUES (?, ?) '
+                'ON CONFLICT(chat_id) DO UPDATE SET '
+                'ready_at = excluded.ready_at',
+                (chat_id, ready_at)
+            )
+
+    def _delete(self, message, ready_at):
+        deleted = self._connection.execute(
+            'DELETE FROM outbox WHERE id = ?', (message.id,)
+        ).rowcount
+        self._size -= deleted
+        self._set_ready(message.chat_id, ready_at)
+
+    def _release(self, message, ready_at):
+        self._connection.execute(
+            'UPDATE outbox SET claimed = 0, attempt = ?, not_before = ? '
+            'WHERE id = ?',
+            (message.attempt, message.not_before, message.id)
+        )
+        self._set_ready(message.chat_id, ready_at)
+
+    def _oldest_created_at(self):
+        return self._connection.execute(
+            'SELECT MIN(created_at) FROM outbox'
+        ).fetchone()[0]
+
+    def disconnect(self):
+        """Закрытие базы."""
+        with self._condition:
+            self._connection.close()
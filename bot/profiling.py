@@ -0,0 +1,179 @@
+import glob
+import logging
+import os
+import time
+
+from bot.lazy import lazy_import
+
+cProfile = lazy_import('cProfile')
+tracemalloc = lazy_import('tracemalloc')
+
+CPU = 'cpu'
+MEMORY = 'memory'
+ALL_MODES = (CPU, MEMORY)
+DEFAULT_DIRECTORY = 'profiles'
+DEFAULT_EVERY = 1
+DEFAULT_KEEP = 24
+DEFAULT_TOP = 25
+DEFAULT_FRAMES = 1
+PSTATS_SUFFIX = '.pstats'
+MEMORY_SUFFIX = '.txt'
+# Кадры загрузчика модулей в отчёт не попадают, как и кадры самого
+# tracemalloc (его файл добавляется при снимке).
+IGNORED_FILES = (
+    '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>'
+)
+
+UNKNOWN_MODE_MESSAGE = (
+    'Неизвестный режим профилирования "{mode}", допустимы: {modes}.'
+)
+PROFILE_DUMPED_MESSAGE = 'Профиль итераций {first}-{last} записан в {path}.'
+PROFILE_DUMP_FAILED_MESSAGE = 'Не удалось записать профиль в {path}.'
+MEMORY_HEADER_MESSAGE = (
+    'Итерации {first}-{last}: занято {current} Б, пик {peak} Б.\n'
+    'Top-{top} изменений размещений памяти с прошлого отчёта:\n'
+)
+
+
+def parse_modes(spec):
+    """Режимы из строки вида "cpu,memory"; "1" и "all" — все режимы."""
+    modes = {mode.strip().lower() for mode in (spec or '').split(',')}
+    modes.discard('')
+    if modes & {'1', 'all', 'true'}:
+        return set(ALL_MODES)
+    unknown = modes - set(ALL_MODES)
+    if unknown:
+        raise ValueError(UNKNOWN_MODE_MESSAGE.format(
+            mode=', '.join(sorted(unknown)), modes=', '.join(ALL_MODES)
+        ))
+    return modes
+
+
+class NullProfiler:
+    """Профилировщик-заглушка для режима без профилирования."""
+
+    def start_iteration(self):
+        """Ничего не делает."""
+
+    def end_iteration(self):
+        """Ничего не делает."""
+
+    def close(self):
+        """Ничего не делает."""
+
+
+class Profiler:
+    """Профилирование итераций цикла опроса.
+
+    Между start_iteration() и end_iteration() работает cProfile (режим
+    cpu); паузы между итерациями в профиль не попадают. В режиме memory
+    tracemalloc следит за размещениями памяти. Раз в every итераций
+    в directory пишутся файл pstats и top размещений, выросших с
+    прошлого отчёта; хранятся последние keep файлов каждого вида.
+    """
+
+    def __init__(
+        self, modes=ALL_MODES, directory=DEFAULT_DIRECTORY,
+        every=DEFAULT_EVERY, keep=DEFAULT_KEEP, top=DEFAULT_TOP,
+        frames=DEFAULT_FRAMES, clock=time.time
+    ):
+        """Профилировщик режимов modes с отчётами в directory."""
+        self.cpu = CPU in modes
+        self.memory = MEMORY in modes
+        self.directory = directory
+        self.every = max(1, every)
+        self.keep = max(1, keep)
+        self.top = top
+        self.frames = frames
+        self.iterations = 0
+        self._clock = clock
+        self._first = 1
+        self._profile = cProfile.Profile() if self.cpu else None
+        self._snapshot = None
+        self._started_tracemalloc = False
+
+    def start_iteration(self):
+        """Начало итерации цикла."""
+        if self.memory and self._snapshot is None:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracemalloc = True
+            self._snapshot = self._take_snapshot()
+        if self.cpu:
+            self._profile.enable()
+
+    def end_iteration(self):
+        """Конец итерации; раз в every итераций — запись отчётов."""
+        if self.cpu:
+            self._profile.disable()
+        self.iterations += 1
+        if self.iterations - self._first + 1 >= self.every:
+            self.dump()
+
+    def dump(self):
+        """Запись отчётов за итерации с прошлой записи."""
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime(self._clock()))
+        name = f'{stamp}-{self.iterations:06d}'
+        os.makedirs(self.directory, exist_ok=True)
+        if self.cpu:
+            self._write(CPU, name + PSTATS_SUFFIX, self._dump_cpu)
+        if self.memory and self._snapshot is not None:
+            self._write(MEMORY, name + MEMORY_SUFFIX, self._dump_memory)
+        self._first = self.iterations + 1
+
+    def close(self):
+        """Остановка tracemalloc, если его запустил профилировщик."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._snapshot = None
+
+    def _write(self, kind, filename, dump):
+        path = os.path.join(self.directory, f'{kind}-{filename}')
+        try:
+            dump(path)
+        except OSError:
+            logging.exception(PROFILE_DUMP_FAILED_MESSAGE.format(path=path))
+            return
+        logging.info(PROFILE_DUMPED_MESSAGE.format(
+            first=self._first, last=self.iterations, path=path
+        ))
+        self._rotate(kind)
+
+    def _dump_cpu(self, path):
+        self._profile.dump_stats(path)
+        self._profile = cProfile.Profile()
+
+    def _dump_memory(self, path):
+        snapshot = self._take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            str(stat) for stat in
+            snapshot.compare_to(self._snapshot, 'lineno')[:self.top]
+        ]
+        self._snapshot = snapshot
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(MEMORY_HEADER_MESSAGE.format(
+                first=self._first, last=self.iterations, current=current,
+                peak=peak, top=self.top
+            ))
+            file.write('\n'.join(lines) + '\n')
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, filename)
+            for filename in IGNORED_FILES + (tracemalloc.__file__,)
+        ])
+
+    def _rotate(self, kind):
+        paths = sorted(glob.glob(os.path.join(self.directory, f'{kind}-*')))
+        for path in paths[:-self.keep]:
+            os.remove(path)
+
+
+def create_profiler(spec, **options):
+    """Profiler для режимов из spec или NullProfiler, если spec пуст."""
+    modes = parse_modes(spec)
+    if not modes:
+        return NullProfiler()
+    return Profiler(modes, **options)
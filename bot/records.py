@@ -0,0 +1,40 @@
+import sys
+from collections import namedtuple
+
+from bot.dedup import notification_key
+
+
+def intern_name(name):
+    """Имя работы из общего пула строк; не строки возвращаются как есть."""
+    return sys.intern(name) if type(name) is str else name
+
+
+class HomeworkRecord(namedtuple('HomeworkRecord', (
+    'id', 'name', 'status', 'date_updated'
+))):
+    """Компактная запись о работе вместо словаря из ответа API.
+
+    Хранит только поля, нужные для уведомлений и дедупликации; name и
+    status — строки из общего пула, поэтому повторяющиеся в ответах
+    имена и статусы не копируются.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_item(cls, item, status=None):
+        """Запись по словарю работы; status — уже интернированный статус.
+
+        Единственный конструктор записей, в том числе для
+        Extracted.homeworks. tuple.__new__ вместо cls(...)
+        пропускает разбор аргументов namedtuple.
+        """
+        return tuple.__new__(cls, (
+            item.get('id'), intern_name(item['homework_name']),
+            status or sys.intern(item['status']), item.get('date_updated')
+        ))
+
+    @property
+    def key(self):
+        """Ключ уведомления для DedupIndex."""
+        return notification_key(self.id, self.status, self.date_updated)
@@ -0,0 +1,92 @@
+import time
+from collections import namedtuple
+from http import HTTPStatus
+
+import homework
+from bot.clock import SYSTEM_CLOCK
+from bot.stats import percentile
+from bot.traffic import PRACTICUM, read_traffic
+
+ReplayResult = namedtuple('ReplayResult', (
+    'responses', 'homeworks', 'messages', 'errors', 'elapsed', 'p50', 'p99'
+))
+
+REPLAY_RESULT_MESSAGE = (
+    'Воспроизведено ответов {responses} (работ {homeworks}, сообщений '
+    '{messages}, ошибок {errors}) за {elapsed:.3f} c; обработка ответа '
+    'p50 {p50_us:.1f} мкс, p99 {p99_us:.1f} мкс.'
+)
+
+
+class Replay:
+    """Воспроизведение записанных TrafficLog ответов API Практикума.
+
+    Каждый успешный ответ проходит check_response(), extract_updates() и
+    coalesce_messages(), как в homework.main(). С speed=None записи идут
+    без пауз, с speed=1.0 — с исходными интервалами, с speed=10 — в
+    десять раз быстрее.
+    """
+
+    def __init__(self, records, speed=None, clock=SYSTEM_CLOCK):
+        """Воспроизведение записей records (словарей из журнала)."""
+        self.records = [
+            record for record in records if record['kind'] == PRACTICUM
+        ]
+        self.speed = speed
+        self.clock = clock
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """Воспроизведение журнала из файла path."""
+        return cls(read_traffic(path), **options)
+
+    def run(self):
+        """Один проход по записям; итоги прогона."""
+        durations = []
+        homeworks = messages = errors = 0
+        started = self.clock.monotonic()
+        first_ts = self.records[0]['ts'] if self.records else 0
+        for record in self.records:
+            if self.speed:
+                self.clock.sleep(max(0.0, (
+                    started + (record['ts'] - first_ts) / self.speed
+                    - self.clock.monotonic()
+                )))
+            if (
+                record['error'] is not None
+                or record['status_code'] != HTTPStatus.OK
+            ):
+                errors += 1
+                continue
+            processing_started = time.perf_counter()
+            try:
+                items, chunks = self.process(record['response'])
+            except Exception:
+                errors += 1
+                continue
+            finally:
+                durations.append(time.perf_counter() - processing_started)
+            homeworks += items
+            messages += chunks
+        durations.sort()
+        return ReplayResult(
+            responses=len(self.records),
+            homeworks=homeworks,
+            messages=messages,
+            errors=errors,
+            elapsed=self.clock.monotonic() - started,
+            p50=percentile(durations, 0.5),
+            p99=percentile(durations, 0.99)
+        )
+
+    @staticmethod
+    def process(response):
+        """Разбор одного ответа: (число работ, число сообщений).
+
+        Сырое тело из журнала разбирается homework.DECODER, как в main().
+        """
+        if isinstance(response, str):
+            response = homework.DECODER.loads(response)
+        homework.check_response(response)
+        messages = homework.extract_updates(response['homeworks']).messages
+        return len(messages), len(homework.coalesce_messages(messages))
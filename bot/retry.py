@@ -0,0 +1,132 @@
+import logging
+import random
+import threading
+import time
+from http import HTTPStatus
+
+import requests
+
+import homework
+
+DEFAULT_BACKOFF_BASE = 30
+DEFAULT_BACKOFF_CAP = 3 * homework.RETRY_PERIOD
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 60
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+BREAKER_STATE_MESSAGE = (
+    'Circuit breaker API Практикума: {old} -> {new} '
+    '(ошибок подряд: {failures}).'
+)
+
+
+def is_api_failure(error):
+    """Ошибка, говорящая о деградации API: 5xx, таймаут, обрыв связи."""
+    if isinstance(error, homework.ApiStatusCodeError):
+        return error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    if isinstance(error, TimeoutError):
+        return True
+    if isinstance(error, ConnectionError):
+        return isinstance(
+            error.__cause__,
+            (requests.Timeout, requests.ConnectionError, TimeoutError)
+        )
+    return False
+
+
+class RetryPolicy:
+    """Экспоненциальная задержка с полным джиттером.
+
+    Пауза перед попыткой attempt равномерно распределена в
+    [0, min(cap, base * 2 ** attempt)], поэтому аккаунты, упавшие
+    одновременно, не повторяют запросы синхронно.
+    """
+
+    def __init__(
+        self, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_CAP,
+        rng=random.random
+    ):
+        """Параметры задержки в секундах."""
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+
+    def delay(self, attempt):
+        """Пауза перед повтором номер attempt (с нуля)."""
+        return self.rng() * min(self.cap, self.base * 2 ** attempt)
+
+
+class CircuitBreaker:
+    """Общий для всех аккаунтов предохранитель API Практикума.
+
+    После failure_threshold сбоев подряд размыкается, и запросы не
+    отправляются recovery_timeout секунд. Затем пропускается один
+    пробный запрос: успех замыкает цепь, сбой снова размыкает.
+    """
+
+    def __init__(
+        self, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout=DEFAULT_RECOVERY_TIMEOUT, clock=time.monotonic
+    ):
+        """Изначально цепь замкнута."""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._clock = clock
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Можно ли сейчас обращаться к API."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if self._clock() < self.opened_at + self.recovery_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def retry_in(self):
+        """Сколько секунд осталось до пробного запроса."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(
+                0.0, self.opened_at + self.recovery_timeout - self._clock()
+            )
+
+    def record_success(self):
+        """Учёт успешного обращения к API."""
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        """Учёт сбоя API."""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if (
+                self.state == HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.opened_at = self._clock()
+                if self.state != OPEN:
+                    self._set_state(OPEN)
+
+    def _set_state(self, state):
+        logging.warning(BREAKER_STATE_MESSAGE.format(
+            old=self.state, new=state, failures=self.failures
+        ))
+        self.state = state
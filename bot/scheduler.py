@@ -0,0 +1,114 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from bot.metrics import REGISTRY
+from bot.stats import LatencyStats
+
+DEFAULT_MAX_SLEEP = 1.0
+
+SCHEDULER_LAG_MESSAGE = (
+    'Отставание расписания: p50 {p50:.3f} c, p99 {p99:.3f} c, '
+    'max {max:.3f} c; пропущенных периодов {overruns} из {count}.'
+)
+
+SCHEDULER_LAG_SECONDS = REGISTRY.histogram(
+    'homework_scheduler_lag_seconds',
+    'Отставание запуска опроса от плановой отметки, сек.'
+)
+
+
+def next_deadline(previous_due, interval, now):
+    """Следующая плановая отметка после previous_due.
+
+    Пропущенные к моменту now периоды отбрасываются, фаза сохраняется.
+    """
+    due = previous_due + interval
+    if due < now:
+        due += math.ceil((now - due) / interval) * interval
+    return due
+
+
+class PollScheduler:
+    """Расписание опросов по монотонным часам без накопления дрейфа.
+
+    Каждый элемент срабатывает в фиксированные моменты
+    start + offset + n * period, независимо от длительности самой
+    работы. Отставание фактического запуска от плановой отметки
+    копится в lag.
+    """
+
+    def __init__(
+        self, period, clock=time.monotonic, sleep=time.sleep,
+        max_sleep=DEFAULT_MAX_SLEEP
+    ):
+        """Пустое расписание с периодом period секунд."""
+        self.period = period
+        self.lag = LatencyStats()
+        self._clock = clock
+        self._sleep = sleep
+        self._max_sleep = max_sleep
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Число запланированных элементов."""
+        return len(self._heap)
+
+    def add(self, item, delay=0.0):
+        """Запланировать item через delay секунд от текущего момента."""
+        self.add_at(item, self._clock() + delay)
+
+    def add_at(self, item, due):
+        """Запланировать item на момент due монотонных часов."""
+        with self._lock:
+            heapq.heappush(self._heap, (due, next(self._counter), item))
+
+    def spread(self, items):
+        """Равномерно распределить items по одному периоду."""
+        items = list(items)
+        now = self._clock()
+        step = self.period / len(items) if items else 0
+        for index, item in enumerate(items):
+            self.add_at(item, now + index * step)
+
+    def next_due(self, previous_due, interval=None):
+        """Следующая плановая отметка после previous_due.
+
+        Пропущенные периоды отбрасываются, фаза сохраняется.
+        """
+        return next_deadline(
+            previous_due, interval or self.period, self._clock()
+        )
+
+    def next_time(self):
+        """Ближайшая плановая отметка или None для пустого расписания."""
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self):
+        """Извлечь элемент, чей срок наступил, или вернуть None."""
+        now = self._clock()
+        with self._lock:
+            if not self._heap or self._heap[0][0] > now:
+                return None
+            due, _, item = heapq.heappop(self._heap)
+        lag = now - due
+        self.lag.record(lag, lag >= self.period)
+        SCHEDULER_LAG_SECONDS.observe(lag)
+        return item, due
+
+    def wait_next(self):
+        """Дождаться ближайшего срока и вернуть (item, due)."""
+        while True:
+            popped = self.pop_due()
+            if popped is not None:
+                return popped
+            head = self.next_time()
+            delay = self._max_sleep
+            if head is not None:
+                delay = min(delay, max(0.0, head - self._clock()))
+            self._sleep(delay)
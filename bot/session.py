@@ -0,0 +1,95 @@
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 32
+
+CONNECTION_STATS_MESSAGE = (
+    'HTTP-соединения: запросов {requests}, новых {new_connections}, '
+    'переиспользовано {reused}.'
+)
+
+ConnectionStats = namedtuple(
+    'ConnectionStats', ('requests', 'new_connections', 'reused')
+)
+
+
+class _CountingPoolMixin:
+    """Учёт запросов и реально открытых сокетов в пуле urllib3."""
+
+    requests_made = 0
+    connects = 0
+
+    def _make_request(self, conn, *args, **kwargs):
+        self.requests_made += 1
+        if conn.sock is None:
+            self.connects += 1
+        return super()._make_request(conn, *args, **kwargs)
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    """HTTPConnectionPool со счётчиками соединений."""
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    """HTTPSConnectionPool со счётчиками соединений."""
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, пулы которого считают новые соединения."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Подмена классов пулов на считающие."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+
+def create_session(
+    pool_connections=DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    keep_alive=True
+):
+    """Создание requests.Session с пулом keep-alive соединений.
+
+    pool_connections — число хостов, для которых хранится пул;
+    pool_maxsize — предел одновременных соединений к одному хосту:
+    при его исчерпании запросы ждут свободное соединение, а не
+    открывают новые.
+    """
+    session = requests.Session()
+    adapter = CountingHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def connection_stats(session):
+    """Счётчики новых и переиспользованных соединений сессии."""
+    total_requests = new_connections = 0
+    for adapter in set(session.adapters.values()):
+        poolmanager = getattr(adapter, 'poolmanager', None)
+        if poolmanager is None:
+            continue
+        for key in list(poolmanager.pools.keys()):
+            pool = poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            total_requests += getattr(pool, 'requests_made', 0)
+            new_connections += getattr(pool, 'connects', 0)
+    return ConnectionStats(
+        total_requests,
+        new_connections,
+        max(0, total_requests - new_connections)
+    )
@@ -0,0 +1,75 @@
+import time
+from collections import Counter, namedtuple
+
+from bot.clock import SimulatedClock
+
+HOUR = 60 * 60
+
+SimulationResult = namedtuple('SimulationResult', (
+    'simulated', 'wall', 'polls', 'polls_per_hour', 'peak_polls_per_hour'
+))
+
+SIMULATED_CLOCK_REQUIRED_MESSAGE = (
+    'Симуляции нужен движок с clock=SimulatedClock().'
+)
+SIMULATION_RESULT_MESSAGE = (
+    'Симуляция {simulated_hours:.1f} ч за {wall:.2f} c: опросов {polls}, '
+    'в среднем {polls_per_hour:.0f} в час, в пиковый час '
+    '{peak_polls_per_hour}.'
+)
+
+
+class Simulation:
+    """Ускоренный прогон расписания PollingEngine на SimulatedClock.
+
+    Опросы выполняются по одному в текущем потоке, а часы между ними
+    переводятся сразу на ближайшую плановую отметку, поэтому недели
+    опроса тысяч аккаунтов укладываются в секунды. Движок должен быть
+    создан с тем же clock и фейковыми транспортами, читающими его же
+    время; задержки фейков здесь складываются последовательно.
+    """
+
+    def __init__(self, engine):
+        """Симуляция опроса аккаунтов engine."""
+        if not isinstance(engine.clock, SimulatedClock):
+            raise TypeError(SIMULATED_CLOCK_REQUIRED_MESSAGE)
+        self.engine = engine
+        self.clock = engine.clock
+        self.polls = 0
+        self.hourly_polls = Counter()
+        self._spread = False
+
+    def step(self):
+        """Перевести часы к ближайшему опросу и выполнить его."""
+        scheduler = self.engine.scheduler
+        self.clock.advance_to(scheduler.next_time())
+        state, due = scheduler.pop_due()
+        self.engine.poll_account(state)
+        self.polls += 1
+        self.hourly_polls[int(due // HOUR)] += 1
+        scheduler.add_at(state, scheduler.next_due(
+            due, self.engine.next_interval(state)
+        ))
+
+    def run(self, duration):
+        """Симуляция duration секунд опроса; итоги прогона."""
+        scheduler = self.engine.scheduler
+        if not self._spread:
+            scheduler.spread(self.engine.states)
+            self._spread = True
+        started = time.monotonic()
+        simulated_from = self.clock.monotonic()
+        end = simulated_from + duration
+        polls = self.polls
+        self.hourly_polls.clear()
+        while self.engine.states and scheduler.next_time() < end:
+            self.step()
+        self.clock.advance_to(end)
+        hours = duration / HOUR
+        return SimulationResult(
+            simulated=duration,
+            wall=time.monotonic() - started,
+            polls=self.polls - polls,
+            polls_per_hour=(self.polls - polls) / hours if hours else 0.0,
+            peak_polls_per_hour=max(self.hourly_polls.values(), default=0)
+        )
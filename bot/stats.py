@@ -0,0 +1,54 @@
+import math
+import threading
+from collections import deque, namedtuple
+
+DEFAULT_WINDOW = 10000
+
+LATENCY_STATS_MESSAGE = (
+    'Длительность опроса: p50 {p50:.3f} c, p99 {p99:.3f} c, '
+    'max {max:.3f} c; превышений бюджета {overruns} из {count}.'
+)
+
+LatencySummary = namedtuple(
+    'LatencySummary', ('count', 'p50', 'p99', 'max', 'overruns')
+)
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по отсортированной выборке (метод nearest-rank)."""
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1,
+        max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class LatencyStats:
+    """Скользящее окно длительностей опроса и счётчик превышений."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        """Хранятся последние window измерений."""
+        self._durations = deque(maxlen=window)
+        self._overruns = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, duration, overrun=False):
+        """Учёт одного опроса."""
+        with self._lock:
+            self._durations.append(duration)
+            self._overruns.append(overrun)
+
+    def summary(self):
+        """Сводка по текущему окну."""
+        with self._lock:
+            durations = sorted(self._durations)
+            overruns = sum(self._overruns)
+        return LatencySummary(
+            count=len(durations),
+            p50=percentile(durations, 0.5),
+            p99=percentile(durations, 0.99),
+            max=durations[-1] if durations else 0.0,
+            overruns=overruns
+        )
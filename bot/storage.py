@@ -0,0 +1,119 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from bot.lazy import lazy_import
+
+sqlite3 = lazy_import('sqlite3')
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS checkpoints (
+        account_id TEXT PRIMARY KEY,
+        timestamp INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS notified_statuses (
+        account_id TEXT NOT NULL,
+        homework_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        PRIMARY KEY (account_id, homework_id)
+    )''',
+)
+
+
+class CheckpointStore:
+    """Постоянное хранилище from_date и последних отправленных статусов.
+
+    SQLite в режиме WAL: запись контрольной точки — одна короткая
+    транзакция, чтение при старте не блокирует запись.
+    """
+
+    def __init__(self, path):
+        """Открытие (или создание) базы path."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+
+    def load_timestamp(self, account_id, default=0):
+        """Сохранённый from_date аккаунта или default."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT timestamp FROM checkpoints WHERE account_id = ?',
+                (account_id,)
+            ).fetchone()
+        return row[0] if row else default
+
+    def load_timestamps(self):
+        """Все сохранённые from_date: {account_id: timestamp}."""
+        with self._lock:
+            return dict(self._connection.execute(
+                'SELECT account_id, timestamp FROM checkpoints'
+            ))
+
+    def load_statuses(self, account_id):
+        """Последние отправленные статусы: {homework_id: status}."""
+        with self._lock:
+            return dict(self._connection.execute(
+                'SELECT homework_id, status FROM notified_statuses '
+                'WHERE account_id = ?',
+                (account_id,)
+            ))
+
+    def load_all_statuses(self):
+        """Статусы всех аккаунтов: {account_id: {homework_id: status}}.
+
+        Статусы берутся из общего пула строк: их немного разных, а
+        аккаунтов и работ — тысячи.
+        """
+        statuses = {}
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT account_id, homework_id, status '
+                'FROM notified_statuses'
+            ).fetchall()
+        for account_id, homework_id, status in rows:
+            statuses.setdefault(account_id, {})[homework_id] = sys.intern(
+                status
+            )
+        return statuses
+
+    def save(self, account_id, timestamp, statuses=()):
+        """Атомарная запись from_date и пар (homework_id, status)."""
+        with self._lock, self._transaction():
+            self._connection.execute(
+                'INSERT INTO checkpoints (account_id, timestamp, updated_at) '
+                'VALUES (?, ?, ?) ON CONFLICT(account_id) DO UPDATE SET '
+                'timestamp = excluded.timestamp, '
+                'updated_at = excluded.updated_at',
+                (account_id, timestamp, time.time())
+            )
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO notified_statuses '
+                '(account_id, homework_id, status) VALUES (?, ?, ?)',
+                [
+                    (account_id, str(homework_id), status)
+                    for homework_id, status in statuses
+                ]
+            )
+
+    @contextmanager
+    def _transaction(self):
+        self._connection.execute('BEGIN')
+        try:
+            yield
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+
+    def close(self):
+        """Закрытие соединения с базой."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,262 @@
+import abc
+import json
+import random
+import threading
+import time
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import homework
+from bot.outbox import TOO_MANY_REQUESTS
+
+PRACTICUM_PATH = '/api/user_api/homework_statuses/'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+POLL_INTERVAL = 0.05
+
+NOT_AUTHENTICATED = {
+    'code': 'not_authenticated',
+    'message': 'Учетные данные не были предоставлены.',
+    'source': '__response__',
+}
+WRONG_FROM_DATE = {
+    'code': 'UnknownError',
+    'error': {'error': 'Wrong from_date format'},
+}
+SERVER_ERROR = {'code': 'server_error', 'error': 'Injected server error'}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = self.rfile.read(length)
+            if self.headers.get('Content-Type', '').startswith(
+                'application/json'
+            ):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body.decode()))
+        status, data = self.server.stub.handle(
+            url.path, self.headers, params
+        )
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubServer(abc.ABC):
+    """Локальный HTTP-сервер заглушки в фоновом потоке.
+
+    Используется как контекстный менеджер; url — адрес сервера.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """Сервер на host:port; port=0 — любой свободный порт."""
+        self._server = _StubHTTPServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """Адрес сервера без завершающего слеша."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Запуск обработки запросов в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(POLL_INTERVAL,),
+            daemon=True, name=type(self).__name__
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Остановка сервера."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        """Запуск сервера."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Остановка сервера."""
+        self.stop()
+
+    @abc.abstractmethod
+    def handle(self, path, headers, params):
+        """Ответ на запрос: (status, JSON-тело)."""
+
+
+class PracticumStub(StubServer):
+    """Заглушка GET /api/user_api/homework_statuses/.
+
+    У каждого токена одна работа, которая появляется при первом
+    запросе со статусом reviewing. Отдаются работы, обновлённые не
+    раньше from_date. С вероятностью churn_rate работа на запросе
+    меняет статус; с вероятностью error_rate ответ — 500, а с
+    вероятностью slow_rate он задерживается на slow_delay секунд.
+    Без заголовка Authorization ответ — 401, при нечисловом
+    from_date — 400. Моменты смены статусов копятся в changes.
+    """
+
+    def __init__(
+        self, churn_rate=0.0, error_rate=0.0, slow_rate=0.0,
+        slow_delay=1.0, rng=None, clock=time.time, host='127.0.0.1',
+        port=0
+    ):
+        """Заглушка с заданными вероятностями смены статуса и сбоев."""
+        super().__init__(host, port)
+        self.churn_rate = churn_rate
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.requests = 0
+        self.changes = []
+        self._rng = rng or random.Random().random
+        self._clock = clock
+        self._homeworks = {}
+
+    @property
+    def endpoint(self):
+        """Полный адрес эндпоинта для engine(endpoint=...)."""
+        return self.url + PRACTICUM_PATH
+
+    def handle(self, path, headers, params):
+        """Ответ API домашки по токену из Authorization."""
+        if path != PRACTICUM_PATH:
+            return HTTPStatus.NOT_FOUND, {'detail': 'Not found.'}
+        authorization = headers.get('Authorization', '')
+        if not authorization.startswith('OAuth '):
+            return HTTPStatus.UNAUTHORIZED, NOT_AUTHENTICATED
+        try:
+            from_date = int(params.get('from_date', 0))
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, WRONG_FROM_DATE
+        token = authorization.split()[-1]
+        with self._lock:
+            self.requests += 1
+            slow = self._rng() < self.slow_rate
+            failed = self._rng() < self.error_rate
+            churn = self._rng() < self.churn_rate
+            status = self._next_status(token, churn)
+        if slow:
+            time.sleep(self.slow_delay)
+        if failed:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, SERVER_ERROR
+        now = int(self._clock())
+        with self._lock:
+            item = self._homework(token, now)
+            if status is not None:
+                item['status'] = status
+                item['date_updated'] = time.strftime(
+                    DATE_FORMAT, time.gmtime(now)
+                )
+                item['updated_at'] = now
+                self.changes.append((token, status, time.monotonic()))
+            homeworks = [
+                {key: value for key, value in item.items()
+                 if key != 'updated_at'}
+            ] if item['updated_at'] >= from_date else []
+        return HTTPStatus.OK, {'homeworks': homeworks, 'current_date': now}
+
+    def _homework(self, token, now):
+        item = self._homeworks.get(token)
+        if item is None:
+            item = self._homeworks[token] = {
+                'id': zlib.crc32(token.encode()),
+                'status': 'reviewing',
+                'homework_name': f'{token}__homework.zip',
+                'reviewer_comment': '',
+                'date_updated': time.strftime(DATE_FORMAT, time.gmtime(now)),
+                'lesson_name': 'Stub lesson',
+                'updated_at': now,
+            }
+            self.changes.append((token, item['status'], time.monotonic()))
+        return item
+
+    def _next_status(self, token, churn):
+        if not churn or token not in self._homeworks:
+            return None
+        current = self._homeworks[token]['status']
+        choices = sorted(set(homework.HOMEWORK_VERDICTS) - {current})
+        return choices[int(self._rng() * len(choices))]
+
+
+class TelegramStub(StubServer):
+    """Заглушка метода sendMessage Bot API.
+
+    TeleBot направляется на неё через
+    telebot.apihelper.API_URL = stub.api_url. Принятые сообщения копятся
+    в messages как (chat_id, text, время по time.monotonic()); с
+    вероятностью error_rate ответ — 429 с retry_after.
+    """
+
+    def __init__(
+        self, error_rate=0.0, retry_after=1, rng=None, host='127.0.0.1',
+        port=0
+    ):
+        """Заглушка с заданной частотой ответов 429."""
+        super().__init__(host, port)
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.messages = []
+        self._rng = rng or random.Random().random
+
+    @property
+    def api_url(self):
+        """Шаблон адреса для telebot.apihelper.API_URL."""
+        return self.url + '/bot{0}/{1}'
+
+    def handle(self, path, headers, params):
+        """Ответ Bot API на sendMessage."""
+        if not path.endswith('/sendMessage'):
+            return HTTPStatus.NOT_FOUND, {
+                'ok': False, 'error_code': 404, 'description': 'Not Found'
+            }
+        with self._lock:
+            if self._rng() < self.error_rate:
+                return TOO_MANY_REQUESTS, {
+                    'ok': False,
+                    'error_code': TOO_MANY_REQUESTS,
+                    'description': 'Too Many Requests: retry later',
+                    'parameters': {'retry_after': self.retry_after},
+                }
+            chat_id = str(params.get('chat_id'))
+            text = params.get('text', '')
+            self.messages.append((chat_id, text, time.monotonic()))
+            message_id = len(self.messages)
+        return HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {
+                'id': int(chat_id) if chat_id.lstrip('-').isdigit() else 0,
+                'type': 'private',
+            },
+            'text': text,
+        }}
@@ -0,0 +1,144 @@
+import functools
+import json
+import re
+import threading
+import time
+
+from bot.lazy import lazy_import
+
+hashlib = lazy_import('hashlib')
+# bot.transport импортирует homework, который импортирует этот модуль.
+transport = lazy_import('bot.transport')
+
+PRACTICUM = 'practicum'
+TELEGRAM = 'telegram'
+REDACTED_HEADERS = ('Authorization',)
+# Токен бота в URL Bot API (…/bot<id>:<secret>/sendMessage) попадает в
+# тексты исключений requests.
+BOT_TOKEN_PATTERN = re.compile(r'(?<=/bot)\d+:[\w-]+')
+
+
+def fingerprint(token):
+    """Короткий стабильный отпечаток токена вместо самого токена."""
+    return 'sha256:' + hashlib.sha256(token.encode()).hexdigest()[:12]
+
+
+def redact_headers(headers):
+    """Копия заголовков, где токены заменены коротким отпечатком.
+
+    Отпечаток стабилен, поэтому записи одного аккаунта остаются
+    различимыми, а сам токен в запись не попадает.
+    """
+    redacted = dict(headers or {})
+    for name in REDACTED_HEADERS:
+        if name in redacted:
+            scheme, _, token = str(redacted[name]).rpartition(' ')
+            redacted[name] = f'{scheme} {fingerprint(token)}'.lstrip()
+    return redacted
+
+
+def redact_error(error):
+    """repr(error), где токены бота заменены отпечатком."""
+    return BOT_TOKEN_PATTERN.sub(
+        lambda match: fingerprint(match.group()), repr(error)
+    )
+
+
+class TrafficLog:
+    """Запись обменов с API Практикума и Telegram в JSONL.
+
+    Каждая строка — объект с полями kind, ts (настенное время начала),
+    duration, request, status_code, response и error. response — сырое
+    тело ответа строкой, без разбора JSON; у фейковых ответов без
+    content — их json(). Обмены снимают записывающие транспорты из
+    bot.transport, журнал только пишет их на диск. Без path запись
+    отключена, и обёртки возвращают исходные объекты.
+    """
+
+    def __init__(self, path=None, clock=time.time, timer=time.monotonic):
+        """Журнал в файле path; файл открывается при первой записи."""
+        self.path = path
+        self._clock = clock
+        self._timer = timer
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Ведётся ли запись."""
+        return self.path is not None
+
+    def write(self, kind, request, started_at, duration, status_code=None,
+              response=None, error=None):
+        """Дописать одну запись в журнал; токены в error скрываются."""
+        if isinstance(response, bytes):
+            response = response.decode('utf-8', 'replace')
+        line = json.dumps({
+            'kind': kind,
+            'ts': started_at,
+            'duration': duration,
+            'request': request,
+            'status_code': status_code,
+            'response': response,
+            'error': None if error is None else redact_error(error),
+        }, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def write_exchange(self, kind, exchange):
+        """Дописать обмен (transport.Exchange); токены скрываются."""
+        request = exchange.request
+        if 'headers' in request:
+            request = dict(request, headers=redact_headers(request['headers']))
+        self.write(
+            kind, request, exchange.started_at, exchange.duration,
+            status_code=exchange.status_code, response=exchange.response,
+            error=exchange.error
+        )
+
+    def sink(self, kind):
+        """Приёмник обменов вида kind; None, если запись отключена."""
+        if not self.enabled:
+            return None
+        return functools.partial(self.write_exchange, kind)
+
+    def _recording(self, recorder, inner, kind):
+        return recorder(
+            inner, clock=self._timer, wall_clock=self._clock,
+            on_exchange=self.sink(kind)
+        )
+
+    def http_get(self, http_get):
+        """http_get, записывающий запросы к API Практикума."""
+        if not self.enabled:
+            return http_get
+        return self._recording(
+            transport.RecordingPracticumTransport,
+            transport.HttpGetTransport(http_get), PRACTICUM
+        ).get
+
+    def bot(self, bot):
+        """Обёртка бота (в том числе AsyncTeleBot), записывающая отправки."""
+        if not self.enabled:
+            return bot
+        return self._recording(
+            transport.RecordingTelegramTransport, bot, TELEGRAM
+        )
+
+    def close(self):
+        """Закрытие файла журнала."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_traffic(path):
+    """Записи журнала path по порядку."""
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
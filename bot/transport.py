@@ -0,0 +1,336 @@
+import abc
+import inspect
+import random
+import threading
+import time
+import zlib
+from collections import defaultdict, deque, namedtuple
+from http import HTTPStatus
+
+import requests
+from telebot.apihelper import ApiTelegramException
+
+import homework
+from bot.outbox import TOO_MANY_REQUESTS
+from bot.session import create_session
+
+Exchange = namedtuple('Exchange', (
+    'request', 'status_code', 'response', 'error', 'started_at', 'duration'
+))
+
+
+def response_body(response):
+    """Тело ответа для записи без повторного разбора JSON.
+
+    Возвращаются сырые байты content; у ответов без content (фейковых)
+    — результат их json(), который уже лежит в памяти.
+    """
+    body = getattr(response, 'content', None)
+    if isinstance(body, (bytes, str)):
+        return body
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class FakeResponse:
+    """Ответ в объёме, который использует fetch_homework_statuses()."""
+
+    __slots__ = ('status_code', 'data')
+
+    def __init__(self, data, status_code=HTTPStatus.OK):
+        """Ответ со статусом status_code и телом data."""
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        """Тело ответа; ValueError, если оно не JSON."""
+        if isinstance(self.data, (bytes, str)):
+            raise ValueError(self.data)
+        return self.data
+
+
+class PracticumTransport(abc.ABC):
+    """Транспорт к API Практикума.
+
+    get() повторяет сигнатуру requests.get(url, headers, params,
+    timeout) и возвращает объект с status_code и json(), поэтому
+    transport.get передаётся движку как http_get.
+    """
+
+    @abc.abstractmethod
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос к API."""
+
+    def close(self):
+        """Освобождение ресурсов транспорта."""
+
+
+class RequestsPracticumTransport(PracticumTransport):
+    """Настоящие запросы через пул соединений requests.Session."""
+
+    def __init__(self, session=None):
+        """Транспорт поверх session, по умолчанию create_session()."""
+        self.session = session or create_session()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос через сессию."""
+        return self.session.get(
+            url, headers=headers, params=params, timeout=timeout
+        )
+
+    def close(self):
+        """Закрытие сессии."""
+        self.session.close()
+
+
+class HttpGetTransport(PracticumTransport):
+    """Транспорт поверх функции с сигнатурой requests.get."""
+
+    def __init__(self, http_get):
+        """Запросы через http_get."""
+        self.http_get = http_get
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос через http_get."""
+        return self.http_get(
+            url, headers=headers, params=params, timeout=timeout
+        )
+
+
+class _Recorder:
+    """Общая часть записывающих обёрток: время и приёмник записей."""
+
+    def __init__(
+        self, inner, clock=time.monotonic, wall_clock=time.time,
+        on_exchange=None
+    ):
+        self.inner = inner
+        self.exchanges = []
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._on_exchange = on_exchange
+        self._lock = threading.Lock()
+
+    def _start(self):
+        return self._wall_clock(), self._clock()
+
+    def _record(self, request, status_code, response, error, started):
+        started_at, started = started
+        exchange = Exchange(
+            request, status_code, response, error, started_at,
+            self._clock() - started
+        )
+        if self._on_exchange is not None:
+            self._on_exchange(exchange)
+            return
+        with self._lock:
+            self.exchanges.append(exchange)
+
+
+class RecordingPracticumTransport(_Recorder, PracticumTransport):
+    """Обёртка, записывающая каждый обмен с вложенным транспортом.
+
+    Записи копятся в exchanges или, с on_exchange, передаются ему.
+    Тело ответа записывается как есть (response_body()), без разбора.
+    """
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """GET-запрос через inner с записью результата."""
+        request = dict(
+            url=url, headers=headers, params=params, timeout=timeout
+        )
+        started = self._start()
+        try:
+            response = self.inner.get(**request)
+        except Exception as error:
+            self._record(request, None, None, error, started)
+            raise
+        self._record(
+            request, response.status_code, response_body(response), None,
+            started
+        )
+        return response
+
+    def close(self):
+        """Закрытие вложенного транспорта."""
+        self.inner.close()
+
+
+class _FaultInjector:
+    """Задержка и случайные ошибки для фейковых транспортов."""
+
+    def __init__(self, latency, error_rate, rng, sleep):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = rng
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            latency = (
+                self.latency(self._rng) if callable(self.latency)
+                else self.latency
+            )
+        if latency:
+            self._sleep(latency)
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng() < self.error_rate
+
+
+class FakePracticumTransport(PracticumTransport):
+    """API Практикума в памяти процесса.
+
+    script задаёт по токену очередь ответов: словарь тела ответа,
+    FakeResponse или исключение, которое будет выброшено. Когда очередь
+    токена пуста, возвращается ответ без работ, а с вероятностью
+    change_rate — одна работа со случайным статусом. latency — пауза в
+    секундах или функция от rng; с вероятностью error_rate запрос
+    падает с requests.ConnectionError.
+    """
+
+    def __init__(
+        self, script=None, latency=0.0, error_rate=0.0, change_rate=0.0,
+        rng=None, sleep=time.sleep, clock=time.time
+    ):
+        """Фейковый API с заданным сценарием и параметрами сбоев."""
+        rng = rng or random.Random().random
+        self.faults = _FaultInjector(latency, error_rate, rng, sleep)
+        self.change_rate = change_rate
+        self.requests = 0
+        self._rng = rng
+        self._clock = clock
+        self._script = defaultdict(deque)
+        self._lock = threading.Lock()
+        for token, responses in (script or {}).items():
+            self.script(token, *responses)
+
+    def script(self, token, *responses):
+        """Добавить ответы в очередь токена token."""
+        with self._lock:
+            self._script[token].extend(responses)
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        """Ответ по сценарию или сгенерированный ответ."""
+        token = (headers or {}).get('Authorization', '').split()[-1:]
+        token = token[0] if token else ''
+        with self._lock:
+            self.requests += 1
+            queue = self._script.get(token)
+            response = queue.popleft() if queue else None
+        self.faults.delay()
+        if response is None and self.faults.should_fail():
+            raise requests.ConnectionError('Injected connection error')
+        if response is None:
+            response = self.generate(token)
+        if isinstance(response, Exception):
+            raise response
+        if not isinstance(response, FakeResponse):
+            response = FakeResponse(response)
+        return response
+
+    def generate(self, token):
+        """Ответ без сценария: пустой или с одной изменившейся работой."""
+        now = int(self._clock())
+        homeworks = []
+        with self._lock:
+            changed = self._rng() < self.change_rate
+            if changed:
+                status = sorted(homework.HOMEWORK_VERDICTS)[
+                    int(self._rng() * len(homework.HOMEWORK_VERDICTS))
+                ]
+        if changed:
+            homeworks.append({
+                'id': zlib.crc32(token.encode()),
+                'homework_name': f'{token}/homework.zip',
+                'status': status,
+                'date_updated': time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)
+                ),
+            })
+        return FakeResponse({'homeworks': homeworks, 'current_date': now})
+
+
+class TelegramTransport(abc.ABC):
+    """Транспорт к Telegram в объёме, который использует бот.
+
+    Настоящая реализация — telebot.TeleBot.
+    """
+
+    @abc.abstractmethod
+    def send_message(self, chat_id, text, timeout=None, **kwargs):
+        """Отправка сообщения в чат."""
+
+
+class RecordingTelegramTransport(_Recorder, TelegramTransport):
+    """Обёртка, записывающая каждую отправку через вложенный бот.
+
+    Записи копятся в exchanges или, с on_exchange, передаются ему.
+    Остальные атрибуты берутся у вложенного бота. Подходит и для
+    AsyncTeleBot: отправка записывается, когда корутина завершится.
+    """
+
+    def send_message(self, chat_id, text, timeout=None, **kwargs):
+        """Отправка через inner с записью результата."""
+        request = dict(chat_id=chat_id, text=text, timeout=timeout)
+        started = self._start()
+        try:
+            result = self.inner.send_message(**request, **kwargs)
+        except Exception as error:
+            self._record(request, None, None, error, started)
+            raise
+        if inspect.isawaitable(result):
+            return self._send_async(request, result, started)
+        self._record(request, None, None, None, started)
+        return result
+
+    async def _send_async(self, request, result, started):
+        try:
+            result = await result
+        except Exception as error:
+            self._record(request, None, None, error, started)
+            raise
+        self._record(request, None, None, None, started)
+        return result
+
+    def __getattr__(self, name):
+        """Атрибуты вложенного бота."""
+        return getattr(self.inner, name)
+
+
+class FakeTelegramTransport(TelegramTransport):
+    """Telegram в памяти процесса: отправленное копится в sent.
+
+    С вероятностью error_rate отправка падает с ApiTelegramException
+    429 и retry_after секунд паузы, как при превышении лимитов.
+    """
+
+    def __init__(
+        self, latency=0.0, error_rate=0.0, retry_after=1, rng=None,
+        sleep=time.sleep
+    ):
+        """Фейковый бот с заданной задержкой и частотой ошибок."""
+        rng = rng or random.Random().random
+        self.faults = _FaultInjector(latency, error_rate, rng, sleep)
+        self.retry_after = retry_after
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send_message(self, chat_id, text, timeout=None, **kwargs):
+        """Сохранение сообщения или внедрённая ошибка."""
+        self.faults.delay()
+        if self.faults.should_fail():
+            raise ApiTelegramException('sendMessage', None, {
+                'ok': False,
+                'error_code': TOO_MANY_REQUESTS,
+                'description': 'Too Many Requests: injected',
+                'parameters': {'retry_after': self.retry_after},
+            })
+        with self._lock:
+            self.sent.append((chat_id, text))
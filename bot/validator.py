@@ -0,0 +1,149 @@
+from collections import namedtuple
+
+from bot.records import HomeworkRecord
+
+# Маркер, по которому шаблон сообщения режется на части вокруг {name}.
+NAME_MARK = '\x00'
+
+
+class Extracted:
+    """Итог extract(): работы, сообщения о них и найденные ошибки.
+
+    HomeworkRecord собираются при первом обращении к homeworks: в цикле
+    проверки копятся только ссылки на словари и статусы, а записи
+    не создаются, если они не нужны (бенчмарк, replay).
+    """
+
+    __slots__ = ('items', 'statuses', 'messages', 'issues', '_homeworks')
+
+    def __init__(self, items, statuses, messages, issues):
+        """Итог по прошедшим проверку items со статусами statuses."""
+        self.items = items
+        self.statuses = statuses
+        self.messages = messages
+        self.issues = issues
+        self._homeworks = None
+
+    @property
+    def homeworks(self):
+        """Список HomeworkRecord от старых работ к новым."""
+        if self._homeworks is None:
+            self._homeworks = list(map(
+                HomeworkRecord.from_item, self.items, self.statuses
+            ))
+        return self._homeworks
+
+
+class ValidationIssue(namedtuple('ValidationIssue', (
+    'error', 'template', 'fields'
+))):
+    """Найденная ошибка; текст форматируется только в exception()."""
+
+    __slots__ = ()
+
+    def exception(self):
+        """Исключение error с отформатированным сообщением."""
+        return self.error(self.template.format(**self.fields))
+
+
+class HomeworksValidator:
+    """Проверка ответа API и подготовка сообщений за один проход.
+
+    Схема ответа фиксирована: словарь с ключом homeworks, в котором
+    список словарей с ключами homework_name и status, где status — ключ
+    verdicts. Валидатор собирается один раз: для каждого статуса заранее
+    готовится сообщение без имени работы, поэтому на работу приходится
+    одно обращение к словарю и одна конкатенация. Записи HomeworkRecord
+    со статусом-ключом verdicts собираются вне цикла, при обращении к
+    Extracted.homeworks. Ошибки копятся как ValidationIssue и
+    превращаются в текст, только если их поднимают.
+    """
+
+    def __init__(
+        self, verdicts, update_template, unknown_status_template,
+        key_error_template, type_error_template
+    ):
+        """Валидатор со статусами verdicts и шаблонами сообщений."""
+        self.unknown_status_template = unknown_status_template
+        self.key_error_template = key_error_template
+        self.type_error_template = type_error_template
+        self._parts = {
+            status: (*update_template.format(
+                name=NAME_MARK, verdict=verdict
+            ).split(NAME_MARK, 1), status)
+            for status, verdict in verdicts.items()
+        }
+
+    def _type_issue(self, name, expected_type, value):
+        return ValidationIssue(TypeError, self.type_error_template, dict(
+            name=name, expected_type=expected_type, actual_type=type(value)
+        ))
+
+    def _key_issue(self, key_name, dict_name):
+        return ValidationIssue(KeyError, self.key_error_template, dict(
+            key_name=key_name, dict_name=dict_name
+        ))
+
+    def response_issue(self, response):
+        """Ошибка структуры ответа верхнего уровня или None."""
+        if not isinstance(response, dict):
+            return self._type_issue('response', 'dict', response)
+        if 'homeworks' not in response:
+            return self._key_issue('homeworks', 'response')
+        homeworks = response['homeworks']
+        if not isinstance(homeworks, list):
+            return self._type_issue('homeworks', 'list', homeworks)
+        return None
+
+    def check(self, response):
+        """Проверка ответа верхнего уровня; исключение при ошибке."""
+        issue = self.response_issue(response)
+        if issue is not None:
+            raise issue.exception()
+
+    def extract(self, homeworks):
+        """Работы и сообщения о них от старых к новым за один проход.
+
+        Возвращает Extracted, где homeworks — список HomeworkRecord;
+        работы с ошибками в результат не попадают, а их ошибки — в
+        issues.
+        """
+        parts = self._parts
+        items = []
+        statuses = []
+        messages = []
+        issues = []
+        for item in reversed(homeworks):
+            try:
+                name = item['homework_name']
+                prefix, suffix, status = parts[item['status']]
+            except (KeyError, TypeError):
+                issues.append(self._item_issue(item))
+                continue
+            items.append(item)
+            statuses.append(status)
+            messages.append(f'{prefix}{name}{suffix}')
+        return Extracted(items, statuses, messages, issues)
+
+    def validate(self, response):
+        """Проверка ответа целиком и Extracted по списку homeworks."""
+        self.check(response)
+        return self.extract(response['homeworks'])
+
+    def render(self, homework):
+        """Сообщение об одной работе; исключение при ошибке."""
+        extracted = self.extract((homework,))
+        if extracted.issues:
+            raise extracted.issues[0].exception()
+        return extracted.messages[0]
+
+    def _item_issue(self, item):
+        if not isinstance(item, dict):
+            return self._type_issue('homework', 'dict', item)
+        for key in ('homework_name', 'status'):
+            if key not in item:
+                return self._key_issue(key, 'homework')
+        return ValidationIssue(
+            ValueError, self.unknown_status_template,
+            dict(name=item['status'])
+        )
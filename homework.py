@@ -1,19 +1,44 @@
+import atexit
+import functools
 import logging
 import os
 import time
 from http import HTTPStatus
 
-import requests
-from dotenv import load_dotenv
-from requests import RequestException
-from telebot import TeleBot
+from bot.changes import UNCHANGED, UNCHANGED_RESPONSE_MESSAGE, ChangeTracker
+from bot.deadline import Deadline, DeadlineExceeded
+from bot.decoding import DEFAULT_BACKEND, JsonDecoder
+from bot.dedup import (DEFAULT_CAPACITY, DEFAULT_ERROR_RATE, DEFAULT_LRU_SIZE,
+                       create_dedup_index)
+from bot.errors import (DEFAULT_WINDOW, ERROR_ALERT_MESSAGE, ErrorTracker,
+                        mark_stage)
+from bot.lazy import lazy_import, load_dotenv_near
+from bot.log_queue import (DEFAULT_QUEUE_SIZE, create_file_handler,
+                           create_queue_logging)
+from bot.metrics import REGISTRY, MetricsServer, timed
+from bot.profiling import (DEFAULT_DIRECTORY, DEFAULT_EVERY, DEFAULT_KEEP,
+                           DEFAULT_TOP, create_profiler)
+from bot.storage import CheckpointStore
+from bot.traffic import TrafficLog
+from bot.validator import HomeworksValidator
 
-load_dotenv()
+requests = lazy_import('requests')
+telebot = lazy_import('telebot')
+
+load_dotenv_near(__file__)
 
 APP_ENV = os.getenv('APP_ENV')
+PROFILE = os.getenv('PROFILE')
+PROFILE_DIR = os.getenv('PROFILE_DIR') or DEFAULT_DIRECTORY
+PROFILE_EVERY = int(os.getenv('PROFILE_EVERY') or DEFAULT_EVERY)
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP') or DEFAULT_KEEP)
+PROFILE_TOP = int(os.getenv('PROFILE_TOP') or DEFAULT_TOP)
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+STATE_DB = os.getenv('STATE_DB')
+OUTBOX_DB = os.getenv('OUTBOX_DB')
+OUTBOX_MAX_SIZE = int(os.getenv('OUTBOX_MAX_SIZE') or 0)
 
 REQUIRED_ENV_VARS = ['PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID']
 
@@ -49,11 +74,58 @@ NOT_SENT_TO_TG_MESSAGE = (
     'Ошибка:"{exception}"; Сообщение: "{message}"; не отправлено.'
 )
 NO_HOMEWORK_UPDATES_MESSAGE = 'Обновлений по домашним работам не найдено'
-EXCEPTION_MESSAGE = 'Application Error: {error}'
+EXCEPTION_MESSAGE = ERROR_ALERT_MESSAGE
+LOOP_DEADLINE_MESSAGE = 'Отправка пропущена по дедлайну: {error}'
+LOOP_OVERRUN_MESSAGE = (
+    'Итерация заняла {elapsed:.2f} c при бюджете {budget} c.'
+)
 
 RETRY_PERIOD = 10 * 60
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+TELEGRAM_MESSAGE_LIMIT = 4096
+MESSAGES_SEPARATOR = '\n\n'
+TRUNCATION_MARK = '…'
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT') or 3.05)
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT') or 27)
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+POLL_BUDGET = float(os.getenv('POLL_BUDGET') or 30)
+ENDPOINT = os.getenv('PRACTICUM_API_URL') or (
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+TRAFFIC = TrafficLog(os.getenv('TRAFFIC_LOG'))
+CHANGES = ChangeTracker()
+DEDUP_LRU_SIZE = int(os.getenv('DEDUP_LRU_SIZE') or DEFAULT_LRU_SIZE)
+DEDUP_BLOOM = os.getenv('DEDUP_BLOOM')
+DEDUP_CAPACITY = int(os.getenv('DEDUP_CAPACITY') or DEFAULT_CAPACITY)
+DEDUP_ERROR_RATE = float(os.getenv('DEDUP_ERROR_RATE') or DEFAULT_ERROR_RATE)
+ERROR_WINDOW = float(os.getenv('ERROR_WINDOW') or DEFAULT_WINDOW)
+JSON_DECODER = os.getenv('JSON_DECODER') or DEFAULT_BACKEND
+DECODER = JsonDecoder(JSON_DECODER)
+METRICS_PORT = int(os.getenv('METRICS_PORT') or 0)
+LOG_LEVEL = os.getenv('LOG_LEVEL') or 'DEBUG'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE') or DEFAULT_QUEUE_SIZE)
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES') or 0)
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT') or 5)
+LOG_FORMAT = (
+    '%(asctime)s - '
+    '[%(levelname)s] - '
+    '%(funcName)s::%(lineno)d: %(message)s'
+)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'homework_stage_seconds', 'Длительность этапа конвейера, сек.',
+    ('stage',)
+)
+STAGE_ERRORS = REGISTRY.counter(
+    'homework_stage_errors_total', 'Ошибки этапа конвейера.', ('stage',)
+)
+LOOP_SECONDS = REGISTRY.histogram(
+    'homework_loop_seconds', 'Длительность итерации main() без паузы, сек.'
+)
+LOOP_OVERRUNS = REGISTRY.counter(
+    'homework_loop_overruns_total',
+    'Итерации main(), превысившие бюджет POLL_BUDGET.'
+)
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -62,6 +134,42 @@ HOMEWORK_VERDICTS = {
 }
 
 
+VALIDATOR = HomeworksValidator(
+    HOMEWORK_VERDICTS, UPDATE_STATUS_HOMEWORK_MESSAGE,
+    UNKNOWN_STATUS_HOMEWORK_MESSAGE, KEY_ERROR_MESSAGE, TYPE_ERROR_MESSAGE
+)
+
+
+def stage(name):
+    """Декоратор этапа name: метрики длительности и ошибок, метка этапа.
+
+    Исключения этапа помечаются атрибутом stage для отпечатка ошибки.
+    """
+    def decorator(function):
+        measured = timed(
+            STAGE_SECONDS.labels(name), STAGE_ERRORS.labels(name)
+        )(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            try:
+                return measured(*args, **kwargs)
+            except Exception as error:
+                mark_stage(error, name)
+                raise
+        return wrapper
+    return decorator
+
+
+class ApiStatusCodeError(ValueError):
+    """Ответ API домашки с кодом, отличным от 200."""
+
+    def __init__(self, message, status_code):
+        """Сообщение об ошибке и полученный status_code."""
+        super().__init__(message)
+        self.status_code = status_code
+
+
 def check_tokens():
     """Проверка значений обязательных переменных окружений приложения."""
     env_names = [
@@ -75,10 +183,20 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправка сообщения в чат AppConfig.TELEGRAM_CHAT_ID."""
+    return send_message_to_chat(
+        TRAFFIC.bot(bot), TELEGRAM_CHAT_ID, message, timeout=READ_TIMEOUT
+    )
+
+
+@stage('send_message')
+def send_message_to_chat(bot, chat_id, message, timeout=None):
+    """Отправка сообщения в произвольный чат chat_id."""
+    options = {} if timeout is None else {'timeout': timeout}
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        bot.send_message(chat_id=chat_id, text=message, **options)
         logging.debug(SENT_TO_TG_MESSAGE.format(message=message))
     except Exception as e:
+        STAGE_ERRORS.labels('send_message').inc()
         logging.exception(NOT_SENT_TO_TG_MESSAGE.format(
             exception=e, message=message
         ))
@@ -87,125 +205,297 @@ def send_message(bot, message):
 
 
 def get_api_answer(timestamp):
-    """Запрос и получение ответа от GET /homework_statuses/."""
+    """Запрос и получение ответа от GET /homework_statuses/.
+
+    Если ответ совпал с уже обработанным (CHANGES), возвращается
+    UNCHANGED без разбора JSON.
+    """
+    return fetch_homework_statuses(
+        TRAFFIC.http_get(requests.get), HEADERS, timestamp,
+        changes=CHANGES, key=TELEGRAM_CHAT_ID
+    )
+
+
+@stage('get_api_answer')
+def fetch_homework_statuses(
+    http_get, headers, timestamp, timeout=REQUEST_TIMEOUT, endpoint=None,
+    changes=None, key=None
+):
+    """Запрос к GET /homework_statuses/ через переданный http_get.
+
+    С changes (ChangeTracker) запрос дополняется условными заголовками,
+    а ответ, совпавший с обработанным для key, возвращается как
+    UNCHANGED. Тело разбирает DECODER (orjson, если он установлен).
+    """
+    if changes is not None:
+        headers = changes.request_headers(key, headers)
     request_params = dict(
-        url=ENDPOINT,
-        headers=HEADERS,
-        params={'from_date': timestamp}
+        url=endpoint or ENDPOINT,
+        headers=headers,
+        params={'from_date': timestamp},
+        timeout=timeout
     )
     try:
-        response = requests.get(**request_params)
-    except RequestException as e:
+        response = http_get(**request_params)
+    except requests.RequestException as e:
         raise ConnectionError(
             CONNECTION_ERROR_DETAIL_MESSAGE.format(
                 exception=e,
                 **request_params
             )
-        )
-    response_json = response.json()
+        ) from e
     status_code = response.status_code
+    if changes is not None and changes.check(
+        key, status_code, getattr(response, 'content', None),
+        getattr(response, 'headers', None)
+    ):
+        return UNCHANGED
     if status_code != HTTPStatus.OK:
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = {}
+        if not isinstance(response_json, dict):
+            response_json = {}
         error_key_values = {
             key: response_json.get(key, '')
             for key in ('error', 'code')
         }
-        raise ValueError(
+        raise ApiStatusCodeError(
             INCORRECT_STATUS_CODE_DETAIL_MESSAGE.format(
                 status_code=status_code,
                 **request_params,
                 **error_key_values
-            )
+            ),
+            status_code
         )
-    return response_json
+    return DECODER.response_json(response)
 
 
+@stage('check_response')
 def check_response(response):
-    """Функция создает и возвращает экземпляр класса HomeworkStatusesDTO."""
-    if not isinstance(response, dict):
-        raise TypeError(
-            TYPE_ERROR_MESSAGE.format(
-                name='response',
-                expected_type='dict',
-                actual_type=type(response)
-            )
-        )
-    if 'homeworks' not in response:
-        raise KeyError(
-            KEY_ERROR_MESSAGE.format(
-                key_name='homeworks',
-                dict_name='response'
-            )
-        )
-    homeworks = response['homeworks']
-    if not isinstance(homeworks, list):
-        raise TypeError(
-            TYPE_ERROR_MESSAGE.format(
-                name='homeworks',
-                expected_type='list',
-                actual_type=type(homeworks)
-            )
-        )
+    """Проверка структуры ответа API: словарь со списком homeworks."""
+    VALIDATOR.check(response)
 
 
+@stage('parse_status')
 def parse_status(homework):
     """Проверка наличия ключей и значения status."""
-    for key in ('homework_name', 'status'):
-        if key not in homework:
-            raise KeyError(
-                KEY_ERROR_MESSAGE.format(
-                    key_name=key,
-                    dict_name='homework'
-                )
-            )
-    status = homework.get('status')
-    verdict = HOMEWORK_VERDICTS.get(status)
-    if not verdict:
-        raise ValueError(UNKNOWN_STATUS_HOMEWORK_MESSAGE.format(name=status))
-    return UPDATE_STATUS_HOMEWORK_MESSAGE.format(
-        name=homework.get('homework_name'),
-        verdict=verdict
+    return VALIDATOR.render(homework)
+
+
+@stage('extract_updates')
+def extract_updates(homeworks):
+    """Проверка всех работ и сообщения о них за один проход.
+
+    Возвращает Extracted с работами и сообщениями от старых работ к
+    новым; при ошибке в какой-либо работе поднимается первая из них.
+    """
+    extracted = VALIDATOR.extract(homeworks)
+    if extracted.issues:
+        raise extracted.issues[0].exception()
+    return extracted
+
+
+def coalesce_messages(messages, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Объединение сообщений в минимум частей не длиннее limit.
+
+    Сообщения по порядку дописываются через MESSAGES_SEPARATOR, пока часть
+    помещается в limit, и режутся только по границам сообщений. Сообщение
+    длиннее limit само по себе обрезается с TRUNCATION_MARK на конце.
+    """
+    chunks = []
+    length = 0
+    for message in messages:
+        if len(message) > limit:
+            message = message[:limit - len(TRUNCATION_MARK)] + TRUNCATION_MARK
+        if chunks and length + len(MESSAGES_SEPARATOR) + len(message) <= limit:
+            chunks[-1].append(message)
+            length += len(MESSAGES_SEPARATOR) + len(message)
+        else:
+            chunks.append([message])
+            length = len(message)
+    return [MESSAGES_SEPARATOR.join(chunk) for chunk in chunks]
+
+
+def create_dedup():
+    """Индекс отправленных уведомлений по настройкам DEDUP_*."""
+    return create_dedup_index(
+        DEDUP_LRU_SIZE, DEDUP_BLOOM, DEDUP_CAPACITY, DEDUP_ERROR_RATE
+    )
+
+
+def create_outbox(bot):
+    """Постоянная очередь отправки в OUTBOX_DB; None, если он не задан.
+
+    bot.outbox импортирует этот модуль, поэтому импорт отложен.
+    """
+    if not OUTBOX_DB:
+        return None
+    from bot.outbox import DEFAULT_MAX_SIZE, Outbox
+    from bot.outbox_queue import SqliteOutboxQueue
+    max_size = OUTBOX_MAX_SIZE or DEFAULT_MAX_SIZE
+    outbox = Outbox(
+        TRAFFIC.bot(bot), workers=1, max_size=max_size,
+        queue=SqliteOutboxQueue(OUTBOX_DB, max_size)
+    )
+    outbox.start()
+    return outbox
+
+
+def notify(bot, outbox, message):
+    """Отправка сообщения или постановка в outbox, если он задан."""
+    if outbox is None:
+        return send_message(bot, message)
+    return outbox.put(TELEGRAM_CHAT_ID, message)
+
+
+def unannounced(dedup, homeworks, messages):
+    """Работы и сообщения, о которых ещё не сообщали.
+
+    Возвращает тройки (ключ уведомления, работа, сообщение) в порядке
+    homeworks.
+    """
+    triples = (
+        (record.key, record, message)
+        for record, message in zip(homeworks, messages)
     )
+    return [triple for triple in triples if not dedup.seen(triple[0])]
+
+
+def save_checkpoint(store, timestamp, records):
+    """Сохранение from_date и статусов записей HomeworkRecord.
+
+    Ничего не делает, если STATE_DB не задан.
+    """
+    if store is None:
+        return
+    store.save(TELEGRAM_CHAT_ID, timestamp, [
+        (record.id, record.status) for record in records
+    ])
+
+
+def report_error(bot, errors, error, outbox=None):
+    """Лог ошибки и оповещение о ней не чаще раза в окно errors."""
+    message = errors.record(error)
+    if message is None:
+        logging.error(errors.repeated_message(error))
+        return
+    logging.exception(EXCEPTION_MESSAGE.format(error=error))
+    if notify(bot, outbox, message):
+        errors.reported(error)
+
+
+def record_iteration(elapsed, overrun=False):
+    """Учёт длительности итерации main() и превышения POLL_BUDGET."""
+    LOOP_SECONDS.observe(elapsed)
+    if overrun or elapsed > POLL_BUDGET:
+        LOOP_OVERRUNS.inc()
+        logging.warning(LOOP_OVERRUN_MESSAGE.format(
+            elapsed=elapsed, budget=POLL_BUDGET
+        ))
 
 
 def main():
-    """Основная логика работы бота."""
+    """Основная логика работы бота.
+
+    На итерацию отводится POLL_BUDGET секунд. Дедлайн проверяется перед
+    отправкой: если запрос к API съел бюджет, обновление не отправляется
+    и будет получено заново, а начатая отправка доводится до конца,
+    чтобы не разослать его частично. Превышения пишутся в лог и
+    считаются в LOOP_OVERRUNS. С OUTBOX_DB сообщения ставятся в
+    постоянную очередь, и timestamp сдвигается, как только очередь их
+    приняла, а не после доставки.
+    """
     check_tokens()
-    bot = TeleBot(TELEGRAM_TOKEN)
-    last_exception_msg = None
-    timestamp = 0
+    bot = telebot.TeleBot(TELEGRAM_TOKEN)
+    errors = ErrorTracker(ERROR_WINDOW)
+    profiler = create_profiler(
+        PROFILE, directory=PROFILE_DIR, every=PROFILE_EVERY,
+        keep=PROFILE_KEEP, top=PROFILE_TOP
+    )
+    dedup = create_dedup()
+    outbox = create_outbox(bot)
+    store = CheckpointStore(STATE_DB) if STATE_DB else None
+    timestamp = store.load_timestamp(TELEGRAM_CHAT_ID) if store else 0
+    CHANGES.clear()
     while True:
+        started = time.perf_counter()
+        deadline = Deadline(POLL_BUDGET, time.perf_counter)
+        overrun = False
+        profiler.start_iteration()
         try:
             response = get_api_answer(timestamp)
+            if response is UNCHANGED:
+                logging.debug(UNCHANGED_RESPONSE_MESSAGE)
+                continue
             check_response(response)
             homeworks = response['homeworks']
             if not homeworks:
                 logging.debug(NO_HOMEWORK_UPDATES_MESSAGE)
+                CHANGES.commit(TELEGRAM_CHAT_ID)
                 continue
-            if send_message(bot, parse_status(homeworks[0])):
+            extracted = extract_updates(homeworks)
+            fresh = unannounced(
+                dedup, extracted.homeworks, extracted.messages
+            )
+            deadline.check()
+            if all(
+                notify(bot, outbox, chunk)
+                for chunk in coalesce_messages(
+                    [message for _, _, message in fresh]
+                )
+            ):
+                for key, _, _ in fresh:
+                    dedup.add(key)
                 timestamp = response.get('current_date', timestamp)
+                save_checkpoint(store, timestamp, extracted.homeworks)
+                CHANGES.commit(TELEGRAM_CHAT_ID)
+        except DeadlineExceeded as error:
+            overrun = True
+            logging.warning(LOOP_DEADLINE_MESSAGE.format(error=error))
         except Exception as error:
-            message = EXCEPTION_MESSAGE.format(error=error)
-            logging.exception(message)
-            if message != last_exception_msg and send_message(bot, message):
-                last_exception_msg = message
+            report_error(bot, errors, error, outbox)
         finally:
+            profiler.end_iteration()
+            record_iteration(time.perf_counter() - started, overrun)
             time.sleep(RETRY_PERIOD)
 
 
-if __name__ == '__main__':
+def configure_logging():
+    """Настройка логирования приложения.
+
+    Логгер только кладёт записи в ограниченную очередь, а вывод в
+    консоль и файл выполняет фоновый поток слушателя.
+    """
     handlers = [logging.StreamHandler()]
     if APP_ENV != 'prod':
-        handlers.append(
-            logging.FileHandler(os.path.dirname(__file__) + '/.log')
-        )
+        handlers.append(create_file_handler(
+            os.path.dirname(__file__) + '/.log',
+            max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT
+        ))
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    queue_handler, listener = create_queue_logging(handlers, LOG_QUEUE_SIZE)
 
     logging.basicConfig(
-        format=(
-            '%(asctime)s - '
-            '[%(levelname)s] - '
-            '%(funcName)s::%(lineno)d: %(message)s'
-        ),
-        level=logging.DEBUG,
-        handlers=[*handlers]
+        level=LOG_LEVEL,
+        handlers=[queue_handler]
     )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Запуск эндпоинта /metrics, если задан порт METRICS_PORT."""
+    if not port:
+        return None
+    return MetricsServer(REGISTRY, port).start()
+
+
+if __name__ == '__main__':
+    configure_logging()
+    start_metrics_server()
     main()
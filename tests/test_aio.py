@@ -0,0 +1,120 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from bot.accounts import Account
+
+aiohttp = pytest.importorskip('aiohttp')
+
+from bot.aio import AsyncPollingEngine  # noqa: E402
+from bot.traffic import (PRACTICUM, TELEGRAM, TrafficLog,  # noqa: E402
+                         read_traffic)
+
+
+class FakeAsyncResponse:
+    def __init__(self, data, status=HTTPStatus.OK, headers=None):
+        self.data = data
+        self.status = status
+        self.headers = headers or {}
+
+    async def read(self):
+        return json.dumps(self.data).encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.closed = False
+
+    def get(self, url, headers, params, timeout):
+        token = headers['Authorization'].split()[-1]
+        self.calls.append((token, params['from_date']))
+        response = self.responses[token]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAsyncBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def run_cycles(engine, cycles=1):
+    async def run():
+        for _ in range(cycles):
+            await engine.run_cycle()
+        await engine.close()
+
+    asyncio.run(run())
+
+
+def test_run_cycle_polls_every_account(data_with_new_hw_status):
+    accounts = [Account(str(i), f't{i}', str(i)) for i in range(20)]
+    session = FakeSession({
+        account.token: FakeAsyncResponse(data_with_new_hw_status)
+        for account in accounts
+    })
+    bot = FakeAsyncBot()
+    engine = AsyncPollingEngine(
+        accounts, bot, session=session, max_in_flight=4
+    )
+    run_cycles(engine)
+    assert sorted(chat_id for chat_id, _ in bot.sent) == sorted(
+        account.chat_id for account in accounts
+    )
+    current_date = data_with_new_hw_status['current_date']
+    assert all(state.timestamp == current_date for state in engine.states)
+    assert session.closed
+
+
+def test_account_error_is_isolated(data_with_new_hw_status):
+    accounts = [Account('ok', 'good', '1'), Account('bad', 'broken', '2')]
+    session = FakeSession({
+        'good': FakeAsyncResponse(data_with_new_hw_status),
+        'broken': aiohttp.ClientConnectionError('refused'),
+    })
+    bot = FakeAsyncBot()
+    engine = AsyncPollingEngine(accounts, bot, session=session)
+    run_cycles(engine)
+    assert [chat_id for chat_id, _ in bot.sent] == ['1', '2']
+    assert engine.states[1].timestamp == 0
+    assert engine.states[1].failures == 1
+
+
+def test_async_traffic_is_recorded(tmp_path, data_with_new_hw_status):
+    path = tmp_path / 'traffic.jsonl'
+    log = TrafficLog(str(path))
+    accounts = [Account('ok', 'good', '1'), Account('bad', 'broken', '2')]
+    session = FakeSession({
+        'good': FakeAsyncResponse(data_with_new_hw_status),
+        'broken': aiohttp.ClientConnectionError('refused'),
+    })
+    engine = AsyncPollingEngine(
+        accounts, log.bot(FakeAsyncBot()), session=session,
+        on_exchange=log.sink(PRACTICUM)
+    )
+    run_cycles(engine)
+    log.close()
+    records = list(read_traffic(str(path)))
+    practicum = [record for record in records if record['kind'] == PRACTICUM]
+    assert len(practicum) == 2
+    assert json.loads(practicum[0]['response']) == data_with_new_hw_status
+    assert 'good' not in practicum[0]['request']['headers']['Authorization']
+    assert 'refused' in practicum[1]['error']
+    assert sum(record['kind'] == TELEGRAM for record in records) == 2
@@ -0,0 +1,91 @@
+import json
+from http import HTTPStatus
+
+import homework
+from bot.accounts import Account
+from bot.changes import UNCHANGED, ChangeTracker, body_digest
+from bot.engine import PollingEngine
+from bot.stubs import PracticumStub
+from tests.test_engine import FakeBot
+
+
+class RawResponse:
+    def __init__(self, data, status_code=HTTPStatus.OK, headers=None):
+        self.content = json.dumps(data).encode() if data is not None else b''
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def body(homeworks, current_date):
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': current_date}
+    ).encode()
+
+
+def test_digest_ignores_current_date():
+    assert body_digest(body([], 1)) == body_digest(body([], 1700000000))
+    assert body_digest(body([], 1)) != body_digest(body([{'id': 1}], 1))
+
+
+def test_response_is_unchanged_only_after_commit():
+    changes = ChangeTracker()
+    assert not changes.check('a', HTTPStatus.OK, body([], 1))
+    assert not changes.check('a', HTTPStatus.OK, body([], 2))
+    changes.commit('a')
+    assert changes.check('a', HTTPStatus.OK, body([], 3))
+    assert not changes.check('b', HTTPStatus.OK, body([], 3))
+    assert not changes.check('a', HTTPStatus.OK, None)
+    assert changes.unchanged == 1
+
+
+def test_conditional_headers_and_not_modified():
+    changes = ChangeTracker()
+    headers = {'Authorization': 'OAuth t'}
+    assert not changes.check('a', HTTPStatus.NOT_MODIFIED, b'')
+    changes.check('a', HTTPStatus.OK, body([], 1), {'ETag': '"v1"'})
+    assert changes.request_headers('a', headers) is headers
+    changes.commit('a')
+    assert changes.request_headers('a', headers) == {
+        'Authorization': 'OAuth t', 'If-None-Match': '"v1"'
+    }
+    assert changes.check('a', HTTPStatus.NOT_MODIFIED, b'')
+
+
+def test_unchanged_response_skips_json_decoding(data_with_new_hw_status):
+    changes = ChangeTracker()
+    requests = []
+
+    def http_get(url, headers, params, **kwargs):
+        requests.append(headers)
+        if 'If-None-Match' in headers:
+            return RawResponse(None, HTTPStatus.NOT_MODIFIED)
+        return RawResponse(data_with_new_hw_status, headers={'ETag': '"x"'})
+
+    response = homework.fetch_homework_statuses(
+        http_get, {}, 0, changes=changes, key='a'
+    )
+    assert response == data_with_new_hw_status
+    changes.commit('a')
+    assert homework.fetch_homework_statuses(
+        http_get, {}, 0, changes=changes, key='a'
+    ) is UNCHANGED
+    assert requests[-1] == {'If-None-Match': '"x"'}
+
+
+def test_engine_skips_repeated_stub_responses():
+    bot = FakeBot()
+    with PracticumStub() as stub:
+        engine = PollingEngine(
+            [Account('1', 't', '100')], bot, endpoint=stub.endpoint
+        )
+        try:
+            for _ in range(3):
+                engine.poll_account(engine.states[0])
+        finally:
+            engine.close()
+    assert len(bot.sent) == 1
+    assert engine.changes.unchanged >= 1
+    assert engine.states[0].idle_polls >= 1
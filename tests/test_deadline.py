@@ -0,0 +1,39 @@
+import pytest
+
+from bot.clock import SimulatedClock
+from bot.deadline import Deadline, DeadlineExceeded
+from bot.stats import LatencyStats, percentile
+
+
+def test_deadline_caps_timeouts():
+    clock = SimulatedClock()
+    deadline = Deadline(10, clock=clock.monotonic)
+    assert deadline.timeout((3.05, 27)) == (3.05, 10)
+    clock.advance(8)
+    assert deadline.remaining() == pytest.approx(2)
+    assert deadline.timeout(27) == pytest.approx(2)
+    assert not deadline.expired
+
+
+def test_expired_deadline_raises():
+    clock = SimulatedClock()
+    deadline = Deadline(1, clock=clock.monotonic)
+    clock.advance(1)
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout(5)
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+
+def test_latency_stats_summary():
+    stats = LatencyStats()
+    for value in range(1, 101):
+        stats.record(value / 100, overrun=value > 95)
+    summary = stats.summary()
+    assert summary.count == 100
+    assert summary.p50 == 0.5
+    assert summary.p99 == 0.99
+    assert summary.max == 1.0
+    assert summary.overruns == 5
+    assert percentile([], 0.5) == 0.0
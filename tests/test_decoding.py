@@ -0,0 +1,79 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+import homework
+from benchmarks.decoding import run
+from bot.decoding import JsonDecoder, backend_loads
+
+RESPONSE = {
+    'current_date': 1700000000.25,
+    'homeworks': [
+        {
+            'id': number,
+            'status': 'approved',
+            'homework_name': f'студент{number} "{{hw}}" [].zip',
+            'reviewer_comment': 'Отлично ✓\n',
+            'date_updated': '2024-01-01T00:00:00Z',
+        }
+        for number in range(20)
+    ],
+    'extra': [True, False, None, 1.5e3, 17e3, 0.1, -2.5e10],
+}
+
+
+class ContentResponse:
+    status_code = HTTPStatus.OK
+
+    def __init__(self, content):
+        self.content = content
+
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_backends_agree(backend):
+    if backend == 'orjson':
+        pytest.importorskip('orjson')
+    body = json.dumps(RESPONSE, ensure_ascii=False).encode()
+    assert JsonDecoder(backend).loads(body) == RESPONSE
+
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_invalid_body_raises_value_error(backend):
+    if backend == 'orjson':
+        pytest.importorskip('orjson')
+    with pytest.raises(ValueError):
+        JsonDecoder(backend).loads(b'{"a": 1,}')
+
+
+def test_json_method_is_used_without_content():
+    class JsonResponse:
+        def json(self):
+            return RESPONSE
+
+    assert JsonDecoder().response_json(JsonResponse()) is RESPONSE
+
+
+def test_fetch_uses_decoder():
+    body = json.dumps(RESPONSE).encode()
+    response = homework.fetch_homework_statuses(
+        lambda **kwargs: ContentResponse(body), {}, 0
+    )
+    assert response == RESPONSE
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        JsonDecoder('simdjson')
+
+
+def test_auto_backend_prefers_orjson():
+    orjson = pytest.importorskip('orjson')
+    assert backend_loads('auto') is orjson.loads
+    assert backend_loads('json') is json.loads
+
+
+def test_decoding_benchmark_smoke():
+    results = run(200, repeat=1, decoders={'json': JsonDecoder('json')})
+    assert [result.name for result in results] == ['json']
+    assert results[0].seconds > 0
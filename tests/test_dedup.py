@@ -0,0 +1,86 @@
+import homework
+from bot.accounts import Account
+from bot.dedup import (BloomFilter, DedupIndex, create_dedup_index,
+                       notification_key)
+from bot.engine import PollingEngine
+from tests.test_engine import FakeBot, FakeResponse, make_http_get
+
+
+def keys(start, stop):
+    return [notification_key(number, 'approved', 'date') for number in range(
+        start, stop
+    )]
+
+
+def test_bloom_is_sized_for_error_rate():
+    bloom = BloomFilter(capacity=1_000_000, error_rate=0.001)
+    assert 14_300_000 < bloom.bits < 14_500_000
+    assert bloom.hashes == 10
+
+
+def test_bloom_false_positive_rate():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for key in keys(0, 5000):
+        bloom.add(key)
+    assert all(key in bloom for key in keys(0, 5000))
+    false_positives = sum(key in bloom for key in keys(5000, 25000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_bloom_file_survives_restart(tmp_path):
+    path = str(tmp_path / 'sent.bloom')
+    bloom = BloomFilter(capacity=1000, error_rate=0.01, path=path)
+    bloom.add(keys(0, 1)[0])
+    bloom.close()
+    bloom = BloomFilter(capacity=1000, error_rate=0.01, path=path)
+    assert keys(0, 1)[0] in bloom
+    bloom.close()
+    bloom = BloomFilter(capacity=2000, error_rate=0.01, path=path)
+    assert keys(0, 1)[0] not in bloom
+    bloom.close()
+
+
+def test_lru_is_bounded():
+    index = DedupIndex(lru_size=2)
+    first, second, third = keys(0, 3)
+    for key in (first, second, third):
+        index.add(key)
+    assert len(index) == 2
+    assert not index.seen(first)
+    assert index.seen(second) and index.seen(third)
+
+
+def test_key_includes_date_updated():
+    assert notification_key(1, 'approved', 'a') != notification_key(
+        1, 'approved', 'b'
+    )
+
+
+def test_unannounced_skips_sent_homeworks(data_with_new_hw_status):
+    dedup = DedupIndex()
+    extracted = homework.extract_updates(data_with_new_hw_status['homeworks'])
+    homeworks, messages = extracted.homeworks, extracted.messages
+    fresh = homework.unannounced(dedup, homeworks, messages)
+    assert [record for _, record, _ in fresh] == homeworks
+    for key, _, _ in fresh:
+        dedup.add(key)
+    assert homework.unannounced(dedup, homeworks, messages) == []
+
+
+def test_restarted_engine_does_not_repeat_notification(
+    tmp_path, data_with_new_hw_status
+):
+    path = str(tmp_path / 'sent.bloom')
+    account = Account('1', 't', '100')
+    http_get = make_http_get({'t': FakeResponse(data_with_new_hw_status)})
+    bot = FakeBot()
+    for _ in range(2):
+        engine = PollingEngine(
+            [account], bot, http_get=http_get,
+            dedup=create_dedup_index(bloom_path=path, capacity=1000)
+        )
+        try:
+            engine.poll_account(engine.states[0])
+        finally:
+            engine.close()
+    assert len(bot.sent) == 1
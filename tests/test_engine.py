@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from bot.accounts import Account, load_accounts, parse_accounts
+from bot.engine import PollingEngine
+from bot.outbox import Outbox
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=HTTPStatus.OK):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        with self._lock:
+            self.sent.append((chat_id, text))
+
+
+def make_http_get(responses):
+    calls = []
+
+    def http_get(url, headers, params, **kwargs):
+        token = headers['Authorization'].split()[-1]
+        calls.append((token, params['from_date']))
+        return responses[token]
+
+    http_get.calls = calls
+    return http_get
+
+
+def test_parse_accounts_defaults_id_to_chat_id():
+    accounts = parse_accounts([
+        {'token': 't1', 'chat_id': 1},
+        {'id': 'second', 'token': 't2', 'chat_id': 2},
+    ])
+    assert accounts == [
+        Account('1', 't1', '1'),
+        Account('second', 't2', '2'),
+    ]
+    assert accounts[0].headers == {'Authorization': 'OAuth t1'}
+
+
+@pytest.mark.parametrize('raw, error', [
+    ({'token': 't'}, TypeError),
+    ([{'token': 't'}], KeyError),
+    ([{'token': 't', 'chat_id': 1}, {'token': 'x', 'chat_id': 1}],
+     ValueError),
+    ([], ValueError),
+])
+def test_parse_accounts_invalid(raw, error):
+    with pytest.raises(error):
+        parse_accounts(raw)
+
+
+def test_load_accounts(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([{'token': 't', 'chat_id': 5}]))
+    assert load_accounts(path) == [Account('5', 't', '5')]
+
+
+def test_run_cycle_polls_every_account(data_with_new_hw_status):
+    accounts = [Account(str(i), f't{i}', str(i)) for i in range(20)]
+    http_get = make_http_get({
+        account.token: FakeResponse(data_with_new_hw_status)
+        for account in accounts
+    })
+    bot = FakeBot()
+    engine = PollingEngine(accounts, bot, max_workers=4, http_get=http_get)
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert sorted(chat_id for chat_id, _ in bot.sent) == sorted(
+        account.chat_id for account in accounts
+    )
+    current_date = data_with_new_hw_status['current_date']
+    assert all(state.timestamp == current_date for state in engine.states)
+
+
+def test_account_error_is_isolated(data_with_new_hw_status):
+    accounts = [Account('ok', 'good', '1'), Account('bad', 'broken', '2')]
+    http_get = make_http_get({
+        'good': FakeResponse(data_with_new_hw_status),
+        'broken': FakeResponse({}, HTTPStatus.INTERNAL_SERVER_ERROR),
+    })
+    bot = FakeBot()
+    engine = PollingEngine(accounts, bot, max_workers=2, http_get=http_get)
+    try:
+        engine.run_cycle()
+        engine.run_cycle()
+    finally:
+        engine.close()
+    errors = [text for chat_id, text in bot.sent if chat_id == '2']
+    assert len(errors) == 1
+    assert engine.states[1].timestamp == 0
+
+
+def test_poll_over_budget_is_cut_short(data_with_new_hw_status):
+    seen_timeouts = []
+
+    def slow_http_get(url, headers, params, timeout):
+        seen_timeouts.append(timeout)
+        time.sleep(0.06)
+        return FakeResponse(data_with_new_hw_status)
+
+    bot = FakeBot()
+    engine = PollingEngine(
+        [Account('1', 't', '1')], bot, http_get=slow_http_get,
+        poll_budget=0.05, request_timeout=(3.05, 27)
+    )
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert seen_timeouts[0][0] <= 0.05 and seen_timeouts[0][1] <= 0.05
+    assert bot.sent == []
+    assert engine.states[0].timestamp == 0
+    assert engine.latency.summary().overruns == 1
+
+
+def test_started_delivery_is_not_cut_by_deadline(data_with_new_hw_status):
+    first = data_with_new_hw_status['homeworks'][0]
+    data = dict(data_with_new_hw_status, homeworks=[
+        dict(first, id=number, homework_name=f'{number}' * 3000)
+        for number in range(3)
+    ])
+
+    class SlowBot(FakeBot):
+        def send_message(self, chat_id=None, text=None, **kwargs):
+            time.sleep(0.03)
+            super().send_message(chat_id, text, **kwargs)
+
+    bot = SlowBot()
+    engine = PollingEngine(
+        [Account('1', 't', '1')], bot,
+        http_get=make_http_get({'t': FakeResponse(data)}), poll_budget=0.05
+    )
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert len(bot.sent) == 3
+    assert engine.states[0].timestamp == data['current_date']
+    assert engine.latency.summary().overruns == 1
+
+
+def test_all_homeworks_are_sent_in_one_message(data_with_new_hw_status):
+    first = data_with_new_hw_status['homeworks'][0]
+    data = dict(data_with_new_hw_status, homeworks=[
+        dict(first, id=3, homework_name='hw3.zip', status='reviewing'),
+        dict(first, id=2, homework_name='hw2.zip', status='rejected'),
+        first,
+    ])
+    bot = FakeBot()
+    engine = PollingEngine(
+        [Account('1', 't', '1')], bot,
+        http_get=make_http_get({'t': FakeResponse(data)})
+    )
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert len(bot.sent) == 1
+    text = bot.sent[0][1]
+    assert text.index('hw123.zip') < text.index('hw2.zip') < text.index(
+        'hw3.zip'
+    )
+    assert engine.states[0].notified == {
+        '777777777': 'approved', '2': 'rejected', '3': 'reviewing'
+    }
+
+
+def test_engine_enqueues_into_outbox(data_with_new_hw_status):
+    bot = FakeBot()
+    outbox = Outbox(bot)
+    engine = PollingEngine(
+        [Account('1', 't', '1')], bot, outbox=outbox,
+        http_get=make_http_get({'t': FakeResponse(data_with_new_hw_status)})
+    )
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert bot.sent == []
+    assert len(outbox) == 1
+    current_date = data_with_new_hw_status['current_date']
+    assert engine.states[0].timestamp == current_date
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import homework
+from bot.accounts import Account
+from bot.clock import SimulatedClock
+from bot.engine import PollingEngine
+from bot.errors import ErrorTracker, Fingerprint, fingerprint, mark_stage
+from tests.test_engine import FakeBot, FakeResponse
+
+
+def api_error(status_code, timestamp):
+    def http_get(url, headers, params, **kwargs):
+        return FakeResponse({'code': 'err'}, status_code)
+    try:
+        homework.fetch_homework_statuses(http_get, {}, timestamp)
+    except Exception as error:
+        return error
+
+
+def test_fingerprint_ignores_message_and_uses_stage_and_status():
+    first = api_error(HTTPStatus.INTERNAL_SERVER_ERROR, 1)
+    second = api_error(HTTPStatus.INTERNAL_SERVER_ERROR, 2)
+    assert str(first) != str(second)
+    assert fingerprint(first) == fingerprint(second) == Fingerprint(
+        'ApiStatusCodeError', 'get_api_answer', '500'
+    )
+    assert fingerprint(api_error(HTTPStatus.BAD_GATEWAY, 1)).status_code == (
+        '502'
+    )
+
+
+def test_inner_stage_is_kept():
+    error = mark_stage(mark_stage(KeyError('x'), 'parse_status'), 'outer')
+    assert fingerprint(error) == Fingerprint('KeyError', 'parse_status', '')
+
+
+def test_one_alert_per_fingerprint_per_window():
+    clock = SimulatedClock()
+    tracker = ErrorTracker(window=3600, clock=clock.monotonic)
+    alerts = []
+    for second in range(0, 2 * 3600, 60):
+        clock.advance_to(second)
+        for error in (ConnectionError(f'at {second}'), KeyError('homeworks')):
+            message = tracker.record(error)
+            if message is not None:
+                alerts.append(message)
+                tracker.reported(error)
+    assert len(alerts) == 4
+    assert alerts[2].startswith(
+        'Application Error: ConnectionError ×60 за 60 мин.'
+    )
+    assert alerts[2].endswith('at 3600')
+
+
+def test_failed_delivery_is_retried():
+    tracker = ErrorTracker(window=3600, clock=lambda: 0)
+    error = ConnectionError('down')
+    assert tracker.record(error) is not None
+    assert tracker.record(error) is not None
+    tracker.reported(error)
+    assert tracker.record(error) is None
+    assert tracker.summary()[0].total == 3
+
+
+def test_fingerprints_are_bounded():
+    tracker = ErrorTracker(max_fingerprints=2, clock=lambda: 0)
+    for error in (KeyError(), ValueError(), TypeError(), KeyError()):
+        assert tracker.record(error) is not None
+    assert len(tracker) == 2
+    assert [item.fingerprint.type for item in tracker.summary()] == [
+        'KeyError', 'TypeError'
+    ]
+
+
+def test_engine_alternating_errors_do_not_spam_chat():
+    statuses = [HTTPStatus.BAD_REQUEST, HTTPStatus.NOT_FOUND] * 5
+    responses = iter(statuses)
+
+    def http_get(url, headers, params, **kwargs):
+        return FakeResponse({'code': 'err'}, next(responses))
+
+    bot = FakeBot()
+    engine = PollingEngine(
+        [Account('1', 't', '100')], bot, http_get=http_get,
+        clock=SimulatedClock()
+    )
+    try:
+        for _ in statuses:
+            engine.poll_account(engine.states[0])
+    finally:
+        engine.close()
+    assert len(bot.sent) == 2
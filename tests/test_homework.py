@@ -0,0 +1,97 @@
+import pytest
+
+import homework
+from bot.outbox_queue import SqliteOutboxQueue
+
+
+@pytest.mark.parametrize('messages, expected', [
+    ([], []),
+    (['short'], ['short']),
+    (['a' * 100] * 3, ['\n\n'.join(['a' * 100] * 3)]),
+    (['b' * 4000] * 3, ['b' * 4000] * 3),
+    (['d' * 4094, 'e'], ['d' * 4094, 'e']),
+    (['f' * 2047, 'g' * 2047, 'h'], ['f' * 2047 + '\n\n' + 'g' * 2047, 'h']),
+])
+def test_coalesce_messages_splits_on_message_boundaries(messages, expected):
+    assert homework.coalesce_messages(messages) == expected
+
+
+def test_coalesce_messages_truncates_oversized_message():
+    chunks = homework.coalesce_messages(['short', 'c' * 10000, 'tail'])
+    assert chunks == [
+        'short', 'c' * 4095 + homework.TRUNCATION_MARK, 'tail'
+    ]
+    assert all(len(chunk) <= homework.TELEGRAM_MESSAGE_LIMIT
+               for chunk in chunks)
+
+
+class StopLoop(Exception):
+    pass
+
+
+def test_main_skips_sending_after_budget(
+    monkeypatch, caplog, data_with_new_hw_status
+):
+    sent = []
+
+    def stop(seconds):
+        raise StopLoop
+
+    monkeypatch.setattr(homework, 'check_tokens', lambda: None)
+    monkeypatch.setattr(homework.telebot, 'TeleBot', lambda token: None)
+    monkeypatch.setattr(
+        homework, 'get_api_answer', lambda timestamp: data_with_new_hw_status
+    )
+    monkeypatch.setattr(
+        homework, 'send_message', lambda bot, message: sent.append(message)
+    )
+    monkeypatch.setattr(homework, 'POLL_BUDGET', 0)
+    monkeypatch.setattr(homework.time, 'sleep', stop)
+    overruns = homework.LOOP_OVERRUNS.labels()
+    before = overruns.value
+    with pytest.raises(StopLoop):
+        homework.main()
+    assert sent == []
+    assert overruns.value == before + 1
+    assert 'дедлайну' in caplog.text
+
+
+class StopPolling(BaseException):
+    pass
+
+
+def test_main_advances_timestamp_once_outbox_accepts(
+    monkeypatch, tmp_path, data_with_new_hw_status
+):
+    path = str(tmp_path / 'outbox.db')
+    timestamps = []
+    outboxes = []
+
+    class DownBot:
+        def send_message(self, **kwargs):
+            raise ConnectionError('Telegram недоступен')
+
+    def get_api_answer(timestamp):
+        timestamps.append(timestamp)
+        if len(timestamps) > 1:
+            raise StopPolling
+        return data_with_new_hw_status
+
+    def create_outbox(bot):
+        outboxes.append(homework_create_outbox(bot))
+        return outboxes[-1]
+
+    homework_create_outbox = homework.create_outbox
+    monkeypatch.setattr(homework, 'OUTBOX_DB', path)
+    monkeypatch.setattr(homework, 'create_outbox', create_outbox)
+    monkeypatch.setattr(homework, 'check_tokens', lambda: None)
+    monkeypatch.setattr(homework.telebot, 'TeleBot', lambda token: DownBot())
+    monkeypatch.setattr(homework, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(homework.time, 'sleep', lambda seconds: None)
+    with pytest.raises(StopPolling):
+        homework.main()
+    outboxes[0].stop()
+    assert timestamps == [0, data_with_new_hw_status['current_date']]
+    queue = SqliteOutboxQueue(path, 10)
+    assert len(queue) == 1
+    queue.disconnect()
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import measure, parse_importtime, run
+
+# Без отложенных импортов homework грузился 120-160 мс, сейчас около
+# 45 мс. Бюджет по умолчанию — с большим запасом на медленные машины CI;
+# IMPORT_TIME_BUDGET=0.1 pytest проверяет его строже.
+IMPORT_TIME_BUDGET = float(os.getenv('IMPORT_TIME_BUDGET') or 0.5)
+LAZY_MODULES = ('requests', 'telebot', 'dotenv', 'sqlite3', 'http.server')
+
+
+def test_parse_importtime():
+    output = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       100 |        100 |   json',
+        'import time:       500 |        600 | homework',
+    ])
+    profile = parse_importtime(output, 'homework')
+    assert profile.total == pytest.approx(0.0006)
+    assert profile.modules['json'] == (0.0001, 0.0001)
+
+
+def test_heavy_dependencies_are_not_imported():
+    modules = measure().modules
+    assert not [name for name in LAZY_MODULES if name in modules]
+
+
+@pytest.mark.timeout(10)
+def test_import_time_budget():
+    total, _ = run(runs=3)
+    assert total < IMPORT_TIME_BUDGET
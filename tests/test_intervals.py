@@ -0,0 +1,46 @@
+from bot.accounts import Account
+from bot.engine import AccountState
+from bot.intervals import (DEFAULT_INTERVAL, RECENT_CHANGE_INTERVAL,
+                           RECENT_CHANGE_WINDOW, STATUS_INTERVALS,
+                           AdaptiveIntervalPolicy, FixedIntervalPolicy)
+
+NOW = 100000.0
+
+
+def make_state(status=None, changed_ago=None, idle_polls=0):
+    state = AccountState(Account('1', 't', '1'))
+    if status is not None:
+        state.record_status(status, NOW - changed_ago)
+    state.idle_polls = idle_polls
+    return state
+
+
+def test_fixed_policy():
+    assert FixedIntervalPolicy(600).next_interval(make_state()) == 600
+
+
+def test_recent_change_is_polled_fast():
+    policy = AdaptiveIntervalPolicy()
+    state = make_state('approved', changed_ago=60)
+    assert policy.next_interval(state, NOW) == RECENT_CHANGE_INTERVAL
+
+
+def test_reviewing_is_polled_faster_than_approved():
+    policy = AdaptiveIntervalPolicy()
+    old = RECENT_CHANGE_WINDOW + 1
+    reviewing = policy.next_interval(make_state('reviewing', old), NOW)
+    approved = policy.next_interval(make_state('approved', old), NOW)
+    assert reviewing == STATUS_INTERVALS['reviewing'][0]
+    assert approved == STATUS_INTERVALS['approved'][0]
+    assert reviewing < approved
+
+
+def test_idle_accounts_back_off_up_to_cap():
+    policy = AdaptiveIntervalPolicy()
+    intervals = [
+        policy.next_interval(make_state(idle_polls=idle), NOW)
+        for idle in range(10)
+    ]
+    assert intervals == sorted(intervals)
+    assert intervals[0] == DEFAULT_INTERVAL[0]
+    assert intervals[-1] == DEFAULT_INTERVAL[1]
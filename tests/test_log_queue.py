@@ -0,0 +1,82 @@
+import logging
+import queue
+import threading
+import time
+
+from bot.log_queue import (DroppingQueueHandler, create_file_handler,
+                           create_queue_logging)
+
+
+def make_record(level, message, *args, exc_info=None):
+    return logging.LogRecord(
+        'test', level, __file__, 1, message, args, exc_info
+    )
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.gate = threading.Event()
+
+    def emit(self, record):
+        self.gate.wait(1)
+        self.lines.append(self.format(record))
+
+
+def test_overflow_drops_debug_and_evicts_for_warnings():
+    log_queue = queue.Queue(2)
+    handler = DroppingQueueHandler(log_queue)
+    for index in range(3):
+        handler.handle(make_record(logging.DEBUG, 'debug %s', index))
+    handler.handle(make_record(logging.ERROR, 'error'))
+    messages = [log_queue.get_nowait().msg for _ in range(2)]
+    assert messages == ['debug 1', 'error']
+    assert handler.dropped == 2
+
+
+def test_logging_does_not_wait_for_slow_handler():
+    slow = SlowHandler()
+    handler, listener = create_queue_logging([slow], max_size=100)
+    listener.start()
+    try:
+        started = time.monotonic()
+        for index in range(50):
+            handler.handle(make_record(logging.INFO, 'poll %s', index))
+        elapsed = time.monotonic() - started
+    finally:
+        slow.gate.set()
+        listener.stop()
+    assert elapsed < 0.1
+    assert slow.lines[-1] == 'poll 49'
+    assert len(slow.lines) == 50
+
+
+def test_traceback_is_formatted_by_listener():
+    target = SlowHandler()
+    target.gate.set()
+    handler, listener = create_queue_logging([target])
+    try:
+        raise ValueError('boom')
+    except ValueError as error:
+        record = make_record(
+            logging.ERROR, 'failed', exc_info=(
+                type(error), error, error.__traceback__
+            )
+        )
+    listener.start()
+    handler.handle(record)
+    listener.stop()
+    assert record.exc_text is not None
+    assert 'ValueError: boom' in target.lines[0]
+
+
+def test_file_handler_rotates_by_size(tmp_path):
+    path = tmp_path / 'bot.log'
+    handler = create_file_handler(str(path), max_bytes=100, backup_count=2)
+    for index in range(20):
+        handler.handle(make_record(logging.INFO, 'line %s' + 'x' * 20, index))
+    handler.close()
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        'bot.log', 'bot.log.1', 'bot.log.2'
+    ]
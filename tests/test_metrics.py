@@ -0,0 +1,119 @@
+import timeit
+
+import pytest
+import requests
+
+import homework
+from bot.metrics import MetricsRegistry, MetricsServer, timed
+
+# Наблюдение не дороже нескольких пустых вызовов функции: граница
+# относительная, чтобы не зависеть от скорости машины.
+OVERHEAD_RATIO = 8
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter('calls_total', 'Calls.', ('stage',))
+    counter.labels('fetch').inc()
+    counter.labels(stage='fetch').inc(2)
+    gauge = registry.gauge('queue_size', 'Queue "size".')
+    gauge.set_function(lambda: 7)
+    histogram = registry.histogram('seconds', 'Time.', buckets=(0.1, 1))
+    histogram.observe(0.25)
+    histogram.observe(0.5)
+    histogram.observe(5)
+    assert registry.render() == (
+        '# HELP calls_total Calls.\n'
+        '# TYPE calls_total counter\n'
+        'calls_total{stage="fetch"} 3\n'
+        '# HELP queue_size Queue "size".\n'
+        '# TYPE queue_size gauge\n'
+        'queue_size 7\n'
+        '# HELP seconds Time.\n'
+        '# TYPE seconds histogram\n'
+        'seconds_bucket{le="0.1"} 0\n'
+        'seconds_bucket{le="1"} 2\n'
+        'seconds_bucket{le="+Inf"} 3\n'
+        'seconds_sum 5.75\n'
+        'seconds_count 3\n'
+    )
+
+
+def test_registry_rejects_duplicates_and_bad_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter('calls_total', 'Calls.', ('stage',))
+    with pytest.raises(ValueError):
+        registry.counter('calls_total', 'Calls.')
+    with pytest.raises(ValueError):
+        counter.labels('a', 'b')
+
+
+def test_timed_counts_errors():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('seconds', 'Time.')
+    errors = registry.counter('errors_total', 'Errors.')
+
+    @timed(histogram, errors)
+    def flaky(fail):
+        if fail:
+            raise ValueError(fail)
+        return 'ok'
+
+    assert flaky(False) == 'ok'
+    with pytest.raises(ValueError):
+        flaky(True)
+    assert sum(histogram.labels().counts) == 2
+    assert errors.labels().value == 1
+
+
+def test_pipeline_stages_are_instrumented(data_with_new_hw_status):
+    stage_errors = homework.STAGE_ERRORS.labels('check_response')
+    stage_seconds = homework.STAGE_SECONDS.labels('check_response')
+    errors, observations = stage_errors.value, sum(stage_seconds.counts)
+    homework.check_response(data_with_new_hw_status)
+    with pytest.raises(TypeError):
+        homework.check_response([])
+    assert stage_errors.value == errors + 1
+    assert sum(stage_seconds.counts) == observations + 2
+
+
+def test_metrics_endpoint():
+    registry = MetricsRegistry()
+    registry.counter('calls_total', 'Calls.').inc()
+    server = MetricsServer(registry, 0).start()
+    try:
+        response = requests.get(server.url)
+        missing = requests.get(server.url.replace('/metrics', '/'))
+    finally:
+        server.stop()
+    assert response.headers['Content-Type'].startswith('text/plain')
+    assert 'calls_total 1' in response.text
+    assert missing.status_code == 404
+
+
+def noop(*args):
+    pass
+
+
+def best_call_seconds(statement, namespace, number=20000):
+    return min(timeit.repeat(
+        statement, globals=namespace, number=number, repeat=5
+    )) / number
+
+
+@pytest.mark.parametrize('statement, baseline', [
+    ('observe(0.003)', 'noop(0.003)'),
+    ('inc()', 'noop()'),
+])
+def test_observation_overhead(statement, baseline):
+    registry = MetricsRegistry()
+    namespace = {
+        'observe': registry.histogram('h', 'H.', ('stage',)).labels(
+            'a'
+        ).observe,
+        'inc': registry.counter('c', 'C.').inc,
+        'noop': noop,
+    }
+    assert best_call_seconds(statement, namespace) < (
+        best_call_seconds(baseline, namespace) * OVERHEAD_RATIO
+    )
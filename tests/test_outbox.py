@@ -0,0 +1,242 @@
+import pytest
+
+from bot.clock import SimulatedClock
+from bot.outbox import Outbox, TokenBucket, retry_after
+from bot.outbox_queue import MemoryOutboxQueue, SqliteOutboxQueue
+from tests.test_engine import FakeBot
+
+
+class TooManyRequests(Exception):
+    error_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__('Too Many Requests')
+        self.result_json = {'parameters': {'retry_after': retry_after}}
+
+
+class FlakyBot(FakeBot):
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        super().send_message(chat_id=chat_id, text=text)
+
+
+class TimedBot(FlakyBot):
+    def __init__(self, clock, errors=()):
+        super().__init__(errors)
+        self.clock = clock
+        self.sent_at = {}
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        super().send_message(chat_id=chat_id, text=text)
+        self.sent_at.setdefault(chat_id, self.clock.monotonic())
+
+
+def simulated_outbox(bot, clock, **options):
+    return Outbox(
+        bot, clock=clock.monotonic, wall_clock=clock.monotonic,
+        sleep=clock.sleep, **options
+    )
+
+
+def drain(outbox, clock):
+    while len(outbox):
+        message, wake_at = outbox.queue.claim()
+        if message is None:
+            clock.advance_to(wake_at)
+            continue
+        outbox.send(message)
+
+
+def test_token_bucket_spaces_out_requests():
+    clock = SimulatedClock()
+    bucket = TokenBucket(1, clock=clock.monotonic)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1)
+    assert bucket.reserve() == pytest.approx(2)
+    clock.advance(10)
+    assert bucket.reserve() == 0
+    bucket.penalize(30)
+    assert bucket.reserve() == pytest.approx(31)
+
+
+def test_retry_after():
+    assert retry_after(TooManyRequests(7)) == 7
+    assert retry_after(ValueError()) is None
+
+
+def test_per_chat_limit_and_global_limit():
+    clock = SimulatedClock()
+    bot = FakeBot()
+    outbox = simulated_outbox(bot, clock, global_rate=2, per_chat_rate=1)
+    for chat_id in ('a', 'a', 'a', 'b', 'c'):
+        outbox.put(chat_id, 'text')
+    drain(outbox, clock)
+    assert len(bot.sent) == 5
+    assert clock.monotonic() >= 2
+
+
+@pytest.mark.parametrize('make_queue', [
+    lambda path, clock: MemoryOutboxQueue(100, clock=clock),
+    lambda path, clock: SqliteOutboxQueue(path, 100, clock=clock),
+])
+def test_busy_chat_does_not_delay_other_chats(tmp_path, make_queue):
+    clock = SimulatedClock()
+    bot = TimedBot(clock)
+    outbox = simulated_outbox(
+        bot, clock, per_chat_rate=2,
+        queue=make_queue(str(tmp_path / 'outbox.db'), clock.monotonic)
+    )
+    for _ in range(8):
+        outbox.put('a', 'text')
+    outbox.put('b', 'text')
+    drain(outbox, clock)
+    assert bot.sent_at['b'] == 0
+    assert clock.monotonic() == pytest.approx(3.5)
+    assert bot.sent == [('a', 'text'), ('b', 'text')] + [('a', 'text')] * 7
+    outbox.queue.disconnect()
+
+
+def test_workers_do_not_hold_messages_of_paused_chats():
+    bot = FakeBot()
+    outbox = Outbox(bot, workers=4, per_chat_rate=20)
+    for _ in range(8):
+        outbox.put('a', 'text')
+    outbox.put('b', 'text')
+    outbox.start()
+    outbox.join()
+    outbox.stop()
+    assert len(bot.sent) == 9
+    assert bot.sent.index(('b', 'text')) <= 1
+
+
+def test_retry_after_pauses_only_its_chat():
+    clock = SimulatedClock()
+    bot = TimedBot(clock, [TooManyRequests(30)])
+    outbox = simulated_outbox(bot, clock)
+    outbox.put('a', 'first')
+    outbox.put('a', 'second')
+    outbox.put('b', 'text')
+    drain(outbox, clock)
+    assert bot.sent_at['b'] == 0
+    assert bot.sent_at['a'] == 30
+    assert bot.sent == [('b', 'text'), ('a', 'first'), ('a', 'second')]
+
+
+def test_global_token_is_spent_only_on_send():
+    clock = SimulatedClock()
+    bot = TimedBot(clock)
+    outbox = simulated_outbox(bot, clock, global_rate=1, per_chat_rate=0.1)
+    outbox.put('a', 'one')
+    outbox.put('a', 'two')
+    drain(outbox, clock)
+    assert clock.monotonic() == pytest.approx(10)
+
+
+def test_retry_after_is_honoured():
+    clock = SimulatedClock()
+    bot = FlakyBot([TooManyRequests(30)])
+    outbox = simulated_outbox(bot, clock)
+    outbox.put('a', 'text')
+    drain(outbox, clock)
+    assert bot.sent == [('a', 'text')]
+    assert clock.monotonic() >= 30
+
+
+def test_message_dropped_after_max_attempts():
+    clock = SimulatedClock()
+    bot = FlakyBot([ValueError('boom')] * 3)
+    outbox = simulated_outbox(bot, clock, max_attempts=3)
+    outbox.put('a', 'text')
+    drain(outbox, clock)
+    assert outbox.dropped == 1
+    assert bot.sent == []
+    assert len(outbox) == 0
+
+
+def test_full_outbox_rejects_messages():
+    outbox = Outbox(FakeBot(), max_size=1)
+    assert outbox.put('a', 'one')
+    assert not outbox.put('a', 'two')
+
+
+def test_workers_deliver_messages():
+    bot = FakeBot()
+    outbox = Outbox(bot, workers=2, global_rate=1000, per_chat_rate=1000)
+    outbox.start()
+    for index in range(20):
+        outbox.put(str(index), 'text')
+    outbox.join()
+    outbox.stop()
+    assert len(bot.sent) == 20
+    assert outbox.sent == 20
+
+
+@pytest.mark.parametrize('make_queue', [
+    lambda path, clock: MemoryOutboxQueue(10, clock=clock),
+    lambda path, clock: SqliteOutboxQueue(path, 10, clock=clock),
+])
+def test_queue_size_age_and_backpressure(tmp_path, make_queue):
+    clock = SimulatedClock(1000.0)
+    queue = make_queue(str(tmp_path / 'outbox.db'), clock.monotonic)
+    assert queue.oldest_age() == 0.0
+    for index in range(10):
+        assert queue.put('a', str(index))
+        clock.advance(1)
+    assert not queue.put('a', 'overflow')
+    assert len(queue) == 10
+    assert queue.oldest_age() == 10
+    message = queue.get()
+    assert queue.claim() == (None, None)
+    queue.retry(message._replace(attempt=2, not_before=clock.monotonic() + 5))
+    assert queue.claim() == (None, clock.monotonic() + 5)
+    clock.advance(5)
+    retried = queue.get()
+    assert (retried.text, retried.attempt) == ('0', 2)
+    queue.ack(retried, clock.monotonic() + 1)
+    assert len(queue) == 9
+    assert queue.claim() == (None, clock.monotonic() + 1)
+    clock.advance(1)
+    assert queue.get().text == '1'
+    queue.close()
+    assert queue.get() is None
+    queue.disconnect()
+
+
+def test_sqlite_queue_survives_restart(tmp_path):
+    path = str(tmp_path / 'outbox.db')
+    queue = SqliteOutboxQueue(path, 10)
+    queue.put('a', 'delivered')
+    queue.put('a', 'in flight')
+    queue.ack(queue.get())
+    queue.get()
+    queue.disconnect()
+
+    queue = SqliteOutboxQueue(path, 10)
+    assert len(queue) == 1
+    assert queue.get().text == 'in flight'
+    queue.disconnect()
+
+
+def test_outbox_replays_durable_queue(tmp_path):
+    path = str(tmp_path / 'outbox.db')
+    queue = SqliteOutboxQueue(path, 10)
+    queue.put('a', 'text')
+    queue.disconnect()
+
+    bot = FakeBot()
+    outbox = Outbox(bot, workers=1, queue=SqliteOutboxQueue(path, 10))
+    outbox.start()
+    outbox.join()
+    outbox.stop()
+    assert bot.sent == [('a', 'text')]
+
+
+def test_empty_persistent_queue_is_kept(tmp_path):
+    queue = SqliteOutboxQueue(str(tmp_path / 'outbox.db'), 10)
+    assert Outbox(FakeBot(), queue=queue).queue is queue
+    queue.disconnect()
@@ -0,0 +1,57 @@
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from bot.profiling import NullProfiler, Profiler, create_profiler, parse_modes
+
+
+def busy_iteration(garbage):
+    garbage.append([str(number) for number in range(2000)])
+    return sum(range(10000))
+
+
+@pytest.mark.parametrize('spec, modes', [
+    (None, set()),
+    ('', set()),
+    ('cpu', {'cpu'}),
+    (' Memory , cpu', {'cpu', 'memory'}),
+    ('1', {'cpu', 'memory'}),
+])
+def test_parse_modes(spec, modes):
+    assert parse_modes(spec) == modes
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        parse_modes('cpu,gpu')
+
+
+def test_empty_spec_gives_null_profiler():
+    assert isinstance(create_profiler(None), NullProfiler)
+
+
+def test_profiler_dumps_and_rotates_reports(tmp_path):
+    profiler = Profiler(directory=str(tmp_path), every=2, keep=2, top=5)
+    garbage = []
+    try:
+        for _ in range(6):
+            profiler.start_iteration()
+            busy_iteration(garbage)
+            profiler.end_iteration()
+    finally:
+        profiler.close()
+    assert not tracemalloc.is_tracing()
+    files = sorted(os.listdir(tmp_path))
+    cpu = [name for name in files if name.startswith('cpu-')]
+    memory = [name for name in files if name.startswith('memory-')]
+    assert len(cpu) == len(memory) == 2
+    assert cpu[-1].endswith('-000006.pstats')
+    stats = pstats.Stats(str(tmp_path / cpu[-1]))
+    assert any(
+        function == 'busy_iteration' for _, _, function in stats.stats
+    )
+    report = (tmp_path / memory[-1]).read_text(encoding='utf-8')
+    assert report.startswith('Итерации 5-6:')
+    assert 'test_profiling.py' in report
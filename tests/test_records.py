@@ -0,0 +1,71 @@
+import json
+
+import homework
+from benchmarks.records import run
+from bot.dedup import homework_key
+from bot.records import HomeworkRecord
+from bot.storage import CheckpointStore
+
+ITEM = {
+    'id': 123,
+    'status': 'approved',
+    'homework_name': 'student__hw05.zip',
+    'reviewer_comment': 'Всё нравится',
+    'date_updated': '2024-01-01T00:00:00Z',
+    'lesson_name': 'Итоговый проект',
+}
+
+
+def parsed_homeworks():
+    return json.loads(json.dumps({'homeworks': [ITEM]}))['homeworks']
+
+
+def test_record_keeps_only_needed_fields():
+    record = HomeworkRecord.from_item(ITEM)
+    assert record == (123, 'student__hw05.zip', 'approved', ITEM['date_updated'])
+    assert not hasattr(record, '__dict__')
+
+
+def test_record_key_matches_dict_key():
+    assert HomeworkRecord.from_item(ITEM).key == homework_key(ITEM)
+
+
+def test_records_share_interned_strings():
+    first, = homework.extract_updates(parsed_homeworks()).homeworks
+    second, = homework.extract_updates(parsed_homeworks()).homeworks
+    assert first.name is second.name
+    assert first.status is second.status
+
+
+def test_extract_builds_records_like_from_item():
+    record, = homework.extract_updates(parsed_homeworks()).homeworks
+    assert record == HomeworkRecord.from_item(ITEM)
+    assert type(record) is HomeworkRecord
+
+
+def test_save_checkpoint_takes_records(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'state.db'))
+    records = homework.extract_updates(parsed_homeworks()).homeworks
+    homework.save_checkpoint(store, 5, records)
+    statuses = store.load_all_statuses()
+    store.close()
+    assert statuses[homework.TELEGRAM_CHAT_ID] == {'123': 'approved'}
+
+
+def test_non_string_name_is_kept():
+    item = dict(ITEM, homework_name=5)
+    assert homework.extract_updates([item]).homeworks[0].name == 5
+
+
+def test_loaded_statuses_are_interned(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'state.db'))
+    store.save('a', 1, [('1', 'approved')])
+    store.save('b', 1, [('2', 'approved')])
+    statuses = store.load_all_statuses()
+    store.close()
+    assert statuses['a']['1'] is statuses['b']['2']
+
+
+def test_records_take_less_memory():
+    result = run(500, repeat=1)
+    assert result.after < result.before / 2
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import requests
+
+import homework
+from bot.accounts import Account
+from bot.clock import SimulatedClock
+from bot.engine import PollingEngine
+from bot.retry import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RetryPolicy,
+                       is_api_failure)
+from tests.test_engine import FakeBot, FakeResponse, make_http_get
+
+
+def test_full_jitter_bounds():
+    assert RetryPolicy(base=10, cap=100, rng=lambda: 0.0).delay(3) == 0
+    upper = RetryPolicy(base=10, cap=100, rng=lambda: 1.0)
+    assert [upper.delay(attempt) for attempt in range(5)] == [
+        10, 20, 40, 80, 100
+    ]
+
+
+def raise_from(cause):
+    try:
+        raise cause
+    except Exception as error:
+        try:
+            raise ConnectionError('wrapped') from error
+        except ConnectionError as wrapped:
+            return wrapped
+
+
+def test_is_api_failure():
+    assert is_api_failure(homework.ApiStatusCodeError('', 502))
+    assert not is_api_failure(homework.ApiStatusCodeError('', 401))
+    assert is_api_failure(raise_from(requests.ReadTimeout()))
+    assert not is_api_failure(raise_from(requests.TooManyRedirects()))
+    assert not is_api_failure(KeyError('homeworks'))
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = SimulatedClock()
+    breaker = CircuitBreaker(
+        failure_threshold=3, recovery_timeout=60, clock=clock.monotonic
+    )
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 60
+
+    clock.advance_to(60)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.advance_to(120)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_engine_pauses_all_accounts_while_open():
+    accounts = [Account(str(i), f't{i}', str(i)) for i in range(4)]
+    http_get = make_http_get({
+        account.token: FakeResponse({}, HTTPStatus.BAD_GATEWAY)
+        for account in accounts
+    })
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=600)
+    engine = PollingEngine(
+        accounts, FakeBot(), max_workers=1, http_get=http_get,
+        breaker=breaker, retry_policy=RetryPolicy(rng=lambda: 0.5)
+    )
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert len(http_get.calls) == 2
+    assert breaker.state == OPEN
+    paused = [state for state in engine.states if state.paused]
+    assert len(paused) == 2
+    assert engine.next_interval(paused[0]) > 590
+    assert engine.next_interval(engine.states[0]) == 30
@@ -0,0 +1,46 @@
+import pytest
+
+from bot.clock import SimulatedClock
+from bot.scheduler import PollScheduler
+
+
+@pytest.fixture
+def clock():
+    return SimulatedClock(1000.0)
+
+
+def test_spread_distributes_items_over_period(clock):
+    scheduler = PollScheduler(600, clock=clock.monotonic, sleep=clock.sleep)
+    scheduler.spread(['a', 'b', 'c', 'd'])
+    fired = [scheduler.wait_next() for _ in range(4)]
+    assert [item for item, _ in fired] == ['a', 'b', 'c', 'd']
+    assert [due - 1000.0 for _, due in fired] == [0, 150, 300, 450]
+    assert clock.monotonic() == 1450.0
+
+
+def test_next_due_does_not_drift(clock):
+    scheduler = PollScheduler(600, clock=clock.monotonic, sleep=clock.sleep)
+    scheduler.add('a')
+    due = None
+    for _ in range(5):
+        item, due = scheduler.wait_next()
+        clock.advance(42)
+        scheduler.add_at(item, scheduler.next_due(due))
+    assert due == 1000.0 + 4 * 600
+
+
+def test_missed_periods_are_skipped_keeping_phase(clock):
+    scheduler = PollScheduler(600, clock=clock.monotonic, sleep=clock.sleep)
+    clock.advance_to(1000.0 + 1300)
+    assert scheduler.next_due(1000.0) == 1000.0 + 3 * 600
+
+
+def test_lag_is_recorded(clock):
+    scheduler = PollScheduler(10, clock=clock.monotonic, sleep=clock.sleep)
+    scheduler.add_at('late', clock.monotonic() - 2.5)
+    scheduler.add_at('very late', clock.monotonic() - 25)
+    scheduler.wait_next()
+    scheduler.wait_next()
+    summary = scheduler.lag.summary()
+    assert summary.max == 25
+    assert summary.overruns == 1
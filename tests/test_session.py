@@ -0,0 +1,52 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bot.session import connection_stats, create_session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"homeworks": [], "current_date": 0}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connections(local_url):
+    session = create_session(pool_maxsize=2)
+    for _ in range(5):
+        assert session.get(local_url).status_code == 200
+    stats = connection_stats(session)
+    session.close()
+    assert stats.requests == 5
+    assert stats.new_connections == 1
+    assert stats.reused == 4
+
+
+def test_session_without_keep_alive(local_url):
+    session = create_session(keep_alive=False)
+    for _ in range(3):
+        session.get(local_url)
+    stats = connection_stats(session)
+    session.close()
+    assert stats.new_connections == 3
+    assert stats.reused == 0
@@ -0,0 +1,68 @@
+import pytest
+
+from bot.accounts import Account
+from bot.clock import SimulatedClock
+from bot.engine import PollingEngine
+from bot.intervals import FixedIntervalPolicy
+from bot.retry import OPEN
+from bot.simulation import HOUR, Simulation
+from bot.transport import FakePracticumTransport, FakeTelegramTransport
+
+DAY = 24 * HOUR
+
+
+def make_engine(clock, accounts=10, **transport_options):
+    transport = FakePracticumTransport(
+        clock=clock.time, sleep=clock.sleep, **transport_options
+    )
+    engine = PollingEngine(
+        [Account(str(i), f't{i}', str(i)) for i in range(accounts)],
+        FakeTelegramTransport(sleep=clock.sleep), transport=transport,
+        clock=clock, interval_policy=FixedIntervalPolicy()
+    )
+    return engine, transport
+
+
+def test_simulated_clock():
+    clock = SimulatedClock(epoch=1000)
+    clock.sleep(5)
+    clock.advance(-3)
+    clock.advance_to(4)
+    assert clock.monotonic() == 5
+    assert clock.time() == 1005
+    clock.advance_to(7.5)
+    assert clock.monotonic() == 7.5
+
+
+def test_simulation_requires_simulated_clock():
+    engine = PollingEngine([], FakeTelegramTransport(), http_get=print)
+    with pytest.raises(TypeError):
+        Simulation(engine)
+
+
+def test_day_of_fixed_polling_in_virtual_time():
+    clock = SimulatedClock()
+    engine, transport = make_engine(clock, change_rate=1.0)
+    try:
+        result = Simulation(engine).run(DAY)
+    finally:
+        engine.close()
+    assert result.polls == transport.requests == 10 * DAY // 600
+    assert result.peak_polls_per_hour == 10 * 6
+    assert clock.monotonic() == DAY
+    assert all(
+        clock.time() - 600 <= state.timestamp <= clock.time()
+        for state in engine.states
+    )
+
+
+def test_breaker_and_backoff_follow_virtual_time():
+    clock = SimulatedClock()
+    engine, transport = make_engine(clock, error_rate=1.0)
+    try:
+        result = Simulation(engine).run(HOUR)
+    finally:
+        engine.close()
+    assert engine.breaker.state == OPEN
+    assert engine.breaker.failures == transport.requests
+    assert transport.requests < result.polls
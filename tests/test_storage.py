@@ -0,0 +1,55 @@
+import sqlite3
+
+from bot.accounts import Account
+from bot.engine import PollingEngine
+from bot.storage import CheckpointStore
+from tests.test_engine import FakeBot, FakeResponse, make_http_get
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    path = tmp_path / 'state.db'
+    store = CheckpointStore(str(path))
+    store.save('a', 100, [(1, 'reviewing')])
+    store.save('a', 200, [(1, 'approved'), (2, 'reviewing')])
+    store.save('b', 50)
+    store.close()
+
+    store = CheckpointStore(str(path))
+    assert store.load_timestamp('a') == 200
+    assert store.load_timestamp('missing') == 0
+    assert store.load_timestamps() == {'a': 200, 'b': 50}
+    assert store.load_statuses('a') == {'1': 'approved', '2': 'reviewing'}
+    assert store.load_all_statuses() == {
+        'a': {'1': 'approved', '2': 'reviewing'}
+    }
+    store.close()
+    mode = sqlite3.connect(path).execute('PRAGMA journal_mode').fetchone()
+    assert mode == ('wal',)
+
+
+def test_engine_resumes_from_checkpoint(tmp_path, data_with_new_hw_status):
+    path = str(tmp_path / 'state.db')
+    account = Account('1', 't', '1')
+    current_date = data_with_new_hw_status['current_date']
+
+    def run_once():
+        http_get = make_http_get(
+            {'t': FakeResponse(data_with_new_hw_status)}
+        )
+        bot = FakeBot()
+        engine = PollingEngine(
+            [account], bot, http_get=http_get, store=CheckpointStore(path)
+        )
+        try:
+            engine.run_cycle()
+        finally:
+            engine.close()
+        return http_get.calls, bot.sent
+
+    calls, sent = run_once()
+    assert calls == [('t', 0)]
+    assert len(sent) == 1
+
+    calls, sent = run_once()
+    assert calls == [('t', current_date)]
+    assert sent == []
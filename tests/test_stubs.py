@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+import telebot.apihelper
+from telebot import TeleBot
+
+import homework
+from benchmarks.pipeline import notify_latencies, run
+from bot.stubs import PracticumStub, StubServer, TelegramStub
+
+
+@pytest.fixture
+def practicum():
+    with PracticumStub(clock=lambda: 100) as stub:
+        yield stub
+
+
+def test_practicum_stub_errors(practicum):
+    assert requests.get(practicum.endpoint).status_code == (
+        HTTPStatus.UNAUTHORIZED
+    )
+    response = requests.get(
+        practicum.endpoint, headers={'Authorization': 'OAuth t'},
+        params={'from_date': 'yesterday'}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['error'] == {'error': 'Wrong from_date format'}
+
+
+def test_practicum_stub_from_date_and_churn(practicum):
+    def fetch(timestamp):
+        return homework.fetch_homework_statuses(
+            requests.get, {'Authorization': 'OAuth t'}, timestamp,
+            endpoint=practicum.endpoint
+        )
+
+    first = fetch(0)
+    homework.check_response(first)
+    assert [item['status'] for item in first['homeworks']] == ['reviewing']
+    assert fetch(101) == {'homeworks': [], 'current_date': 100}
+    practicum.churn_rate = 1.0
+    changed = fetch(100)['homeworks']
+    assert [item['status'] for item in changed] != ['reviewing']
+    assert [token for token, _, _ in practicum.changes] == ['t', 't']
+
+
+def test_practicum_stub_injects_server_errors():
+    with PracticumStub(error_rate=1.0) as stub:
+        with pytest.raises(homework.ApiStatusCodeError) as error:
+            homework.fetch_homework_statuses(
+                requests.get, {'Authorization': 'OAuth t'}, 0,
+                endpoint=stub.endpoint
+            )
+    assert error.value.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def test_telegram_stub_accepts_telebot(monkeypatch):
+    with TelegramStub() as stub:
+        monkeypatch.setattr(telebot.apihelper, 'API_URL', stub.api_url)
+        message = TeleBot('0:stub').send_message(42, 'Привет')
+    assert message.text == 'Привет'
+    assert [(chat_id, text) for chat_id, text, _ in stub.messages] == [
+        ('42', 'Привет')
+    ]
+
+
+def test_stub_server_requires_handle():
+    with pytest.raises(TypeError):
+        StubServer()
+
+
+def test_notify_latencies():
+    changes = [('a', 'reviewing', 1.0), ('a', 'approved', 2.0),
+               ('b', 'reviewing', 1.5)]
+    messages = [('1', '', 2.5), ('2', '', 1.75), ('2', '', 3.0)]
+    assert notify_latencies(changes, messages, {'1': 'a', '2': 'b'}) == [
+        0.25, 1.5
+    ]
+
+
+def test_benchmark_smoke():
+    result = run(accounts=5, cycles=2, workers=2, churn_rate=1.0)
+    assert result.polls == 10
+    assert result.notifications == 10
+    assert result.p50 <= result.p99
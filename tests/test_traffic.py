@@ -0,0 +1,133 @@
+import json
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from bot.clock import SimulatedClock
+from bot.replay import Replay
+from bot.traffic import (PRACTICUM, TELEGRAM, TrafficLog, fingerprint,
+                         read_traffic)
+from tests.test_engine import FakeBot, FakeResponse
+
+
+def test_disabled_log_returns_originals():
+    log = TrafficLog()
+    bot = FakeBot()
+    assert log.http_get(requests.get) is requests.get
+    assert log.bot(bot) is bot
+
+
+def test_get_api_answer_and_send_message_are_recorded(
+    monkeypatch, tmp_path, data_with_new_hw_status
+):
+    path = tmp_path / 'traffic.jsonl'
+    log = TrafficLog(str(path), clock=lambda: 100.0)
+    monkeypatch.setattr(homework, 'TRAFFIC', log)
+    monkeypatch.setattr(
+        requests, 'get',
+        lambda url, **kwargs: FakeResponse(data_with_new_hw_status)
+    )
+    monkeypatch.setattr(homework, 'HEADERS', {'Authorization': 'OAuth s3'})
+    bot = FakeBot()
+    assert homework.get_api_answer(0) == data_with_new_hw_status
+    assert homework.send_message(bot, 'text')
+    log.close()
+    practicum, telegram = read_traffic(str(path))
+    assert practicum['kind'] == PRACTICUM
+    assert practicum['ts'] == 100.0
+    assert practicum['status_code'] == HTTPStatus.OK
+    assert practicum['response'] == data_with_new_hw_status
+    assert practicum['request']['params'] == {'from_date': 0}
+    authorization = practicum['request']['headers']['Authorization']
+    assert authorization.startswith('OAuth sha256:')
+    assert 's3' not in path.read_text()
+    assert telegram['kind'] == TELEGRAM
+    assert telegram['request']['text'] == 'text'
+    assert bot.sent == [(homework.TELEGRAM_CHAT_ID, 'text')]
+
+
+def test_failed_request_is_recorded(tmp_path):
+    path = tmp_path / 'traffic.jsonl'
+    log = TrafficLog(str(path))
+
+    def broken_get(url, **kwargs):
+        raise requests.ConnectionError('refused')
+
+    with pytest.raises(ConnectionError):
+        homework.fetch_homework_statuses(
+            log.http_get(broken_get), {'Authorization': 'OAuth t'}, 0
+        )
+    log.close()
+    record = json.loads(path.read_text())
+    assert 'refused' in record['error']
+
+
+class ContentResponse:
+    status_code = HTTPStatus.OK
+
+    def __init__(self, data):
+        self.content = json.dumps(data).encode()
+
+    def json(self):
+        raise AssertionError('тело не должно разбираться при записи')
+
+
+def test_raw_body_is_recorded_and_replayed(tmp_path, data_with_new_hw_status):
+    path = tmp_path / 'traffic.jsonl'
+    log = TrafficLog(str(path))
+    response = log.http_get(
+        lambda url, **kwargs: ContentResponse(data_with_new_hw_status)
+    )(homework.ENDPOINT, headers={}, params={'from_date': 0})
+    log.close()
+    record, = read_traffic(str(path))
+    assert record['response'] == response.content.decode()
+    result = Replay.from_file(str(path)).run()
+    assert (result.homeworks, result.errors) == (1, 0)
+
+
+def make_records(data):
+    return [
+        {'kind': PRACTICUM, 'ts': 10.0, 'error': None,
+         'status_code': HTTPStatus.OK, 'response': data},
+        {'kind': TELEGRAM, 'ts': 10.5, 'error': None,
+         'status_code': None, 'response': None},
+        {'kind': PRACTICUM, 'ts': 40.0, 'error': None,
+         'status_code': HTTPStatus.BAD_GATEWAY, 'response': None},
+        {'kind': PRACTICUM, 'ts': 70.0, 'error': None,
+         'status_code': HTTPStatus.OK, 'response': {'homeworks': 'broken'}},
+    ]
+
+
+def test_replay_at_full_speed(data_with_new_hw_status):
+    result = Replay(make_records(data_with_new_hw_status)).run()
+    assert result.responses == 3
+    assert result.homeworks == 1
+    assert result.messages == 1
+    assert result.errors == 2
+    assert result.p50 <= result.p99
+
+
+def test_replay_in_real_time_follows_recorded_gaps(data_with_new_hw_status):
+    clock = SimulatedClock()
+    result = Replay(
+        make_records(data_with_new_hw_status), speed=2.0, clock=clock
+    ).run()
+    assert result.elapsed == 30.0
+
+
+def test_bot_token_in_error_is_redacted(tmp_path):
+    path = tmp_path / 'traffic.jsonl'
+    log = TrafficLog(str(path))
+    token = '123456:AAE-secret_Token'
+    error = requests.ConnectionError(
+        f"HTTPSConnectionPool(host='api.telegram.org', port=443): "
+        f'Max retries exceeded with url: /bot{token}/sendMessage'
+    )
+    log.write(TELEGRAM, {'text': 'text'}, 0.0, 0.1, error=error)
+    log.close()
+    record = json.loads(path.read_text())
+    assert token not in path.read_text()
+    assert f'/bot{fingerprint(token)}/sendMessage' in record['error']
+    assert 'ConnectionError' in record['error']
@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import homework
+from bot.accounts import Account
+from bot.engine import PollingEngine
+from bot.outbox import retry_after
+from bot.transport import (FakePracticumTransport, FakeResponse,
+                           FakeTelegramTransport, PracticumTransport,
+                           RecordingPracticumTransport,
+                           RecordingTelegramTransport, TelegramTransport)
+
+HEADERS = {'Authorization': 'OAuth t'}
+
+
+def test_fake_practicum_follows_script_then_generates():
+    transport = FakePracticumTransport(
+        script={'t': [
+            {'homeworks': [], 'current_date': 1},
+            FakeResponse({'code': 'x'}, HTTPStatus.BAD_REQUEST),
+            requests.Timeout('slow'),
+        ]},
+        clock=lambda: 42
+    )
+    first = transport.get(homework.ENDPOINT, HEADERS, {'from_date': 0})
+    assert first.json() == {'homeworks': [], 'current_date': 1}
+    second = transport.get(homework.ENDPOINT, HEADERS, {'from_date': 0})
+    assert second.status_code == HTTPStatus.BAD_REQUEST
+    with pytest.raises(requests.Timeout):
+        transport.get(homework.ENDPOINT, HEADERS, {'from_date': 0})
+    generated = transport.get(homework.ENDPOINT, HEADERS, {'from_date': 0})
+    assert generated.json() == {'homeworks': [], 'current_date': 42}
+    assert transport.requests == 4
+
+
+def test_fake_practicum_injects_latency_errors_and_changes():
+    sleeps = []
+    transport = FakePracticumTransport(
+        latency=0.2, error_rate=0.5, change_rate=1.0,
+        rng=iter([0.1, 0.9, 0.4, 0.0]).__next__, sleep=sleeps.append
+    )
+    with pytest.raises(requests.ConnectionError):
+        transport.get(homework.ENDPOINT, HEADERS, {'from_date': 0})
+    response = transport.get(
+        homework.ENDPOINT, HEADERS, {'from_date': 0}
+    ).json()
+    homework.check_response(response)
+    assert sleeps == [0.2, 0.2]
+    assert [item['status'] for item in response['homeworks']] == [
+        'approved'
+    ]
+
+
+def test_recording_practicum_transport():
+    recording = RecordingPracticumTransport(FakePracticumTransport(script={
+        't': [{'homeworks': [], 'current_date': 1}, ValueError('boom')]
+    }))
+    recording.get(homework.ENDPOINT, HEADERS, {'from_date': 0}, timeout=5)
+    with pytest.raises(ValueError):
+        recording.get(homework.ENDPOINT, HEADERS, {'from_date': 1})
+    first, second = recording.exchanges
+    assert first.request['params'] == {'from_date': 0}
+    assert first.status_code == HTTPStatus.OK
+    assert first.response == {'homeworks': [], 'current_date': 1}
+    assert isinstance(second.error, ValueError)
+
+
+class ContentResponse:
+    status_code = HTTPStatus.OK
+    content = b'{"homeworks": [], "current_date": 1}'
+
+    def json(self):
+        raise AssertionError('тело не должно разбираться при записи')
+
+
+class ContentTransport(PracticumTransport):
+    def get(self, url, headers=None, params=None, timeout=None):
+        return ContentResponse()
+
+
+def test_recording_keeps_raw_body_and_feeds_sink():
+    sink = []
+    recording = RecordingPracticumTransport(
+        ContentTransport(), wall_clock=lambda: 100.0, on_exchange=sink.append
+    )
+    recording.get(homework.ENDPOINT, HEADERS, {'from_date': 0})
+    exchange, = sink
+    assert exchange.response == ContentResponse.content
+    assert exchange.started_at == 100.0
+    assert recording.exchanges == []
+
+
+def test_transports_are_abstract():
+    with pytest.raises(TypeError):
+        PracticumTransport()
+    with pytest.raises(TypeError):
+        TelegramTransport()
+
+
+def test_fake_telegram_injects_retry_after():
+    bot = FakeTelegramTransport(
+        error_rate=0.5, retry_after=3, rng=iter([0.1, 0.9]).__next__
+    )
+    recording = RecordingTelegramTransport(bot)
+    with pytest.raises(Exception) as error:
+        recording.send_message(chat_id=1, text='first')
+    assert retry_after(error.value) == 3
+    recording.send_message(chat_id=1, text='second')
+    assert bot.sent == [(1, 'second')]
+    assert [exchange.request['text'] for exchange in recording.exchanges] == [
+        'first', 'second'
+    ]
+    assert recording.sent is bot.sent
+
+
+def test_engine_runs_offline_on_fake_transports():
+    accounts = [Account(str(i), f't{i}', str(i)) for i in range(10)]
+    bot = FakeTelegramTransport()
+    transport = FakePracticumTransport(change_rate=1.0)
+    engine = PollingEngine(accounts, bot, transport=transport)
+    try:
+        engine.run_cycle()
+    finally:
+        engine.close()
+    assert transport.requests == 10
+    assert sorted(chat_id for chat_id, _ in bot.sent) == sorted(
+        account.chat_id for account in accounts
+    )
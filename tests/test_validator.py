@@ -0,0 +1,110 @@
+import pytest
+
+import homework
+from benchmarks.validator import (legacy_check_response, legacy_parse_status,
+                                  make_response, run)
+from bot.records import HomeworkRecord
+from bot.validator import HomeworksValidator
+
+INVALID_RESPONSES = [
+    [],
+    {'current_date': 1},
+    {'homeworks': {'status': 'approved'}},
+]
+INVALID_HOMEWORKS = [
+    {'status': 'approved'},
+    {'homework_name': 'hw'},
+    {'homework_name': 'hw', 'status': 'unknown'},
+]
+UNHASHABLE_STATUS = {'homework_name': 'hw', 'status': ['approved']}
+
+
+class CountingTemplate(str):
+    formatted = 0
+
+    def format(self, *args, **kwargs):
+        CountingTemplate.formatted += 1
+        return super().format(*args, **kwargs)
+
+
+def raised(function, argument):
+    try:
+        function(argument)
+    except Exception as error:
+        return type(error), str(error)
+    return None
+
+
+@pytest.mark.parametrize('response', INVALID_RESPONSES)
+def test_check_response_matches_legacy_errors(response):
+    assert raised(homework.check_response, response) == raised(
+        legacy_check_response, response
+    )
+
+
+@pytest.mark.parametrize('item', INVALID_HOMEWORKS)
+def test_parse_status_matches_legacy_errors(item):
+    assert raised(homework.parse_status, item) == raised(
+        legacy_parse_status, item
+    )
+
+
+def test_extract_matches_legacy_messages():
+    response = make_response(500)
+    extracted = homework.extract_updates(response['homeworks'])
+    assert extracted.messages == [
+        legacy_parse_status(item) for item in reversed(response['homeworks'])
+    ]
+    assert extracted.homeworks == [
+        HomeworkRecord.from_item(item) for item in reversed(
+            response['homeworks']
+        )
+    ]
+
+
+def test_extract_collects_all_issues_without_formatting():
+    template = CountingTemplate(homework.UNKNOWN_STATUS_HOMEWORK_MESSAGE)
+    validator = HomeworksValidator(
+        homework.HOMEWORK_VERDICTS, homework.UPDATE_STATUS_HOMEWORK_MESSAGE,
+        template, homework.KEY_ERROR_MESSAGE, homework.TYPE_ERROR_MESSAGE
+    )
+    good = {'homework_name': 'ok', 'status': 'approved'}
+    extracted = validator.extract(
+        INVALID_HOMEWORKS + [UNHASHABLE_STATUS, good]
+    )
+    assert extracted.homeworks == [HomeworkRecord.from_item(good)]
+    assert [issue.error for issue in extracted.issues] == [
+        ValueError, ValueError, KeyError, KeyError
+    ]
+    assert CountingTemplate.formatted == 0
+    assert isinstance(extracted.issues[0].exception(), ValueError)
+    assert CountingTemplate.formatted == 1
+
+
+def test_unhashable_status_is_unknown_status():
+    with pytest.raises(ValueError):
+        homework.parse_status(UNHASHABLE_STATUS)
+
+
+def test_extract_updates_raises_first_issue():
+    with pytest.raises(KeyError):
+        homework.extract_updates(INVALID_HOMEWORKS[:2])
+
+
+def test_validator_benchmark_smoke():
+    result = run(200, repeat=1)
+    assert result.legacy > 0 and result.compiled > 0
+
+
+def test_extract_builds_records_lazily(monkeypatch):
+    built = []
+    from_item = HomeworkRecord.from_item
+    monkeypatch.setattr(
+        HomeworkRecord, 'from_item',
+        lambda item, status=None: built.append(item) or from_item(item, status)
+    )
+    item = {'id': 1, 'homework_name': 'hw', 'status': 'approved'}
+    extracted = homework.extract_updates([item])
+    assert built == []
+    assert extracted.homeworks is extracted.homeworks
+    assert built == [item]